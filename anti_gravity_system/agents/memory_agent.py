@@ -1,5 +1,5 @@
 from typing import Dict, Any
-from anti_gravity_system.memory.memory_store import MemoryStore
+from anti_gravity_system.memory.memory_store import open_memory_store
 # If logger is needed, use standard logging or import from utils if available
 import logging
 
@@ -8,9 +8,12 @@ logger = logging.getLogger(__name__)
 class MemoryAgent:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.store = MemoryStore()
+        self.store = open_memory_store()
         logger.info(f"Memory Agent initialized with role: {config.get('role')}")
 
+    def close(self):
+        self.store.close()
+
     def process_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """
         Handles requests to store or retrieve memory.
@@ -47,11 +50,12 @@ class MemoryAgent:
         query = payload.get("query")
         type_filter = payload.get("type_filter")
         limit = payload.get("limit", 5)
+        session_id = payload.get("session_id")
 
         if not query:
             raise ValueError("Query is required for search")
 
-        results = self.store.search_memory(query, type_filter, limit)
+        results = self.store.search_memory(query, type_filter, limit, session_id)
         return {"status": "success", "results": results}
 
     def _handle_history(self, payload: Dict[str, Any]) -> Dict[str, Any]:
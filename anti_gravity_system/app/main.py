@@ -1,4 +1,5 @@
-from fastapi import FastAPI, HTTPException, Depends, Body
+from fastapi import FastAPI, HTTPException, Depends, Body, Query
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
@@ -6,15 +7,76 @@ import sys
 import os
 import yaml
 import time
+import json
+from contextlib import aclosing, asynccontextmanager
 from prometheus_client import make_asgi_app, Counter, Histogram
 
 # Ensure project root is in path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from anti_gravity_system.src.agents.orchestrator import OrchestratorAgent
+from anti_gravity_system.src.core.agent_pool import AgentPool, PoolExhaustedError
+from anti_gravity_system.src.core.llm_clients import get_client_registry
+from anti_gravity_system.src.core.memory_store import open_memory_store
+from anti_gravity_system.src.core.memory_compactor import MemoryCompactor
+from anti_gravity_system.src.core.tenant_shards import get_tenant_shards
+from anti_gravity_system.src.core.security import get_current_user, require_role
 from anti_gravity_system.src.utils.logger import logger
 
-app = FastAPI(title="Anti-Gravity API", version="1.0.0")
+# --- Orchestrator Pool ---
+ORCHESTRATOR_POOL_SIZE = int(os.getenv("ORCHESTRATOR_POOL_SIZE", "2"))
+ORCHESTRATOR_POOL_TIMEOUT = float(os.getenv("ORCHESTRATOR_POOL_TIMEOUT", "30"))
+
+# Where the memory agents keep the shared store and the per-user shards
+MEMORY_DIR = "./antigravity_data/memory"
+
+def load_config():
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'agents.yaml')
+    if not os.path.exists(config_path):
+        # Fallback for docker if volume not mounted yet
+        return {"agents": []}
+    with open(config_path, 'r') as file:
+        return yaml.safe_load(file)
+
+def build_orchestrator() -> OrchestratorAgent:
+    config = load_config()
+    agents_conf = config.get('agents', [])
+    orch_conf = next((a for a in agents_conf if a['id'] == 'orchestrator'), {})
+    return OrchestratorAgent(orch_conf, agents_conf, config.get('model_routing'))
+
+orchestrator_pool = AgentPool(
+    build_orchestrator,
+    size=ORCHESTRATOR_POOL_SIZE,
+    name="orchestrator",
+    checkout_timeout=ORCHESTRATOR_POOL_TIMEOUT
+)
+
+def start_memory_compactor() -> Optional[MemoryCompactor]:
+    retention = load_config().get('memory_retention') or {}
+    if not retention.get('enabled', False):
+        return None
+    try:
+        store = open_memory_store(retention.get('persist_dir', "./antigravity_data/memory"))
+        compactor = MemoryCompactor.from_config(store, retention)
+    except Exception as e:
+        logger.error(f"Memory compaction disabled: {e}")
+        return None
+    compactor.start(float(retention.get('interval_minutes', 60)) * 60, get_tenant_shards(compactor.store.persist_dir))
+    return compactor
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    orchestrator_pool.start()
+    compactor = start_memory_compactor()
+    yield
+    if compactor:
+        compactor.stop()
+        compactor.store.close()
+    orchestrator_pool.shutdown()
+    get_tenant_shards(MEMORY_DIR).close()
+    get_client_registry().close()
+
+app = FastAPI(title="Anti-Gravity API", version="1.0.0", lifespan=lifespan)
 
 # --- Prometheus Metrics ---
 metrics_app = make_asgi_app()
@@ -22,7 +84,6 @@ app.mount("/metrics", metrics_app)
 
 REQUEST_COUNT = Counter("agent_requests_total", "Total requests to agents", ["status"])
 REQUEST_LATENCY = Histogram("agent_request_latency_seconds", "Request latency")
-TOKEN_USAGE = Counter("llm_token_usage_total", "Total LLM tokens used", ["model"])
 
 # --- Middleware ---
 app.add_middleware(
@@ -35,27 +96,36 @@ app.add_middleware(
 
 # --- Dependencies ---
 
-def load_config():
-    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'agents.yaml')
-    if not os.path.exists(config_path):
-        # Fallback for docker if volume not mounted yet
-        return {"agents": []}
-    with open(config_path, 'r') as file:
-        return yaml.safe_load(file)
+def resolve_tenant(user: dict, requested: Optional[str] = None) -> str:
+    """
+    The user whose memory shard a request reads and writes: the authenticated
+    user, or for admins any user they name. Naming another user otherwise is a 403.
+    """
+    if requested and requested != user["user_id"]:
+        if user.get("role") != "admin":
+            raise HTTPException(status_code=403, detail="Cannot access another user's memory")
+        return requested
+    return user["user_id"]
 
-def get_orchestrator():
-    # In a real app, use @lru_cache or a singleton pattern
-    config = load_config()
-    agents_conf = config.get('agents', [])
-    orch_conf = next((a for a in agents_conf if a['id'] == 'orchestrator'), {})
-    return OrchestratorAgent(orch_conf, agents_conf)
+async def get_orchestrator():
+    # Warm instance from the pool; reset and returned once the request finishes
+    try:
+        orchestrator = await orchestrator_pool.acheckout()
+    except PoolExhaustedError as e:
+        logger.error(f"API Error: {e}")
+        raise HTTPException(status_code=503, detail="All orchestrators are busy, retry shortly.")
+    try:
+        yield orchestrator
+    finally:
+        await orchestrator_pool.acheckin(orchestrator)
 
 # --- Models ---
 
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
-    user_id: Optional[str] = "default_user"
+    # Defaults to the authenticated user; see resolve_tenant
+    user_id: Optional[str] = None
 
 class ChatResponse(BaseModel):
     session_id: str
@@ -73,12 +143,14 @@ async def health_check():
     return {"status": "ok", "system": "Anti-Gravity"}
 
 @app.post("/chat/turn", response_model=ChatResponse)
-async def chat_turn(req: ChatRequest, orchestrator: OrchestratorAgent = Depends(get_orchestrator)):
+async def chat_turn(req: ChatRequest, orchestrator: OrchestratorAgent = Depends(get_orchestrator),
+                    user: dict = Depends(get_current_user)):
     logger.info(f"API Request: {req.message}")
+    tenant = resolve_tenant(user, req.user_id)
     start_time = time.time()
     try:
-        # Run Orchestrator
-        result = orchestrator.run(req.message)
+        # Run Orchestrator without blocking the event loop
+        result = await orchestrator.arun(req.message, tenant)
         
         duration = time.time() - start_time
         REQUEST_LATENCY.observe(duration)
@@ -99,7 +171,45 @@ async def chat_turn(req: ChatRequest, orchestrator: OrchestratorAgent = Depends(
         REQUEST_COUNT.labels(status="error").inc()
         raise HTTPException(status_code=500, detail=str(e))
 
-from anti_gravity_system.src.core.security import get_current_user, require_role
+def _sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest, user: dict = Depends(get_current_user)):
+    """
+    Server-Sent Events version of /chat/turn: stage events as they happen, then
+    the answer token by token, then a final "done" event.
+    """
+    logger.info(f"API Stream Request: {req.message}")
+    tenant = resolve_tenant(user, req.user_id)
+    # Checked out here rather than via Depends so the instance is held until the stream ends
+    try:
+        orchestrator = await orchestrator_pool.acheckout()
+    except PoolExhaustedError as e:
+        logger.error(f"API Error: {e}")
+        raise HTTPException(status_code=503, detail="All orchestrators are busy, retry shortly.")
+
+    async def events():
+        start_time = time.time()
+        try:
+            # Closed explicitly on disconnect, so its cleanup finishes before checkin
+            async with aclosing(orchestrator.astream(req.message, tenant)) as stream:
+                async for event in stream:
+                    yield _sse(event)
+            REQUEST_LATENCY.observe(time.time() - start_time)
+            REQUEST_COUNT.labels(status="success").inc()
+        except Exception as e:
+            logger.error(f"API Stream Error: {e}")
+            REQUEST_COUNT.labels(status="error").inc()
+            yield _sse({"type": "error", "error": str(e)})
+        finally:
+            await orchestrator_pool.acheckin(orchestrator)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.post("/agent/{agent_id}/run", dependencies=[Depends(require_role("admin"))])
 async def run_agent(agent_id: str, req: AgentRunRequest, orchestrator: OrchestratorAgent = Depends(get_orchestrator)):
@@ -109,11 +219,64 @@ async def run_agent(agent_id: str, req: AgentRunRequest, orchestrator: Orchestra
         raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
     
     try:
-        result = worker.execute_task(req.task, req.context)
+        result = await worker.aexecute_task(req.task, req.context)
         return {"status": "success", "agent": agent_id, "output": result}
     except Exception as e:
          raise HTTPException(status_code=500, detail=str(e))
 
+# --- Session History ---
+
+HISTORY_MAX_PAGE_SIZE = 500
+
+def _history_fields(fields: Optional[str]) -> Optional[List[str]]:
+    return [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+def _history_store(user: dict, user_id: Optional[str]):
+    # Chat sessions keep their memory in the shard of the user they ran for
+    return get_tenant_shards(MEMORY_DIR).open(resolve_tenant(user, user_id))
+
+@app.get("/sessions/{session_id}/history")
+def session_history(session_id: str, cursor: Optional[str] = None,
+                    limit: int = Query(100, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+                    fields: Optional[str] = None, max_content_chars: Optional[int] = Query(None, ge=0),
+                    user_id: Optional[str] = None, user: dict = Depends(get_current_user)):
+    """
+    One page of a session's memory, oldest first. Follow `next_cursor` until it is null.
+    `fields` is a comma-separated projection (id,type,content,timestamp); `user_id`
+    lets an admin read another user's sessions.
+    """
+    store = _history_store(user, user_id)
+    try:
+        page = store.get_session_history_page(session_id, cursor, limit, _history_fields(fields), max_content_chars)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        store.close()
+    return {"session_id": session_id, **page}
+
+@app.get("/sessions/{session_id}/history/stream")
+def session_history_stream(session_id: str, fields: Optional[str] = None,
+                           max_content_chars: Optional[int] = Query(None, ge=0),
+                           user_id: Optional[str] = None, user: dict = Depends(get_current_user)):
+    """
+    The whole session as NDJSON, one item per line, streamed as it is read.
+    """
+    store = _history_store(user, user_id)
+    try:
+        items = store.iter_session_history(session_id, _history_fields(fields), max_content_chars)
+    except ValueError as e:
+        store.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def lines():
+        try:
+            for item in items:
+                yield json.dumps(item) + "\n"
+        finally:
+            store.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
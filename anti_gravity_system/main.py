@@ -28,7 +28,7 @@ def main():
         from anti_gravity_system.src.agents.orchestrator import OrchestratorAgent
         from anti_gravity_system.src.agents.ui_agent import UIAgent
         
-        orchestrator = OrchestratorAgent(orch_conf, agents_conf)
+        orchestrator = OrchestratorAgent(orch_conf, agents_conf, config.get('model_routing'))
         ui_agent = UIAgent(ui_conf, orchestrator)
         
         console.print(f"[green]System Ready![/green] (Type 'exit' to quit)")
@@ -0,0 +1,101 @@
+import sys
+import os
+import time
+import json
+import argparse
+import tempfile
+import multiprocessing
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from anti_gravity_system.src.core.vector_backends import create_vector_backend
+
+TYPES = ["USER_INPUT", "FACT", "PLAN", "STEP_RESULT"]
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def run(kind: str, items: int, dim: int, batch: int, queries: int, result_queue):
+    """
+    One backend at one size, in a fresh process so RSS is not shared between runs.
+    """
+    import chromadb
+
+    rng = np.random.default_rng(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = rss_mb()
+        started = time.perf_counter()
+        backend = create_vector_backend(kind, tmp, lambda: chromadb.PersistentClient(path=os.path.join(tmp, "chroma")))
+        startup = time.perf_counter() - started
+
+        insert_seconds = 0.0
+        for start in range(0, items, batch):
+            n = min(batch, items - start)
+            vectors = rng.normal(size=(n, dim)).astype(np.float32)
+            metadatas = [{"type": TYPES[(start + i) % len(TYPES)], "session_id": f"s{(start + i) % 500}"} for i in range(n)]
+            t = time.perf_counter()
+            backend.upsert(
+                ids=[f"id-{start + i}" for i in range(n)],
+                embeddings=vectors.tolist() if kind == "chroma" else vectors,
+                documents=[f"memory item {start + i}" for i in range(n)],
+                metadatas=metadatas
+            )
+            insert_seconds += time.perf_counter() - t
+
+        latencies = []
+        for i in range(queries):
+            q = rng.normal(size=dim).astype(np.float32)
+            where = {"type": "FACT"} if i % 2 else None
+            t = time.perf_counter()
+            backend.query(q.tolist() if kind == "chroma" else q, limit=5, where=where)
+            latencies.append(time.perf_counter() - t)
+        backend.close()
+
+        result_queue.put({
+            "backend": kind,
+            "items": items,
+            "startup_ms": round(startup * 1000, 1),
+            "insert_per_s": round(items / insert_seconds),
+            "query_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+            "query_p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+            "rss_mb": round(rss_mb() - baseline, 1)
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare MemoryStore vector backends.")
+    parser.add_argument("--backends", default="chroma,numpy")
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=384, help="all-MiniLM-L6-v2 embeds to 384 dimensions")
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="print one JSON object per run")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    header = f"{'backend':8} {'items':>9} {'startup ms':>11} {'insert/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'RSS MB':>8}"
+    if not args.json:
+        print(header)
+    for size in (int(s) for s in args.sizes.split(",")):
+        for kind in args.backends.split(","):
+            result_queue = ctx.Queue()
+            proc = ctx.Process(target=run, args=(kind, size, args.dim, args.batch, args.queries, result_queue))
+            proc.start()
+            result = result_queue.get()
+            proc.join()
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print(f"{result['backend']:8} {result['items']:>9} {result['startup_ms']:>11} {result['insert_per_s']:>10} "
+                      f"{result['query_p50_ms']:>8} {result['query_p95_ms']:>8} {result['rss_mb']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import sys
+import os
+import time
+import json
+import zlib
+import random
+import argparse
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from anti_gravity_system.src.core.memory_store import MemoryStore
+from anti_gravity_system.src.core.tenant_shards import TenantShards
+
+WORDS = ["deploy", "invoice", "parser", "salary", "roadmap", "incident", "schema", "budget", "migration", "forecast"]
+
+
+def make_embedder(dim: int):
+    # Deterministic stand-in for the sentence model, so the benchmark measures the store
+    def embed(texts):
+        return [np.random.default_rng(zlib.crc32(t.encode("utf-8"))).normal(size=dim).astype(np.float32).tolist()
+                for t in texts]
+    return embed
+
+
+def documents(tenant: int, items: int):
+    rng = random.Random(tenant)
+    return [f"tenant {tenant} " + " ".join(rng.choices(WORDS, k=12)) for _ in range(items)]
+
+
+def fill(store: MemoryStore, tenant: int, items: int):
+    for i, content in enumerate(documents(tenant, items)):
+        store.add_memory(content, "TASK_RESULT", f"t{tenant}-s{i % 20}")
+    store.flush()
+
+
+def measure(search, tenants: int, queries: int, mode: str):
+    rng = random.Random(7)
+    latencies = []
+    for _ in range(queries):
+        tenant = rng.randrange(tenants)
+        query = " ".join(rng.choices(WORDS, k=3))
+        started = time.perf_counter()
+        search(tenant, query, mode)
+        latencies.append(time.perf_counter() - started)
+    return round(float(np.percentile(latencies, 50)) * 1000, 2), round(float(np.percentile(latencies, 95)) * 1000, 2)
+
+
+def run(tenants: int, items: int, queries: int, dim: int, max_open: int, mode: str):
+    embed = make_embedder(dim)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Before sharding: one store, every recall searches all tenants' items
+        shared = MemoryStore(os.path.join(tmp, "shared"), vector_backend="numpy")
+        shared.embedding_function = embed
+        shared.search_cache.max_entries = 0
+        for tenant in range(tenants):
+            fill(shared, tenant, items)
+        p50, p95 = measure(lambda t, q, m: shared.search_memory(q, limit=5, mode=m), tenants, queries, mode)
+        results.append({"layout": "shared", "tenants": tenants, "items": tenants * items, "p50_ms": p50, "p95_ms": p95})
+        shared.close()
+
+        shards = TenantShards(os.path.join(tmp, "sharded"), max_open=max_open, vector_backend="numpy")
+        for tenant in range(tenants):
+            with shards.acquire(str(tenant)) as store:
+                store.embedding_function = embed
+                fill(store, tenant, items)
+
+        def search(tenant, query, m):
+            with shards.acquire(str(tenant)) as store:
+                # Shards reopened after eviction need the stand-in embedder again
+                store.embedding_function = embed
+                store.search_cache.max_entries = 0
+                return store.search_memory(query, limit=5, mode=m)
+
+        p50, p95 = measure(search, tenants, queries, mode)
+        results.append({"layout": f"sharded/{max_open}", "tenants": tenants, "items": tenants * items,
+                        "p50_ms": p50, "p95_ms": p95})
+        shards.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall latency of a shared memory store vs per-tenant shards.")
+    parser.add_argument("--tenants", default="1,10,50,200")
+    parser.add_argument("--items", type=int, default=200, help="memories per tenant")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--max-open", type=int, default=64, help="shards kept open (MEMORY_MAX_OPEN_SHARDS)")
+    parser.add_argument("--mode", default="hybrid", choices=["hybrid", "vector", "lexical"])
+    parser.add_argument("--json", action="store_true", help="print one JSON object per run")
+    args = parser.parse_args()
+
+    if not args.json:
+        print(f"{'layout':12} {'tenants':>8} {'items':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for tenants in (int(t) for t in args.tenants.split(",")):
+        for result in run(tenants, args.items, args.queries, args.dim, args.max_open, args.mode):
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print(f"{result['layout']:12} {result['tenants']:>8} {result['items']:>9} "
+                      f"{result['p50_ms']:>8} {result['p95_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import sys
+import os
+import json
+import argparse
+
+import yaml
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from anti_gravity_system.src.core.memory_store import open_memory_store
+from anti_gravity_system.src.core.memory_compactor import MemoryCompactor
+from anti_gravity_system.src.core.tenant_shards import TenantShards
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "agents.yaml")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply memory retention: summarize idle sessions and expire old items.")
+    parser.add_argument("--config", default=CONFIG_PATH, help="agents.yaml with a memory_retention block")
+    parser.add_argument("--persist-dir", help="memory store directory (default: memory_retention.persist_dir)")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be removed without changing anything")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM SQLite afterwards to return space to the filesystem")
+    parser.add_argument("--force", action="store_true", help="run even when memory_retention.enabled is false")
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        retention = (yaml.safe_load(f) or {}).get("memory_retention") or {}
+    if not retention.get("enabled") and not args.force:
+        print("memory_retention.enabled is false; nothing to do (use --force to run anyway)", file=sys.stderr)
+        return
+    if args.vacuum:
+        retention["vacuum"] = True
+
+    persist_dir = args.persist_dir or retention.get("persist_dir", "./antigravity_data/memory")
+    store = open_memory_store(persist_dir)
+    try:
+        compactor = MemoryCompactor.from_config(store, retention)
+        if compactor.summarize_after_days is not None and getattr(compactor.llm, "mock_mode", False):
+            sys.exit("OPENAI_API_KEY is not set: refusing to replace sessions with mock summaries "
+                     "(set memory_retention.summarize_after_days to null to only expire items)")
+        # The shared store and every tenant shard under it
+        report = compactor.run_all(TenantShards(persist_dir), dry_run=args.dry_run)
+    finally:
+        store.close()
+    print(json.dumps(report.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import sys
+import os
+import json
+import time
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from anti_gravity_system.src.core.memory_store import open_memory_store
+from anti_gravity_system.src.core.tenant_shards import TenantShards
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export a memory store, with its vectors, to Parquet / Arrow IPC, or import such a file."
+    )
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="file to write or read; .parquet selects Parquet, anything else Arrow IPC")
+    parser.add_argument("--persist-dir", default="./antigravity_data/memory")
+    parser.add_argument("--user-id", help="a tenant's shard instead of the shared store")
+    parser.add_argument("--format", choices=["parquet", "arrow"], help="override the format implied by the path")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="rows per record batch / write")
+    parser.add_argument("--reembed", action="store_true", help="recompute vectors on import instead of reusing them")
+    args = parser.parse_args()
+
+    if args.user_id:
+        store = TenantShards(args.persist_dir).open(args.user_id)
+    else:
+        store = open_memory_store(args.persist_dir)
+    started = time.perf_counter()
+    try:
+        if args.command == "export":
+            rows = store.export_memories(args.path, args.format, chunk_size=args.batch_size)
+        else:
+            rows = store.import_memories(args.path, args.format, batch_size=args.batch_size,
+                                         reembed=True if args.reembed else None)
+    finally:
+        store.close()
+    print(json.dumps({
+        "command": args.command,
+        "rows": rows,
+        "seconds": round(time.perf_counter() - started, 2),
+        "file_bytes": os.path.getsize(args.path)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
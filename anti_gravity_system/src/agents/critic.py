@@ -1,13 +1,16 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from anti_gravity_system.src.core.llm_provider import LLMProvider
+from anti_gravity_system.src.core.model_router import ModelRouter
 from anti_gravity_system.src.utils.logger import logger
 from anti_gravity_system.src.utils.prompt_loader import load_system_prompts
 
 class CriticAgent:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], router: Optional[ModelRouter] = None):
         self.config = config
         self.name = config.get('name', 'Critic')
         self.llm = LLMProvider()
+        self.router = router or ModelRouter(agents_config=[config])
+        self.agent_id = config.get('id', 'critic_safety')
         
         prompts = load_system_prompts()
         self.system_prompt = prompts.get("Critic", "You are a Critic.")
@@ -19,7 +22,21 @@ class CriticAgent:
         Reviews the output of another agent.
         """
         logger.info(f"[{self.name}] Reviewing output for: {task_description}")
-        
+        review_response = self.llm.chat_completion(
+            self._review_messages(task_description, agent_output),
+            model=self.router.resolve(self.agent_id, "review")
+        )
+        return self._verdict(task_description, review_response)
+
+    async def areview_task(self, task_description: str, agent_output: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info(f"[{self.name}] Reviewing output for: {task_description}")
+        review_response = await self.llm.achat_completion(
+            self._review_messages(task_description, agent_output),
+            model=self.router.resolve(self.agent_id, "review")
+        )
+        return self._verdict(task_description, review_response)
+
+    def _review_messages(self, task_description: str, agent_output: Dict[str, Any]) -> List[Dict[str, str]]:
         output_content = agent_output.get("output") or agent_output.get("code_generated") or str(agent_output)
         
         # In mock mode, we just pass unless we see 'error'
@@ -34,11 +51,12 @@ class CriticAgent:
             "Reply with 'APPROVED' or 'REJECTED: <reason>'."
         )
 
-        review_response = self.llm.chat_completion([
+        return [
              {"role": "system", "content": "You are a harsh but fair critic. Safety is paramount."},
              {"role": "user", "content": prompt}
-        ])
+        ]
 
+    def _verdict(self, task_description: str, review_response: str) -> Dict[str, Any]:
         # Mock override for testing if LLM is mocked
         if self.llm.mock_mode:
             if "fail" in task_description.lower(): 
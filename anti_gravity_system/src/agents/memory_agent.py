@@ -1,20 +1,28 @@
 from typing import Dict, Any, List
-from anti_gravity_system.src.core.memory_store import MemoryStore
+from contextlib import nullcontext
+from anti_gravity_system.src.core.memory_store import open_memory_store
+from anti_gravity_system.src.core.tenant_shards import get_tenant_shards
 from anti_gravity_system.src.utils.logger import logger
 
 class MemoryAgent:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.store = MemoryStore(persist_dir="./antigravity_data/memory")
+        # Shared with every other agent using this directory in the process
+        self.store = open_memory_store("./antigravity_data/memory")
+        # Requests carrying a user_id go to that user's shard; the others to the shared store
+        self.shards = get_tenant_shards("./antigravity_data/memory")
         logger.info(f"Memory Agent initialized with role: {config.get('role')}")
 
+    def close(self):
+        self.store.close()
+
     def process_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """
         Handles requests to store or retrieve memory.
         Request schema:
         {
             "action": "store" | "search" | "get_history",
-            "payload": { ... }
+            "payload": { ..., "user_id": optional tenant }
         }
         """
         action = request.get("action")
@@ -22,18 +30,25 @@ class MemoryAgent:
 
         try:
             if action == "store":
-                return self._handle_store(payload)
+                handler = self._handle_store
             elif action == "search":
-                return self._handle_search(payload)
+                handler = self._handle_search
             elif action == "get_history":
-                return self._handle_history(payload)
+                handler = self._handle_history
             else:
                 return {"status": "error", "message": f"Unknown action: {action}"}
+            with self._store_for(payload.get("user_id")) as store:
+                return handler(store, payload)
         except Exception as e:
             logger.error(f"Memory Agent Error: {e}")
             return {"status": "error", "message": str(e)}
 
-    def _handle_store(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _store_for(self, user_id):
+        if user_id is None:
+            return nullcontext(self.store)
+        return self.shards.acquire(user_id)
+
+    def _handle_store(self, store, payload: Dict[str, Any]) -> Dict[str, Any]:
         content = payload.get("content")
         type_ = payload.get("type", "FACT")
         session_id = payload.get("session_id", "default_session")
@@ -42,24 +57,37 @@ class MemoryAgent:
         if not content:
             raise ValueError("Content is required for storage")
 
-        memory_id = self.store.add_memory(content, type_, session_id, metadata)
+        memory_id = store.add_memory(content, type_, session_id, metadata)
         return {"status": "success", "memory_id": memory_id}
 
-    def _handle_search(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _handle_search(self, store, payload: Dict[str, Any]) -> Dict[str, Any]:
         query = payload.get("query")
         type_filter = payload.get("type_filter")
         limit = payload.get("limit", 5)
+        # Lets the store flush this session's pending writes before searching
+        session_id = payload.get("session_id")
+        # "auto" | "hybrid" | "vector" | "lexical"; see MemoryStore.search_memory
+        mode = payload.get("mode", "auto")
 
         if not query:
             raise ValueError("Query is required for search")
 
-        results = self.store.search_memory(query, type_filter, limit)
+        results = store.search_memory(query, type_filter, limit, session_id, mode=mode)
         return {"status": "success", "results": results}
 
-    def _handle_history(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _handle_history(self, store, payload: Dict[str, Any]) -> Dict[str, Any]:
         session_id = payload.get("session_id")
         if not session_id:
             raise ValueError("session_id is required for history")
             
-        history = self.store.get_session_history(session_id)
-        return {"status": "success", "history": history}
+        fields = payload.get("fields")
+        max_content_chars = payload.get("max_content_chars")
+        # With a limit or cursor, one page and the cursor of the next; otherwise the whole session
+        if payload.get("limit") is None and payload.get("cursor") is None:
+            history = list(store.iter_session_history(session_id, fields, max_content_chars))
+            return {"status": "success", "history": history}
+
+        page = store.get_session_history_page(
+            session_id, payload.get("cursor"), payload.get("limit", 100), fields, max_content_chars
+        )
+        return {"status": "success", "history": page["items"], "next_cursor": page["next_cursor"]}
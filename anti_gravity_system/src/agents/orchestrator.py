@@ -1,6 +1,12 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Set, Tuple, Callable, AsyncIterator
+import asyncio
+import contextlib
+import copy
+import time
 import uuid
 import json
+import threading
+from concurrent.futures import Future, wait
 from anti_gravity_system.src.core.llm_provider import LLMProvider
 from anti_gravity_system.src.agents.workers import WorkerFactory
 from anti_gravity_system.src.agents.critic import CriticAgent
@@ -9,173 +15,573 @@ from anti_gravity_system.src.utils.logger import logger
 from anti_gravity_system.src.utils.prompt_loader import load_system_prompts
 
 # New Core Modules
-from anti_gravity_system.src.core.metrics import MetricsTracker
+from anti_gravity_system.src.core.metrics import MetricsTracker, PLAN_LATENCY
 from anti_gravity_system.src.core.safety_layer import SafetyLayer
+from anti_gravity_system.src.core.plan_graph import PlanGraph, PlanCycleError, execute_plan_graph, aexecute_plan_graph
+from anti_gravity_system.src.core.plan_cache import PlanCache
+from anti_gravity_system.src.core.model_router import ModelRouter
+from anti_gravity_system.src.core.bounded_executor import get_memory_write_executor, get_memory_recall_executor
+
+PLAN_SCHEMA = "List[{\"id\": int, \"task\": str, \"worker\": str, \"depends_on\": List[int]}]"
 
 class OrchestratorAgent:
-    def __init__(self, config: Dict[str, Any], agents_config: List[Dict[str, Any]]):
+    def __init__(self, config: Dict[str, Any], agents_config: List[Dict[str, Any]],
+                 routing_config: Optional[Dict[str, Any]] = None):
         self.config = config
         self.name = config.get('name', "Orchestrator")
+        self.agent_id = config.get('id', "orchestrator")
         self.llm = LLMProvider()
-        
+        # Per-agent / per-stage model selection from the model_routing config section
+        self.router = ModelRouter(routing_config, agents_config)
+
         # Load System Prompt
         prompts = load_system_prompts()
         self.system_prompt = prompts.get("Orchestrator", "You are the Orchestrator.")
         logger.info(f"Orchestrator loaded system prompt: {len(self.system_prompt)} chars")
-        
+
         # Initialize Components
         self.memory = MemoryAgent({"role": "Memory", "name": "MemoryCore"})
-        self.critic = CriticAgent({"role": "Critic", "name": "SystemCritic"})
+        self.critic = CriticAgent({"id": "critic_safety", "role": "Critic", "name": "SystemCritic"}, self.router)
         self.metrics = MetricsTracker()
         self.safety = SafetyLayer()
-        
+        self.max_parallel_steps = int(config.get('max_parallel_steps', 4))
+        self.plan_cache = PlanCache.from_config(self.memory.store, config.get('plan_cache'))
+        # Memory stores are fire-and-forget; recall and plan lookups start early and are
+        # awaited only where their results are needed
+        self.memory_writes = get_memory_write_executor()
+        self.memory_recall = get_memory_recall_executor()
+        # Stores this instance submitted that have not finished; reset() waits on
+        # these rather than on the shared queue, which other sessions keep filling
+        self._pending_writes: Set[Future] = set()
+        self._pending_lock = threading.Lock()
+        # session_id -> user_id of in-flight sessions, whose memory goes to that user's shard
+        self._session_users: Dict[str, Optional[str]] = {}
+
         # Initialize Workers from config
         self.workers = {}
         for agent_conf in agents_config:
             if "worker" in agent_conf['id']:
-                 worker = WorkerFactory.create_worker(agent_conf)
+                 worker = WorkerFactory.create_worker(agent_conf, self.router)
                  self.workers[agent_conf['id']] = worker
 
         logger.info(f"Orchestrator initialized with {len(self.workers)} workers.")
 
-    def run(self, user_request: str) -> Dict[str, Any]:
+    def reset(self):
+        """
+        Clears per-session state so a pooled instance can serve the next request.
+        """
+        # Lets the finished session's background stores land (and record their
+        # metrics) before its records are cleared
+        self.wait_for_writes()
+        self._clear_session()
+
+    async def areset(self):
+        """
+        reset() for the event loop: waits for this instance's stores without blocking it.
+        """
+        pending = self._writes_in_flight()
+        if pending:
+            await asyncio.wait([asyncio.wrap_future(f) for f in pending])
+        self._clear_session()
+
+    def _clear_session(self):
+        self.metrics.reset()
+        self._session_users.clear()
+
+    def wait_for_writes(self, timeout: Optional[float] = None):
+        """
+        Blocks until the stores this instance submitted have finished.
+        """
+        pending = self._writes_in_flight()
+        if pending:
+            wait(pending, timeout)
+
+    def _writes_in_flight(self) -> List[Future]:
+        with self._pending_lock:
+            return list(self._pending_writes)
+
+    def close(self):
+        self.wait_for_writes()
+        self.memory.close()
+
+    def run(self, user_request: str, user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Main Agent Loop: Observe -> Think -> Plan -> Act -> Evaluate -> Improve
+
+        With a user_id, the session's memory is stored in and recalled from that
+        user's shard only.
         """
-        session_id = str(uuid.uuid4())
-        logger.info(f"Starting Session {session_id}")
-        self.metrics.start_timer("total_session_time")
+        session_id = self._start_session(user_id)
+
+        # Recall and the plan cache lookup run while the input is validated
+        recall = self._start_recall(user_request, session_id)
+        lookup = self._start_plan_lookup(user_request, user_id)
 
         # 0. Safety Check (Input)
         if not self.safety.validate_input(user_request):
+            recall.cancel()
+            lookup.cancel()
+            self._session_users.pop(session_id, None)
             return {"status": "rejected", "error": "Safety violation in input."}
 
         # 1. Observe
-        context = self._observe(user_request, session_id)
-        
-        # 2. Think
-        analysis = self._think(user_request, context)
-        
-        # 3. Plan
-        plan = self._plan(user_request, analysis)
+        context = self._observe(user_request, session_id, recall)
+
+        # 2-3. Think & Plan (a cached plan for a similar request skips both LLM calls)
+        plan_start = time.time()
+        cached = self._await_memory(lookup)
+        if cached:
+            plan_entry_id, plan = cached
+        else:
+            plan_entry_id = None
+            analysis = self._think(user_request, context)
+            plan = self._plan(user_request, analysis)
+        self._record_plan_latency(plan_start, cached is not None)
         self.metrics.record_metric("plan_steps", len(plan), "count")
-        
-        results = []
-        
-        # 4. Act Loop
-        for step in plan:
-            # 5. Act
-            result = self._act(step, session_id)
-            
-            # 6. Evaluate
-            review = self._evaluate(step, result)
-            
-            if not review['approved']:
-                # 7. Improve (Simple Retry Logic for MVP)
-                logger.warning(f"Step rejected: {review.get('feedback')}. Retrying...")
-                self.metrics.record_metric("retry_count", 1, "count")
-                step['task'] = f"{step['task']} (Correction: {review.get('feedback')})"
-                result = self._act(step, session_id) # Retry once
-            
-            results.append({"step": step, "result": result})
-            
-            # Safety Check (Output)
-            if not self.safety.validate_output(str(result)):
-                 logger.warning("Safety violation in step output. masking.")
-                 result = "[REDACTED]"
+        plan_template = copy.deepcopy(plan)
+
+        # 4-7. Act / Evaluate / Improve, running independent steps in parallel
+        results = self._execute_plan(plan, session_id)
+        self._remember_plan(user_request, plan_template, results, plan_entry_id, user_id)
 
         # Final Response
         final_response = self._synthesize_response(user_request, results)
-        
+        return self._complete_session(session_id, final_response, results)
+
+    async def arun(self, user_request: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Async twin of run(). LLM calls use the async client and blocking memory/tool
+        I/O runs on worker threads, so one event loop can hold many sessions.
+        """
+        session_id = self._start_session(user_id)
+
+        recall = self._start_recall(user_request, session_id)
+        lookup = self._start_plan_lookup(user_request, user_id)
+
+        if not self.safety.validate_input(user_request):
+            recall.cancel()
+            lookup.cancel()
+            self._session_users.pop(session_id, None)
+            return {"status": "rejected", "error": "Safety violation in input."}
+
+        context = await self._aobserve(user_request, session_id, recall)
+
+        plan_start = time.time()
+        cached = await self._aawait_memory(lookup)
+        if cached:
+            plan_entry_id, plan = cached
+        else:
+            plan_entry_id = None
+            analysis = await self._athink(user_request, context)
+            plan = await self._aplan(user_request, analysis)
+        self._record_plan_latency(plan_start, cached is not None)
+        self.metrics.record_metric("plan_steps", len(plan), "count")
+        plan_template = copy.deepcopy(plan)
+
+        results = await self._aexecute_plan(plan, session_id)
+        await asyncio.to_thread(self._remember_plan, user_request, plan_template, results, plan_entry_id,
+                                user_id)
+
+        final_response = await self._asynthesize_response(user_request, results)
+        return self._complete_session(session_id, final_response, results)
+
+    async def astream(self, user_request: str, user_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming twin of arun(). Yields stage events as they happen (observe, think,
+        plan, step_started, critic_verdict, step_finished), then the synthesized answer
+        as token events, then a final "done" event carrying the arun() result.
+        """
+        session_id = self._start_session(user_id)
+
+        recall = self._start_recall(user_request, session_id)
+        lookup = self._start_plan_lookup(user_request, user_id)
+
+        if not self.safety.validate_input(user_request):
+            recall.cancel()
+            lookup.cancel()
+            self._session_users.pop(session_id, None)
+            yield {"type": "rejected", "error": "Safety violation in input."}
+            return
+        yield {"type": "session", "session_id": session_id}
+
+        context = await self._aobserve(user_request, session_id, recall)
+        yield {"type": "observe", "context": context}
+
+        plan_start = time.time()
+        cached = await self._aawait_memory(lookup)
+        if cached:
+            plan_entry_id, plan = cached
+        else:
+            plan_entry_id = None
+            analysis = await self._athink(user_request, context)
+            yield {"type": "think", "analysis": analysis}
+            plan = await self._aplan(user_request, analysis)
+        self._record_plan_latency(plan_start, cached is not None)
+        self.metrics.record_metric("plan_steps", len(plan), "count")
+        plan_template = copy.deepcopy(plan)
+        yield {"type": "plan", "plan": plan_template, "cached": cached is not None}
+
+        # Steps report progress through a queue while the DAG executes concurrently
+        events: asyncio.Queue = asyncio.Queue()
+        execution = asyncio.create_task(self._aexecute_plan(plan, session_id, events.put_nowait))
+        try:
+            while not execution.done():
+                next_event = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait({next_event, execution}, return_when=asyncio.FIRST_COMPLETED)
+                if next_event in done:
+                    yield next_event.result()
+                else:
+                    next_event.cancel()
+            while not events.empty():
+                yield events.get_nowait()
+            results = execution.result()
+        finally:
+            if not execution.done():
+                # The consumer went away: stop the steps and wait for them to unwind,
+                # so none is still running when the instance is reset and reused
+                execution.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await execution
+        await asyncio.to_thread(self._remember_plan, user_request, plan_template, results, plan_entry_id,
+                                user_id)
+
+        logger.info("Stage: SYNTHESIZE (streaming)")
+        parts = []
+        async for delta in self.llm.astream_chat_completion(
+            self._synthesis_messages(user_request, results), model=self._model("synthesize")
+        ):
+            parts.append(delta)
+            yield {"type": "token", "delta": delta}
+
+        yield {"type": "done", **self._complete_session(session_id, "".join(parts), results)}
+
+    def _start_session(self, user_id: Optional[str]) -> str:
+        session_id = str(uuid.uuid4())
+        logger.info(f"Starting Session {session_id}")
+        self._session_users[session_id] = user_id
+        self.metrics.start_timer("total_session_time")
+        return session_id
+
+    def _complete_session(self, session_id: str, final_response: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
         self.metrics.stop_timer("total_session_time")
         self.metrics.record_metric("task_completion", 1, "count")
+        self._session_users.pop(session_id, None)
 
         return {
             "session_id": session_id,
             "status": "completed",
             "final_response": final_response,
+            "steps": results,
             "metrics": self.metrics.get_summary()
         }
 
+    # --- Plan Cache ---
+
+    def _lookup_plan(self, request: str, user_id: Optional[str] = None) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        if not self.plan_cache:
+            return None
+        return self.plan_cache.lookup(request, user_id)
+
+    def _start_plan_lookup(self, request: str, user_id: Optional[str] = None) -> Future:
+        if not self.plan_cache:
+            done: Future = Future()
+            done.set_result(None)
+            return done
+        return self.memory_recall.submit(self._lookup_plan, request, user_id)
+
+    def _remember_plan(self, request: str, plan: List[Dict[str, Any]], results: List[Dict[str, Any]],
+                       entry_id: Optional[str] = None, user_id: Optional[str] = None):
+        if not self.plan_cache:
+            return
+        approved = sum(1 for entry in results if entry["review"].get("approved"))
+        self.plan_cache.record(request, plan, approved, len(results), entry_id, user_id)
+
+    def _record_plan_latency(self, start: float, from_cache: bool):
+        # Comparing the two sources shows how much planning time the cache saves
+        source = "cache" if from_cache else "llm"
+        duration = time.time() - start
+        PLAN_LATENCY.labels(source=source).observe(duration)
+        self.metrics.record_metric("plan_latency", duration, "seconds", {"source": source})
+
+    # --- Plan Execution ---
+
+    def _build_graph(self, plan: List[Dict[str, Any]]) -> PlanGraph:
+        try:
+            return PlanGraph(plan)
+        except PlanCycleError as e:
+            logger.warning(f"{e}. Falling back to sequential execution.")
+            return PlanGraph.sequential(plan)
+
+    def _execute_plan(self, plan: List[Dict[str, Any]], session_id: str) -> List[Dict[str, Any]]:
+        """
+        Runs plan steps as a dependency DAG; ready steps execute concurrently and
+        receive the results of the steps they depend on.
+        """
+        def run_step(step: Dict[str, Any], upstream: Dict[str, Any]) -> Dict[str, Any]:
+            return self._run_step(step, session_id, self._upstream_results(upstream))
+
+        return execute_plan_graph(self._build_graph(plan), run_step, self.max_parallel_steps)
+
+    async def _aexecute_plan(self, plan: List[Dict[str, Any]], session_id: str,
+                             emit: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        async def run_step(step: Dict[str, Any], upstream: Dict[str, Any]) -> Dict[str, Any]:
+            return await self._arun_step(step, session_id, self._upstream_results(upstream), emit)
+
+        return await aexecute_plan_graph(self._build_graph(plan), run_step, self.max_parallel_steps)
+
+    def _upstream_results(self, upstream: Dict[str, Any]) -> Dict[str, Any]:
+        return {step_id: entry["result"] for step_id, entry in upstream.items()}
+
+    def _run_step(self, step: Dict[str, Any], session_id: str, upstream_results: Dict[str, Any]) -> Dict[str, Any]:
+        context = {"upstream_results": upstream_results} if upstream_results else None
+
+        # 5. Act
+        result = self._act(step, session_id, context)
+
+        # 6. Evaluate
+        review = self._evaluate(step, result)
+
+        if not review['approved']:
+            # 7. Improve (Simple Retry Logic for MVP)
+            self._prepare_retry(step, review)
+            result = self._act(step, session_id, context, self._retry_model()) # Retry once
+
+        return {"step": step, "result": self._mask_unsafe(result), "review": review}
+
+    async def _arun_step(self, step: Dict[str, Any], session_id: str, upstream_results: Dict[str, Any],
+                         emit: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        emit = emit or (lambda event: None)
+        context = {"upstream_results": upstream_results} if upstream_results else None
+
+        emit({"type": "step_started", "step_id": step.get("id"), "task": step["task"], "worker": step.get("worker")})
+        result = await self._aact(step, session_id, context)
+        review = await self._aevaluate(step, result)
+        emit({"type": "critic_verdict", "step_id": step.get("id"),
+              "approved": review["approved"], "feedback": review.get("feedback")})
+
+        if not review['approved']:
+            self._prepare_retry(step, review)
+            emit({"type": "step_started", "step_id": step.get("id"), "task": step["task"],
+                  "worker": step.get("worker"), "retry": True})
+            result = await self._aact(step, session_id, context, self._retry_model())
+
+        entry = {"step": step, "result": self._mask_unsafe(result), "review": review}
+        emit({"type": "step_finished", "step_id": step.get("id"), "result": entry["result"]})
+        return entry
+
+    def _prepare_retry(self, step: Dict[str, Any], review: Dict[str, Any]):
+        logger.warning(f"Step rejected: {review.get('feedback')}. Retrying...")
+        self.metrics.record_metric("retry_count", 1, "count")
+        step['task'] = f"{step['task']} (Correction: {review.get('feedback')})"
+
+    def _retry_model(self) -> Optional[str]:
+        # Optionally retry a rejected step on the larger model
+        model = self.router.escalation_model
+        if model:
+            self.metrics.record_metric("model_escalation", 1, "count", {"model": model})
+        return model
+
+    def _mask_unsafe(self, result: Any) -> Any:
+        # Safety Check (Output)
+        if not self.safety.validate_output(str(result)):
+            logger.warning("Safety violation in step output. masking.")
+            return "[REDACTED]"
+        return result
+
     # --- Cognitive Stages ---
 
-    def _observe(self, request: str, session_id: str) -> Dict[str, Any]:
+    def _observe(self, request: str, session_id: str, recall: Future) -> Dict[str, Any]:
         logger.info("Stage: OBSERVE")
-        # Store current request
-        self.memory.process_request({
-            "action": "store",
-            "payload": {"content": request, "type": "USER_REQUEST", "session_id": session_id}
-        })
-        # Recall relevant context
-        context = self.memory.process_request({
+        # Store current request (in the background)
+        self._store_memory(request, "USER_REQUEST", session_id)
+        # Recall relevant context, started before the safety check
+        return self._await_memory(recall)
+
+    async def _aobserve(self, request: str, session_id: str, recall: Future) -> Dict[str, Any]:
+        logger.info("Stage: OBSERVE")
+        await self._astore_memory(request, "USER_REQUEST", session_id)
+        return await self._aawait_memory(recall)
+
+    # --- Memory I/O off the critical path ---
+    # Background memory work records "memory_io" and the time a session spends
+    # blocked on it records "memory_wait"; the difference is latency removed from
+    # the session (see MetricsTracker.get_summary).
+
+    def _start_recall(self, request: str, session_id: str) -> Future:
+        return self.memory_recall.submit(self._timed_memory_request, {
              "action": "search",
-             "payload": {"query": request}
+             "payload": {"query": request, "session_id": session_id, "user_id": self._session_users.get(session_id)}
         })
-        return context
+
+    def _store_memory(self, content: str, type_: str, session_id: str):
+        self._track_write(
+            self.memory_writes.submit(self._timed_memory_request, self._store_request(content, type_, session_id))
+        )
+
+    async def _astore_memory(self, content: str, type_: str, session_id: str):
+        self._track_write(
+            await self.memory_writes.asubmit(self._timed_memory_request, self._store_request(content, type_, session_id))
+        )
+
+    def _track_write(self, future: Future):
+        with self._pending_lock:
+            self._pending_writes.add(future)
+        future.add_done_callback(self._untrack_write)
+
+    def _untrack_write(self, future: Future):
+        with self._pending_lock:
+            self._pending_writes.discard(future)
+
+    def _timed_memory_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.time()
+        try:
+            return self.memory.process_request(request)
+        finally:
+            self.metrics.record_metric("memory_io", time.time() - started, "seconds", {"action": request["action"]})
+
+    def _await_memory(self, future: Future) -> Any:
+        timer_id = f"memory_wait_{uuid.uuid4().hex[:8]}"
+        self.metrics.start_timer(timer_id)
+        try:
+            return future.result()
+        finally:
+            self.metrics.stop_timer(timer_id, "memory_wait")
+
+    async def _aawait_memory(self, future: Future) -> Any:
+        timer_id = f"memory_wait_{uuid.uuid4().hex[:8]}"
+        self.metrics.start_timer(timer_id)
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            self.metrics.stop_timer(timer_id, "memory_wait")
 
     def _think(self, request: str, context: Any) -> str:
         logger.info("Stage: THINK")
-        messages = [
+        return self.llm.chat_completion(self._think_messages(request, context), model=self._model("think"))
+
+    async def _athink(self, request: str, context: Any) -> str:
+        logger.info("Stage: THINK")
+        return await self.llm.achat_completion(self._think_messages(request, context), model=self._model("think"))
+
+    def _model(self, stage: str) -> str:
+        return self.router.resolve(self.agent_id, stage)
+
+    def _think_messages(self, request: str, context: Any) -> List[Dict[str, str]]:
+        return [
             {"role": "system", "content": "Analyze the user's request and context. Identify key intents."},
             {"role": "user", "content": f"Request: {request}. Context: {context}"}
         ]
-        return self.llm.chat_completion(messages)
 
     def _plan(self, request: str, analysis: str) -> List[Dict[str, Any]]:
         logger.info("Stage: PLAN")
+        plan = self.llm.generate_structured_response(
+            self._plan_messages(request, analysis), PLAN_SCHEMA, model=self._model("plan")
+        )
+        return self._validated_plan(request, plan)
+
+    async def _aplan(self, request: str, analysis: str) -> List[Dict[str, Any]]:
+        logger.info("Stage: PLAN")
+        plan = await self.llm.agenerate_structured_response(
+            self._plan_messages(request, analysis), PLAN_SCHEMA, model=self._model("plan")
+        )
+        return self._validated_plan(request, plan)
+
+    def _plan_messages(self, request: str, analysis: str) -> List[Dict[str, str]]:
         # Use the analysis to guide planning
-        messages = [
+        return [
             {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": f"Create a step-by-step plan for: {request}\nAnalysis: {analysis}"}
+            {"role": "user", "content": (
+                f"Create a step-by-step plan for: {request}\nAnalysis: {analysis}\n"
+                "List in depends_on the ids of the steps whose output each step needs; "
+                "steps without dependencies run in parallel."
+            )}
         ]
-        schema = "List[{\"id\": int, \"task\": str, \"worker\": str}]"
-        plan = self.llm.generate_structured_response(messages, schema)
-        
+
+    def _validated_plan(self, request: str, plan: Any) -> List[Dict[str, Any]]:
         # Fallback
         if not plan:
             return self._mock_plan(request)
         return plan if isinstance(plan, list) else []
 
-    def _act(self, step: Dict[str, Any], session_id: str) -> Any:
+    def _act(self, step: Dict[str, Any], session_id: str, context: Dict[str, Any] = None,
+             model: Optional[str] = None) -> Any:
         logger.info(f"Stage: ACT (Task: {step['task']})")
-        worker_id = step.get('worker')
-        worker = self.workers.get(worker_id) or self.workers.get("worker_research")
-        
-        self.metrics.start_timer("step_latency")
-        result = worker.execute_task(step['task'])
-        self.metrics.stop_timer("step_latency")
-        
+        worker = self._select_worker(step)
+
+        # Timer ids are per step since steps may run concurrently
+        timer_id = self._step_timer_id(step)
+        self.metrics.start_timer(timer_id)
+        result = worker.execute_task(step['task'], context, model=model)
+        self.metrics.stop_timer(timer_id)
+
         self._store_result(session_id, step['task'], result)
         return result
 
+    async def _aact(self, step: Dict[str, Any], session_id: str, context: Dict[str, Any] = None,
+                    model: Optional[str] = None) -> Any:
+        logger.info(f"Stage: ACT (Task: {step['task']})")
+        worker = self._select_worker(step)
+
+        timer_id = self._step_timer_id(step)
+        self.metrics.start_timer(timer_id)
+        result = await worker.aexecute_task(step['task'], context, model=model)
+        self.metrics.stop_timer(timer_id)
+
+        await self._astore_memory(str(result), "TASK_RESULT", session_id)
+        return result
+
+    def _select_worker(self, step: Dict[str, Any]):
+        worker_id = step.get('worker')
+        return self.workers.get(worker_id) or self.workers.get("worker_research")
+
+    def _step_timer_id(self, step: Dict[str, Any]) -> str:
+        return f"step_latency_{step.get('id')}_{uuid.uuid4().hex[:8]}"
+
     def _evaluate(self, step: Dict[str, Any], result: Any) -> Dict[str, Any]:
         logger.info("Stage: EVALUATE")
         return self.critic.review_task(step['task'], result)
 
+    async def _aevaluate(self, step: Dict[str, Any], result: Any) -> Dict[str, Any]:
+        logger.info("Stage: EVALUATE")
+        return await self.critic.areview_task(step['task'], result)
+
     def _store_result(self, session_id, task, result):
-        self.memory.process_request({
-            "action": "store", 
+        self._store_memory(str(result), "TASK_RESULT", session_id)
+
+    def _store_request(self, content: str, type_: str, session_id: str) -> Dict[str, Any]:
+        return {
+            "action": "store",
             "payload": {
-                "content": str(result), 
-                "type": "TASK_RESULT", 
-                "session_id": session_id
+                "content": content,
+                "type": type_,
+                "session_id": session_id,
+                "user_id": self._session_users.get(session_id)
             }
-        })
+        }
 
     def _synthesize_response(self, request: str, results: List[Any]) -> str:
-        messages = [
+        return self.llm.chat_completion(self._synthesis_messages(request, results), model=self._model("synthesize"))
+
+    async def _asynthesize_response(self, request: str, results: List[Any]) -> str:
+        return await self.llm.achat_completion(
+            self._synthesis_messages(request, results), model=self._model("synthesize")
+        )
+
+    def _synthesis_messages(self, request: str, results: List[Any]) -> List[Dict[str, str]]:
+        return [
             {"role": "system", "content": "Synthesize a helpful answer from the tool outputs."},
             {"role": "user", "content": f"Request: {request}. Tool Outputs: {results}"}
         ]
-        return self.llm.chat_completion(messages)
 
     def _mock_plan(self, request: str) -> List[Dict[str, str]]:
         plan = []
         req_lower = request.lower()
         if "research" in req_lower or "find" in req_lower:
-             plan.append({"id": 1, "task": request, "worker": "worker_research"})
+             plan.append({"id": 1, "task": request, "worker": "worker_research", "depends_on": []})
         if "code" in req_lower or "script" in req_lower:
-             plan.append({"id": 2, "task": f"Write code for {request}", "worker": "worker_coder"})
+             # Code builds on the research findings when both are requested
+             depends_on = [1] if plan else []
+             plan.append({"id": 2, "task": f"Write code for {request}", "worker": "worker_coder", "depends_on": depends_on})
         if not plan:
-             plan.append({"id": 1, "task": request, "worker": "worker_research"})
+             plan.append({"id": 1, "task": request, "worker": "worker_research", "depends_on": []})
         return plan
@@ -1,17 +1,19 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .workers import BaseWorker
 from ..core.llm_provider import LLMProvider
+from ..core.model_router import ModelRouter
 
 class PlannerAgent(BaseWorker):
     """
     Specialized Planner Agent responsible for breaking down complex goals 
     into a structured Directed Acyclic Graph (DAG) of tasks.
     """
-    def __init__(self, config: Dict[str, Any]):
-        # BaseWorker init will handle config, name, role, llm, tools, and system prompt loading
-        super().__init__(config)
+    def __init__(self, config: Dict[str, Any], router: Optional[ModelRouter] = None):
+        # BaseWorker init will handle config, name, role, llm, router, tools, and system prompt loading
+        super().__init__(config, router)
     
-    def execute_task(self, task_description: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+    def execute_task(self, task_description: str, context: Dict[str, Any] = None,
+                     model: Optional[str] = None) -> Dict[str, Any]:
         """
         Decomposes a goal into a plan.
         Input task: 'Build a game'
@@ -26,7 +28,7 @@ class PlannerAgent(BaseWorker):
         response = self.llm.chat_completion([
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
-        ])
+        ], model=self._stage_model("plan", model))
         
         # In a real implementation, we would parse the JSON plan from the LLM response.
         return {
@@ -1,15 +1,18 @@
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, List, Optional
 from anti_gravity_system.src.core.llm_provider import LLMProvider
+from anti_gravity_system.src.core.model_router import ModelRouter
 from anti_gravity_system.src.core.tools import ToolRegistry, BaseTool
 from anti_gravity_system.src.utils.logger import logger
 from anti_gravity_system.src.utils.prompt_loader import load_system_prompts
 
 class BaseWorker:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], router: Optional[ModelRouter] = None):
         self.config = config
         self.name = config['name']
         self.role = config['role']
         self.llm = LLMProvider()
+        self.router = router or ModelRouter(agents_config=[config])
         self.tools = ToolRegistry()
         
         # Load specific prompt based on ID mapping
@@ -25,11 +28,40 @@ class BaseWorker:
         
         logger.info(f"Worker initialized: {self.name} ({self.role})")
 
-    def execute_task(self, task_description: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+    def execute_task(self, task_description: str, context: Dict[str, Any] = None,
+                     model: Optional[str] = None) -> Dict[str, Any]:
         raise NotImplementedError
 
+    async def aexecute_task(self, task_description: str, context: Dict[str, Any] = None,
+                            model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Async entry point. Workers without a native implementation run the blocking
+        version on a worker thread so the event loop stays free.
+        """
+        return await asyncio.to_thread(self.execute_task, task_description, context, model)
+
+    def _stage_model(self, stage: str, model: Optional[str] = None) -> str:
+        """
+        Model for one of this worker's stages. `model` overrides the routing; the
+        orchestrator passes its escalation model when retrying a rejected step.
+        Never read from `context`, which API callers supply.
+        """
+        return model or self.router.resolve(self.config.get('id', ''), stage)
+
+    def _upstream_context(self, context: Dict[str, Any] = None) -> str:
+        """
+        Renders results of the plan steps this task depends on, if any.
+        """
+        upstream = (context or {}).get("upstream_results")
+        if not upstream:
+            return ""
+        return "\n\nResults from previous steps:\n" + "\n".join(
+            f"- Step {step_id}: {result}" for step_id, result in upstream.items()
+        )
+
 class ResearchWorker(BaseWorker):
-    def execute_task(self, task_description: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+    def execute_task(self, task_description: str, context: Dict[str, Any] = None,
+                     model: Optional[str] = None) -> Dict[str, Any]:
         logger.info(f"[{self.name}] Researching: {task_description}")
         
         # In a real agent, LLM would choose the tool. Here we hardcode for the MVP flow.
@@ -37,35 +69,80 @@ class ResearchWorker(BaseWorker):
         result = search_tool.execute(query=task_description)
         
         # Summarize with LLM (mocked)
-        summary = self.llm.chat_completion([
-            {"role": "system", "content": "Summarize these search results."},
-            {"role": "user", "content": result.output}
-        ])
+        summary = self.llm.chat_completion(
+            self._summary_messages(result.output, context), model=self._stage_model("summarize", model)
+        )
         
         return {"status": "success", "output": summary, "source_tool": "web_search"}
 
+    async def aexecute_task(self, task_description: str, context: Dict[str, Any] = None,
+                            model: Optional[str] = None) -> Dict[str, Any]:
+        logger.info(f"[{self.name}] Researching: {task_description}")
+
+        search_tool = self.tools.get_tool("web_search")
+        result = await asyncio.to_thread(search_tool.execute, query=task_description)
+
+        summary = await self.llm.achat_completion(
+            self._summary_messages(result.output, context), model=self._stage_model("summarize", model)
+        )
+
+        return {"status": "success", "output": summary, "source_tool": "web_search"}
+
+    def _summary_messages(self, search_output: str, context: Dict[str, Any] = None) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": "Summarize these search results."},
+            {"role": "user", "content": search_output + self._upstream_context(context)}
+        ]
+
 class CodingWorker(BaseWorker):
-    def execute_task(self, task_description: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+    def execute_task(self, task_description: str, context: Dict[str, Any] = None,
+                     model: Optional[str] = None) -> Dict[str, Any]:
         logger.info(f"[{self.name}] Coding: {task_description}")
         
         # 1. Generate Code using LLM
-        prompt = f"Write python code for: {task_description}"
-        code_response = self.llm.chat_completion([
+        code_response = self.llm.chat_completion(
+            self._code_messages(task_description, context), model=self._stage_model("code", model)
+        )
+        code = self._extract_code(code_response)
+
+        # 2. Execute Code
+        exec_tool = self.tools.get_tool("code_execute")
+        exec_result = exec_tool.execute(code=code)
+        
+        return self._result(code, exec_result)
+
+    async def aexecute_task(self, task_description: str, context: Dict[str, Any] = None,
+                            model: Optional[str] = None) -> Dict[str, Any]:
+        logger.info(f"[{self.name}] Coding: {task_description}")
+
+        code_response = await self.llm.achat_completion(
+            self._code_messages(task_description, context), model=self._stage_model("code", model)
+        )
+        code = self._extract_code(code_response)
+
+        # Sandboxed execution is a blocking subprocess call
+        exec_tool = self.tools.get_tool("code_execute")
+        exec_result = await asyncio.to_thread(exec_tool.execute, code=code)
+
+        return self._result(code, exec_result)
+
+    def _code_messages(self, task_description: str, context: Dict[str, Any] = None) -> List[Dict[str, str]]:
+        prompt = f"Write python code for: {task_description}" + self._upstream_context(context)
+        return [
             {"role": "system", "content": "You are a coding expert. Output only valid python code."},
             {"role": "user", "content": prompt}
-        ])
-        
+        ]
+
+    def _extract_code(self, code_response: str) -> str:
         # Extract code from markdown blocks if present
         code = code_response
         if "```python" in code:
             code = code.split("```python")[1].split("```")[0].strip()
         elif "```" in code:
             code = code.split("```")[1].split("```")[0].strip()
+        return code
 
-        # 2. Execute Code
-        exec_tool = self.tools.get_tool("code_execute")
-        exec_result = exec_tool.execute(code=code)
-        
+    def _result(self, code: str, exec_result) -> Dict[str, Any]:
         return {
             "status": "success" if exec_result.status == "success" else "failure",
             "code_generated": code,
@@ -78,7 +155,7 @@ from .planner import PlannerAgent
 
 class WorkerFactory:
     @staticmethod
-    def create_worker(config: Dict[str, Any]) -> BaseWorker:
+    def create_worker(config: Dict[str, Any], router: Optional[ModelRouter] = None) -> BaseWorker:
         role_map = {
             "worker_research": ResearchWorker,
             "worker_coder": CodingWorker,
@@ -96,4 +173,4 @@ class WorkerFactory:
         elif "planner" in worker_id:
             worker_class = PlannerAgent
             
-        return worker_class(config)
+        return worker_class(config, router)
@@ -0,0 +1,223 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, List, Optional
+
+from anti_gravity_system.src.core.metrics import POOL_CHECKOUT_WAIT, POOL_AVAILABLE
+from anti_gravity_system.src.utils.logger import logger
+
+
+class PoolExhaustedError(RuntimeError):
+    """Raised when no pooled agent becomes available within the checkout timeout."""
+
+
+class AgentPool:
+    """
+    Fixed-size pool of pre-warmed agents.
+
+    Building an agent graph (memory store, critic, workers, LLM clients) is far more
+    expensive than running a mock-mode turn, so instances are created once and
+    checked out per request. On check-in the agent's per-session state is reset
+    via its `reset()` method before it becomes available again.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 2, name: str = "orchestrator",
+                 checkout_timeout: float = 30.0):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.factory = factory
+        self.size = size
+        self.name = name
+        self.checkout_timeout = checkout_timeout
+        # LIFO keeps the most recently used (hottest) instance in front
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._members: List[Any] = []
+        self._lock = threading.Lock()
+        # Coroutines blocked in acheckout(); a checked-in agent goes to the oldest
+        # first. Guarded by _handoff_lock together with the put into _idle, so an
+        # agent cannot land in _idle while a coroutine waits.
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._handoff_lock = threading.Lock()
+        self._started = False
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """
+        Pre-warms the pool. Safe to call more than once.
+        """
+        with self._lock:
+            if self._started:
+                return
+            start = time.time()
+            for _ in range(self.size):
+                agent = self.factory()
+                self._members.append(agent)
+                self._idle.put(agent)
+            self._started = True
+            POOL_AVAILABLE.labels(pool=self.name).set(self._idle.qsize())
+            logger.info(f"AgentPool '{self.name}' warmed {self.size} agents in {time.time() - start:.2f}s")
+
+    def shutdown(self):
+        """
+        Closes every pooled agent. Agents still checked out are closed as well.
+        """
+        with self._lock:
+            for agent in self._members:
+                self._close_agent(agent)
+            self._members = []
+            self._idle = queue.LifoQueue()
+            self._started = False
+            POOL_AVAILABLE.labels(pool=self.name).set(0)
+            logger.info(f"AgentPool '{self.name}' shut down")
+
+    # --- Checkout / Checkin ---
+
+    def checkout(self, timeout: Optional[float] = None) -> Any:
+        if not self._started:
+            # Covers callers that never ran the startup hook (e.g. TestClient without lifespan)
+            self.start()
+
+        wait_start = time.time()
+        try:
+            agent = self._idle.get(timeout=self.checkout_timeout if timeout is None else timeout)
+        except queue.Empty:
+            raise PoolExhaustedError(f"No '{self.name}' agent available after {time.time() - wait_start:.1f}s")
+        finally:
+            POOL_CHECKOUT_WAIT.labels(pool=self.name).observe(time.time() - wait_start)
+
+        POOL_AVAILABLE.labels(pool=self.name).set(self._idle.qsize())
+        return agent
+
+    async def acheckout(self, timeout: Optional[float] = None) -> Any:
+        """
+        Event-loop friendly checkout: no thread is held while the pool is
+        contended. The coroutine waits on a future that the next checkin resolves
+        with an agent; if it is cancelled or times out after an agent was handed
+        over, the agent goes back to the pool.
+        """
+        if not self._started:
+            await asyncio.to_thread(self.start)
+
+        wait_start = time.time()
+        loop = asyncio.get_running_loop()
+        with self._handoff_lock:
+            try:
+                agent = self._idle.get_nowait()
+            except queue.Empty:
+                waiter = loop.create_future()
+                self._waiters.append(waiter)
+            else:
+                waiter = None
+        if waiter is None:
+            POOL_CHECKOUT_WAIT.labels(pool=self.name).observe(0.0)
+            POOL_AVAILABLE.labels(pool=self.name).set(self._idle.qsize())
+            return agent
+
+        try:
+            # asyncio.wait, not wait_for: it leaves the waiter alone on timeout and
+            # never swallows a cancellation that lands after the waiter resolved
+            await asyncio.wait({waiter}, timeout=self.checkout_timeout if timeout is None else timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.labels(pool=self.name).observe(time.time() - wait_start)
+        if not waiter.done():
+            self._abandon(waiter)
+            raise PoolExhaustedError(f"No '{self.name}' agent available after {time.time() - wait_start:.1f}s")
+        return waiter.result()
+
+    def checkin(self, agent: Any):
+        try:
+            reset = getattr(agent, "reset", None)
+            if reset:
+                reset()
+        except Exception as e:
+            # A broken instance must not leak state into the next session; replace it.
+            logger.error(f"AgentPool '{self.name}' reset failed, replacing agent: {e}")
+            agent = self._replace(agent)
+
+        self._release(agent)
+
+    async def acheckin(self, agent: Any):
+        """
+        checkin() for the event loop: an agent's `areset()` is awaited, a plain
+        `reset()` runs on a worker thread, so waiting on its background work does
+        not block the loop.
+        """
+        areset = getattr(agent, "areset", None)
+        if areset is None:
+            await asyncio.to_thread(self.checkin, agent)
+            return
+        try:
+            await areset()
+        except Exception as e:
+            logger.error(f"AgentPool '{self.name}' reset failed, replacing agent: {e}")
+            agent = await asyncio.to_thread(self._replace, agent)
+        self._release(agent)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        agent = self.checkout(timeout)
+        try:
+            yield agent
+        finally:
+            self.checkin(agent)
+
+    @property
+    def available(self) -> int:
+        return self._idle.qsize()
+
+    def _release(self, agent: Any):
+        # Hands a clean agent to the oldest waiting coroutine, else makes it idle
+        with self._handoff_lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.done():
+                    continue
+                try:
+                    waiter.get_loop().call_soon_threadsafe(self._deliver, waiter, agent)
+                except RuntimeError:
+                    # The waiter's loop has closed
+                    continue
+                return
+            self._idle.put(agent)
+        POOL_AVAILABLE.labels(pool=self.name).set(self._idle.qsize())
+
+    def _abandon(self, waiter: asyncio.Future):
+        with self._handoff_lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        # A hand-over still in flight finds the waiter cancelled and puts the agent
+        # back; one that already landed is undone here
+        if not waiter.cancel():
+            self._release(waiter.result())
+
+    def _deliver(self, waiter: asyncio.Future, agent: Any):
+        # Runs on the waiter's loop, so it cannot race the waiter's cancellation
+        if waiter.done():
+            self._release(agent)
+        else:
+            waiter.set_result(agent)
+
+    def _replace(self, agent: Any) -> Any:
+        self._close_agent(agent)
+        with self._lock:
+            if agent in self._members:
+                self._members.remove(agent)
+            agent = self.factory()
+            self._members.append(agent)
+        return agent
+
+    def _close_agent(self, agent: Any):
+        close = getattr(agent, "close", None)
+        if not close:
+            return
+        try:
+            close()
+        except Exception as e:
+            logger.error(f"AgentPool '{self.name}' failed to close agent: {e}")
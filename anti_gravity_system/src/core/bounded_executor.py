@@ -0,0 +1,158 @@
+import os
+import queue
+import atexit
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from anti_gravity_system.src.core.metrics import BACKGROUND_QUEUE_DEPTH, BACKGROUND_BACKPRESSURE, BACKGROUND_TASK_ERRORS
+from anti_gravity_system.src.utils.logger import logger
+
+
+class BoundedExecutor:
+    """
+    Worker threads fed from a bounded FIFO queue, for fire-and-forget I/O that
+    must not sit on the request path but must not pile up without limit either.
+
+    When the queue is full, submit() waits up to `put_timeout` for room and then
+    runs the task on the caller's thread: producers slow down to the rate the
+    workers sustain instead of dropping work or growing memory. With one worker
+    tasks complete in submission order.
+    """
+
+    def __init__(self, name: str, workers: int = 1, max_queue: int = 1000, put_timeout: float = 1.0):
+        self.name = name
+        self.put_timeout = put_timeout
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_queue)
+        self._shutdown = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        future: Future = Future()
+        task = (future, fn, args, kwargs)
+        if self._shutdown:
+            self._run(task)
+            return future
+        try:
+            self._queue.put_nowait(task)
+        except queue.Full:
+            try:
+                self._queue.put(task, timeout=self.put_timeout)
+                BACKGROUND_BACKPRESSURE.labels(executor=self.name, outcome="waited").inc()
+            except queue.Full:
+                BACKGROUND_BACKPRESSURE.labels(executor=self.name, outcome="inline").inc()
+                self._run(task)
+                return future
+        BACKGROUND_QUEUE_DEPTH.labels(executor=self.name).set(self._queue.qsize())
+        return future
+
+    async def asubmit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        submit() for coroutines: enqueues without blocking the event loop, and waits
+        out backpressure on a worker thread.
+        """
+        if self._shutdown:
+            return self.submit(fn, *args, **kwargs)
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((future, fn, args, kwargs))
+        except queue.Full:
+            return await asyncio.to_thread(self.submit, fn, *args, **kwargs)
+        BACKGROUND_QUEUE_DEPTH.labels(executor=self.name).set(self._queue.qsize())
+        return future
+
+    def _work(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                self._run(task)
+            finally:
+                self._queue.task_done()
+                BACKGROUND_QUEUE_DEPTH.labels(executor=self.name).set(self._queue.qsize())
+
+    def _run(self, task: tuple):
+        future, fn, args, kwargs = task
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            BACKGROUND_TASK_ERRORS.labels(executor=self.name).inc()
+            logger.error(f"Background task in '{self.name}' failed: {e}")
+            future.set_exception(e)
+
+    def drain(self):
+        """
+        Blocks until every task submitted so far has finished.
+        """
+        self._queue.join()
+
+    def shutdown(self):
+        if self._shutdown:
+            return
+        self._shutdown = True
+        # Queued tasks still run; the sentinels go in behind them
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+_executors: Dict[str, BoundedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(name: str, workers: int, max_queue: int, put_timeout: float) -> BoundedExecutor:
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = _executors[name] = BoundedExecutor(name, workers, max_queue, put_timeout)
+        return executor
+
+
+def get_memory_write_executor() -> BoundedExecutor:
+    """
+    Process-wide executor for memory stores. One worker by default so a session's
+    items are stored in the order they were produced.
+
+    MEMORY_WRITE_WORKERS        worker threads (default 1)
+    MEMORY_WRITE_QUEUE_SIZE     queued writes before producers feel backpressure (default 1000)
+    MEMORY_WRITE_QUEUE_TIMEOUT  seconds a producer waits for room before writing inline (default 1)
+    """
+    return _get_executor(
+        "memory_write",
+        workers=int(os.getenv("MEMORY_WRITE_WORKERS", "1")),
+        max_queue=int(os.getenv("MEMORY_WRITE_QUEUE_SIZE", "1000")),
+        put_timeout=float(os.getenv("MEMORY_WRITE_QUEUE_TIMEOUT", "1"))
+    )
+
+
+def get_memory_recall_executor() -> BoundedExecutor:
+    """
+    Process-wide executor for recall searches started ahead of the stages that need them.
+
+    MEMORY_RECALL_WORKERS        worker threads (default 4)
+    MEMORY_RECALL_QUEUE_SIZE     queued searches before callers feel backpressure (default 100)
+    MEMORY_RECALL_QUEUE_TIMEOUT  seconds a caller waits for room before searching inline (default 1)
+    """
+    return _get_executor(
+        "memory_recall",
+        workers=int(os.getenv("MEMORY_RECALL_WORKERS", "4")),
+        max_queue=int(os.getenv("MEMORY_RECALL_QUEUE_SIZE", "100")),
+        put_timeout=float(os.getenv("MEMORY_RECALL_QUEUE_TIMEOUT", "1"))
+    )
+
+
+@atexit.register
+def _shutdown_executors():
+    # Queued memory writes still reach the stores: a write-behind buffer that has
+    # already been closed at exit writes straight through
+    for executor in list(_executors.values()):
+        executor.shutdown()
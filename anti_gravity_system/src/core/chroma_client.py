@@ -0,0 +1,199 @@
+import os
+import time
+import atexit
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+import chromadb
+from chromadb.config import DEFAULT_DATABASE, Settings
+from chromadb.errors import ChromaError, NotFoundError
+
+from anti_gravity_system.src.core.metrics import CHROMA_REQUEST_RETRIES, CHROMA_FALLBACKS
+from anti_gravity_system.src.utils.logger import logger
+
+FALLBACKS = ("local", "none")
+
+# Statuses a Chroma server (or the proxy in front of it) returns while restarting
+# or overloaded; the request can be sent again
+RETRY_STATUSES = {502, 503, 504}
+
+
+class RetryTransport(httpx.BaseTransport):
+    """
+    Resends a request that failed in transport (refused, reset, timed out) or got a
+    502/503/504, up to `retries` times with exponential backoff. Safe for the calls
+    the stores make: upserts, deletes and reads are idempotent, and add() of an id
+    that already landed is ignored by Chroma.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, retries: int = 3, backoff: float = 0.2):
+        self.transport = transport
+        self.retries = retries
+        self.backoff = backoff
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError as e:
+                if last:
+                    raise
+                reason = type(e).__name__
+            else:
+                if response.status_code not in RETRY_STATUSES or last:
+                    return response
+                response.close()
+                reason = str(response.status_code)
+            CHROMA_REQUEST_RETRIES.labels(reason=reason).inc()
+            time.sleep(self.backoff * 2 ** attempt)
+
+    def close(self):
+        self.transport.close()
+
+
+# One HTTP connection pool per server, shared by every client in the process
+_sessions: Dict[Tuple[str, int, bool], httpx.Client] = {}
+_sessions_lock = threading.Lock()
+
+
+def database_name(tenant_id: Optional[str]) -> str:
+    # Chroma database names are restricted; user ids are not
+    if tenant_id is None:
+        return DEFAULT_DATABASE
+    return "tenant_" + hashlib.sha256(tenant_id.encode("utf-8")).hexdigest()[:32]
+
+
+class ChromaConnector:
+    """
+    Opens the Chroma client a MemoryStore keeps its vectors in: an embedded
+    PersistentClient under the store's directory, or, when `host` is set, the Chroma
+    server there, so replicas share one index instead of each holding a diverging
+    copy in its own RAM.
+
+    Only vectors move to the server. The SQLite metadata (session history, the FTS
+    index behind lexical search, dedup hit counts, retention state) stays in each
+    replica's store directory, so a replica's history and lexical results only
+    cover the writes it made itself; route a user's requests to one replica or put
+    the store directories on a shared volume.
+
+    Remote clients in a process share one pooled HTTP session per server, with
+    `timeout` per request and `retries` on transport errors. A tenant store gets its
+    own Chroma database, created on first use, since tenant shards reuse collection
+    names. If the server cannot be reached when a store opens, fallback "none" (the
+    default) raises; "local" opens the embedded client instead, with a warning.
+    A store that fell back keeps its private index until it is reopened, and what
+    it writes there never reaches the server, so only use "local" where a diverged
+    replica is preferable to a failed request.
+    """
+
+    def __init__(self, host: Optional[str] = None, port: int = 8000, ssl: bool = False, timeout: float = 10.0,
+                 retries: int = 3, max_connections: int = 20, fallback: str = "none"):
+        if fallback not in FALLBACKS:
+            raise ValueError(f"Unknown Chroma fallback {fallback!r}; expected one of {FALLBACKS}")
+        self.host = host
+        self.port = port
+        self.ssl = ssl
+        self.timeout = timeout
+        self.retries = retries
+        self.max_connections = max_connections
+        self.fallback = fallback
+
+    @classmethod
+    def from_env(cls) -> "ChromaConnector":
+        """
+        CHROMA_HOST             Chroma server host; unset keeps the embedded client
+        CHROMA_PORT             server port (default 8000)
+        CHROMA_SSL              "true" for https
+        CHROMA_TIMEOUT          seconds per request (default 10)
+        CHROMA_RETRIES          resends of a failed request (default 3)
+        CHROMA_MAX_CONNECTIONS  pooled connections to the server (default 20)
+        CHROMA_FALLBACK         none | local: what to do when the server is unreachable (default none)
+        """
+        return cls(
+            host=os.getenv("CHROMA_HOST") or None,
+            port=int(os.getenv("CHROMA_PORT", "8000")),
+            ssl=os.getenv("CHROMA_SSL", "false").lower() == "true",
+            timeout=float(os.getenv("CHROMA_TIMEOUT", "10")),
+            retries=int(os.getenv("CHROMA_RETRIES", "3")),
+            max_connections=int(os.getenv("CHROMA_MAX_CONNECTIONS", "20")),
+            fallback=os.getenv("CHROMA_FALLBACK", "none")
+        )
+
+    @property
+    def remote(self) -> bool:
+        return self.host is not None
+
+    def connect(self, persist_dir: str, tenant_id: Optional[str] = None):
+        if not self.remote:
+            return self.local(persist_dir)
+        try:
+            return self._remote(database_name(tenant_id))
+        except Exception as e:
+            if self.fallback == "none":
+                raise
+            CHROMA_FALLBACKS.inc()
+            logger.warning(f"Chroma server {self.host}:{self.port} unreachable ({e}); using the local index in {persist_dir}")
+            return self.local(persist_dir)
+
+    @staticmethod
+    def local(persist_dir: str):
+        return chromadb.PersistentClient(path=os.path.join(persist_dir, "chroma"))
+
+    def _remote(self, database: str):
+        admin = chromadb.AdminClient(self._settings())
+        self._pool(admin)
+        # Also the reachability check: it goes through the pooled session, so an
+        # unreachable server fails within the timeout and retries
+        try:
+            admin.get_database(database)
+        except NotFoundError:
+            try:
+                admin.create_database(database)
+            except ChromaError:
+                # Another replica created it first
+                admin.get_database(database)
+        client = chromadb.HttpClient(host=self.host, port=self.port, ssl=self.ssl, settings=self._settings(),
+                                     database=database)
+        self._pool(client)
+        return client
+
+    def _settings(self) -> Settings:
+        return Settings(chroma_server_host=self.host, chroma_server_http_port=self.port,
+                        chroma_server_ssl_enabled=self.ssl, chroma_api_impl="chromadb.api.fastapi.FastAPI")
+
+    def _pool(self, client):
+        # Chroma gives every client its own httpx session; swap it for the shared one
+        server = client._server
+        session = self._session(server)
+        if server._session is not session:
+            server._session.close()
+            server._session = session
+
+    def _session(self, server) -> httpx.Client:
+        key = (self.host, self.port, self.ssl)
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                limits = httpx.Limits(max_connections=self.max_connections,
+                                      max_keepalive_connections=self.max_connections,
+                                      keepalive_expiry=server.http_limits.keepalive_expiry)
+                # Headers (content type, user agent, auth) as Chroma set them on its own session
+                session = _sessions[key] = httpx.Client(
+                    timeout=self.timeout,
+                    transport=RetryTransport(httpx.HTTPTransport(limits=limits), retries=self.retries),
+                    headers=server._session.headers
+                )
+            return session
+
+
+def _close_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+atexit.register(_close_sessions)
@@ -0,0 +1,234 @@
+import os
+import time
+import atexit
+import threading
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from anti_gravity_system.src.core.metrics import (
+    EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_LATENCY, EMBEDDING_TEXTS, EMBEDDING_THROUGHPUT
+)
+from anti_gravity_system.src.utils.logger import logger
+
+EMBEDDERS = ("onnx", "openai")
+POOLS = ("thread", "process")
+
+DEFAULT_MODELS = {
+    # Chroma's default embedding function, run here directly
+    "onnx": "all-MiniLM-L6-v2",
+    "openai": "text-embedding-3-small",
+}
+
+
+class Embedder(ABC):
+    """
+    Texts in, one float32 vector per text out, in order. `model` names the vector
+    space: the embedding cache and memory exports are keyed by it.
+    """
+
+    model: str
+
+    @abstractmethod
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        ...
+
+
+class OnnxEmbedder(Embedder):
+    """
+    all-MiniLM-L6-v2 on the ONNX runtime, CPU only. The model is downloaded on first
+    use; onnxruntime releases the GIL, so batches run in parallel on threads.
+    """
+
+    def __init__(self, model: str = DEFAULT_MODELS["onnx"]):
+        if model != DEFAULT_MODELS["onnx"]:
+            raise ValueError(f"The ONNX embedder only ships {DEFAULT_MODELS['onnx']}, not {model!r}")
+        from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+        self.model = model
+        self._model = ONNXMiniLM_L6_V2(preferred_providers=["CPUExecutionProvider"])
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        return [np.asarray(v, dtype=np.float32) for v in self._model(input)]
+
+
+class OpenAIEmbedder(Embedder):
+    """
+    The OpenAI embeddings endpoint (or a compatible one at OPENAI_BASE_URL), over
+    the pooled client shared with the LLM providers. One request per batch.
+    """
+
+    def __init__(self, model: str = DEFAULT_MODELS["openai"], api_key: Optional[str] = None,
+                 base_url: Optional[str] = None):
+        from anti_gravity_system.src.core.llm_clients import get_client_registry
+
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("The OpenAI embedder needs OPENAI_API_KEY")
+        self.model = model
+        self.client = get_client_registry().get_client(api_key, base_url or os.getenv("OPENAI_BASE_URL"), model)
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        response = self.client.embeddings.create(model=self.model, input=input)
+        return [np.asarray(d.embedding, dtype=np.float32) for d in sorted(response.data, key=lambda d: d.index)]
+
+
+def create_embedder(kind: str, model: Optional[str] = None) -> Embedder:
+    if kind == "onnx":
+        return OnnxEmbedder(model or DEFAULT_MODELS["onnx"])
+    if kind == "openai":
+        return OpenAIEmbedder(model or DEFAULT_MODELS["openai"])
+    raise ValueError(f"Unknown embedder {kind!r}; expected one of {EMBEDDERS}")
+
+
+# The embedder a process-pool worker built at start-up
+_worker_embedder: Optional[Embedder] = None
+
+
+def _init_worker(factory: Callable[[], Embedder]):
+    global _worker_embedder
+    _worker_embedder = factory()
+
+
+def _timed(embedder: Embedder, texts: List[str]) -> Tuple[List[np.ndarray], float]:
+    started = time.perf_counter()
+    vectors = embedder(texts)
+    return vectors, time.perf_counter() - started
+
+
+def _embed_in_worker(texts: List[str]) -> Tuple[List[np.ndarray], float]:
+    return _timed(_worker_embedder, texts)
+
+
+class BatchingEmbedder(Embedder):
+    """
+    Splits a call into batches of at most `batch_size` texts and, with more than
+    one worker, embeds the batches in parallel on a thread or process pool, so a
+    bulk load is not bound by one model call at a time. The embedder comes from
+    `factory`: built once and shared by the threads, or once per worker process
+    (so it must be picklable, e.g. a functools.partial of create_embedder).
+
+    Threads suit the ONNX runtime and the OpenAI client, both of which release the
+    GIL; processes suit embedders that do not, at the cost of a model per process.
+    """
+
+    def __init__(self, factory: Callable[[], Embedder], model: str, batch_size: int = 64, workers: int = 1,
+                 pool: str = "thread"):
+        if pool not in POOLS:
+            raise ValueError(f"Unknown embedding pool {pool!r}; expected one of {POOLS}")
+        self.factory = factory
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.pool = pool
+        self._embedder: Optional[Embedder] = None
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "BatchingEmbedder":
+        """
+        EMBEDDER              onnx | openai (default onnx)
+        EMBEDDING_MODEL       model name (default all-MiniLM-L6-v2 / text-embedding-3-small)
+        EMBEDDING_BATCH_SIZE  texts per model call (default 64)
+        EMBEDDING_WORKERS     batches embedded in parallel (default 1)
+        EMBEDDING_POOL        thread | process (default thread)
+        """
+        kind = os.getenv("EMBEDDER", "onnx")
+        if kind not in EMBEDDERS:
+            raise ValueError(f"Unknown embedder {kind!r}; expected one of {EMBEDDERS}")
+        model = os.getenv("EMBEDDING_MODEL") or DEFAULT_MODELS[kind]
+        return cls(
+            partial(create_embedder, kind, model),
+            model,
+            batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "64")),
+            workers=int(os.getenv("EMBEDDING_WORKERS", "1")),
+            pool=os.getenv("EMBEDDING_POOL", "thread")
+        )
+
+    @property
+    def embedder(self) -> Embedder:
+        # Built on first use: the ONNX model downloads and loads, which no test or
+        # store that never embeds should pay for
+        with self._lock:
+            if self._embedder is None:
+                self._embedder = self.factory()
+            return self._embedder
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.pool == "process":
+                    # Spawned, not forked: the parent holds threads and open sockets
+                    self._executor = ProcessPoolExecutor(
+                        self.workers, mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker, initargs=(self.factory,)
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="embedder")
+            return self._executor
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        if not input:
+            return []
+        started = time.perf_counter()
+        batches = [input[i:i + self.batch_size] for i in range(0, len(input), self.batch_size)]
+        if self.pool == "process":
+            # The model only exists in the workers
+            results = list(self._get_executor().map(_embed_in_worker, batches))
+        elif self.workers == 1 or len(batches) == 1:
+            results = [self._embed(batch) for batch in batches]
+        else:
+            results = list(self._get_executor().map(self._embed, batches))
+        vectors = [np.asarray(v, dtype=np.float32) for batch_vectors, _ in results for v in batch_vectors]
+
+        elapsed = time.perf_counter() - started
+        for batch, (_, seconds) in zip(batches, results):
+            EMBEDDING_BATCH_SIZE.labels(model=self.model).observe(len(batch))
+            EMBEDDING_BATCH_LATENCY.labels(model=self.model).observe(seconds)
+        EMBEDDING_TEXTS.labels(model=self.model).inc(len(input))
+        if elapsed > 0:
+            EMBEDDING_THROUGHPUT.labels(model=self.model).set(len(input) / elapsed)
+        return vectors
+
+    def _embed(self, batch: List[str]) -> Tuple[List[np.ndarray], float]:
+        return _timed(self.embedder, batch)
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_embedders: Dict[tuple, BatchingEmbedder] = {}
+_embedders_lock = threading.Lock()
+
+
+def get_embedder() -> BatchingEmbedder:
+    """
+    The process-wide embedder for the configured backend and model (see
+    BatchingEmbedder.from_env): every store shares one model and one pool.
+    """
+    key = (os.getenv("EMBEDDER", "onnx"), os.getenv("EMBEDDING_MODEL"))
+    with _embedders_lock:
+        embedder = _embedders.get(key)
+        if embedder is None:
+            embedder = _embedders[key] = BatchingEmbedder.from_env()
+            logger.info(f"Embedding with {key[0]} model {embedder.model} ({embedder.workers} {embedder.pool} workers, "
+                        f"batches of {embedder.batch_size})")
+        return embedder
+
+
+def _close_embedders():
+    with _embedders_lock:
+        embedders = list(_embedders.values())
+    for embedder in embedders:
+        embedder.close()
+
+
+atexit.register(_close_embedders)
@@ -0,0 +1,182 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from anti_gravity_system.src.core.metrics import EMBEDDING_CACHE_LOOKUPS, EMBEDDING_CACHE_EVICTIONS
+from anti_gravity_system.src.utils.logger import logger
+
+class EmbeddingCache:
+    """
+    Fixed-capacity store of float32 embeddings for one model, keyed by a hash of
+    the model name and the text.
+
+    Vectors live in a memory-mapped `<model>.f32` file of `capacity` slots; a
+    parallel `<model>.keys` file records which key owns each slot, so the LRU
+    index is rebuilt from disk on open and a slot that was reused after the
+    index was last seen can never be served for the wrong text.
+    """
+
+    def __init__(self, directory: str, model: str, capacity: int = 100_000):
+        self.directory = directory
+        self.model = model
+        self.capacity = capacity
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]", "_", model))
+        self._vectors_path = f"{base}.f32"
+        self._keys_path = f"{base}.keys"
+        self._meta_path = f"{base}.json"
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self._keys: Optional[np.memmap] = None
+        # key -> slot, least recently used first
+        self._index: "OrderedDict[int, int]" = OrderedDict()
+        self._next_slot = 0
+        self.dim: Optional[int] = None
+        if os.path.exists(self._meta_path):
+            self._load()
+
+    def _load(self):
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        if meta.get("capacity") != self.capacity:
+            # Slot layout depends on capacity; start over rather than misread the files
+            logger.warning(f"Embedding cache {self._vectors_path} resized to {self.capacity} slots; discarding it")
+            return
+        self._open(meta["dim"], mode="r+")
+        for slot in np.flatnonzero(self._keys):
+            self._index[int(self._keys[slot])] = int(slot)
+        self._next_slot = int(np.flatnonzero(self._keys)[-1]) + 1 if self._index else 0
+
+    def _open(self, dim: int, mode: str):
+        self.dim = dim
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode=mode, shape=(self.capacity, dim))
+        self._keys = np.memmap(self._keys_path, dtype=np.uint64, mode=mode, shape=(self.capacity,))
+        if mode == "w+":
+            with open(self._meta_path, "w") as f:
+                json.dump({"model": self.model, "dim": dim, "capacity": self.capacity}, f)
+
+    def key(self, text: str) -> int:
+        digest = hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).digest()
+        # 0 marks an empty slot
+        return int.from_bytes(digest[:8], "little") or 1
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        found: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for text in texts:
+                key = self.key(text)
+                slot = self._index.get(key)
+                if slot is None or self._keys[slot] != key:
+                    found.append(None)
+                    continue
+                self._index.move_to_end(key)
+                found.append(np.array(self._vectors[slot]))
+        hits = sum(1 for v in found if v is not None)
+        EMBEDDING_CACHE_LOOKUPS.labels(model=self.model, result="hit").inc(hits)
+        EMBEDDING_CACHE_LOOKUPS.labels(model=self.model, result="miss").inc(len(found) - hits)
+        return found
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                vector = np.asarray(vector, dtype=np.float32)
+                if self._vectors is None:
+                    self._open(len(vector), mode="w+")
+                if len(vector) != self.dim:
+                    logger.warning(f"Not caching {len(vector)}-d embedding in {self.dim}-d cache for {self.model}")
+                    continue
+                key = self.key(text)
+                slot = self._index.pop(key, None)
+                if slot is None:
+                    slot = self._claim_slot()
+                # Clear the owner first so a torn write is read as a miss, not a wrong vector
+                self._keys[slot] = 0
+                self._vectors[slot] = vector
+                self._keys[slot] = key
+                self._index[key] = slot
+
+    def _claim_slot(self) -> int:
+        if self._next_slot < self.capacity:
+            self._next_slot += 1
+            return self._next_slot - 1
+        _, slot = self._index.popitem(last=False)
+        EMBEDDING_CACHE_EVICTIONS.labels(model=self.model).inc()
+        return slot
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def flush(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._keys.flush()
+
+
+class CachedEmbeddingFunction:
+    """
+    Chroma-compatible embedding function: texts in, one float32 vector per text
+    out. Only cache misses reach `embed`, as a single call (which the embedder
+    splits into batches).
+    """
+
+    def __init__(self, embed: Callable[[List[str]], Sequence[Sequence[float]]], cache: EmbeddingCache):
+        self.embed = embed
+        self.cache = cache
+        self.model = cache.model
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        vectors = self.cache.get_many(input)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            # Duplicates within one call are embedded once
+            texts = list(dict.fromkeys(input[i] for i in missing))
+            computed = dict(zip(texts, (np.asarray(v, dtype=np.float32) for v in self.embed(texts))))
+            self.cache.put_many(texts, list(computed.values()))
+            for i in missing:
+                vectors[i] = computed[input[i]]
+        return vectors
+
+
+_caches: Dict[tuple, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(directory: str, model: str, capacity: int) -> EmbeddingCache:
+    """
+    One cache per file per process; stores sharing a directory share its cache.
+    """
+    key = (os.path.abspath(directory), model)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = EmbeddingCache(directory, model, capacity)
+        return cache
+
+
+def default_embedding_function(cache_dir: str):
+    """
+    The process-wide embedder (see embedders.get_embedder), behind the embedding
+    cache unless disabled.
+
+    EMBEDDING_CACHE_ENABLED    true | false (default true)
+    EMBEDDING_CACHE_DIR        overrides cache_dir
+    EMBEDDING_CACHE_CAPACITY   embeddings kept per model (default 100000)
+    """
+    from anti_gravity_system.src.core.embedders import get_embedder
+
+    embed = get_embedder()
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() != "true":
+        return embed
+    cache = get_embedding_cache(
+        os.getenv("EMBEDDING_CACHE_DIR", cache_dir),
+        embed.model,
+        int(os.getenv("EMBEDDING_CACHE_CAPACITY", "100000"))
+    )
+    return CachedEmbeddingFunction(embed, cache)
@@ -0,0 +1,248 @@
+import os
+import json
+import asyncio
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from anti_gravity_system.src.core.metrics import LLM_CACHE_HITS, LLM_CACHE_MISSES, LLM_CACHE_EVICTIONS
+from anti_gravity_system.src.utils.logger import logger
+
+
+def make_cache_key(model: str, messages: List[Dict[str, Any]], temperature: float,
+                   tools: Optional[List[Dict[str, Any]]] = None) -> str:
+    """
+    Canonical hash of everything that determines a completion.
+    """
+    canonical = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "tools": tools or []},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class MemoryTier:
+    """In-process LRU with per-entry TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                LLM_CACHE_EVICTIONS.labels(tier=self.name, reason="ttl").inc()
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, expires_at: Optional[float] = None):
+        with self._lock:
+            self._entries[key] = (expires_at or time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                LLM_CACHE_EVICTIONS.labels(tier=self.name, reason="size").inc()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteTier:
+    """
+    Persistent tier shared by every process pointing at the same file.
+    WAL mode lets concurrent readers proceed while another process writes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, ttl_seconds: float = 86400, max_entries: int = 100000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT,
+                    created_at REAL,
+                    expires_at REAL
+                )
+            ''')
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (expires_at)")
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= time.time():
+            with self._lock:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+            LLM_CACHE_EVICTIONS.labels(tier=self.name, reason="ttl").inc()
+            return None
+        return row[0], row[1]
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now + self.ttl_seconds)
+            )
+            self._conn.commit()
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._prune(now)
+
+    def _prune(self, now: float):
+        # Called with the lock held
+        expired = self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,)).rowcount
+        overflow = self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        ).rowcount
+        self._conn.commit()
+        if expired:
+            LLM_CACHE_EVICTIONS.labels(tier=self.name, reason="ttl").inc(expired)
+        if overflow:
+            LLM_CACHE_EVICTIONS.labels(tier=self.name, reason="size").inc(overflow)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LLMResponseCache:
+    """
+    Two-tier completion cache: an in-memory LRU in front of an optional SQLite file.
+    Hits in the persistent tier are promoted into memory.
+    """
+
+    def __init__(self, memory_tier: MemoryTier, sqlite_tier: Optional[SQLiteTier] = None):
+        self.memory_tier = memory_tier
+        self.sqlite_tier = sqlite_tier
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._get_memory(key)
+        if value is None and self.sqlite_tier:
+            value = self._get_persistent(key)
+        if value is None:
+            LLM_CACHE_MISSES.inc()
+        return value
+
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        get() for the event loop: the memory tier is read in place, the SQLite
+        tier on a worker thread.
+        """
+        value = self._get_memory(key)
+        if value is None and self.sqlite_tier:
+            value = await asyncio.to_thread(self._get_persistent, key)
+        if value is None:
+            LLM_CACHE_MISSES.inc()
+        return value
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        value = self.memory_tier.get(key)
+        if value is not None:
+            LLM_CACHE_HITS.labels(tier=self.memory_tier.name).inc()
+        return value
+
+    def _get_persistent(self, key: str) -> Optional[str]:
+        try:
+            entry = self.sqlite_tier.get(key)
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache read failed: {e}")
+            return None
+        if entry is None:
+            return None
+        value, expires_at = entry
+        self.memory_tier.set(key, value, min(expires_at, time.time() + self.memory_tier.ttl_seconds))
+        LLM_CACHE_HITS.labels(tier=self.sqlite_tier.name).inc()
+        return value
+
+    def set(self, key: str, value: str):
+        self.memory_tier.set(key, value)
+        if self.sqlite_tier:
+            self._set_persistent(key, value)
+
+    async def aset(self, key: str, value: str):
+        """
+        set() for the event loop; the SQLite write runs on a worker thread.
+        """
+        self.memory_tier.set(key, value)
+        if self.sqlite_tier:
+            await asyncio.to_thread(self._set_persistent, key, value)
+
+    def _set_persistent(self, key: str, value: str):
+        try:
+            self.sqlite_tier.set(key, value)
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache write failed: {e}")
+
+    def clear(self):
+        self.memory_tier.clear()
+        if self.sqlite_tier:
+            self.sqlite_tier.clear()
+
+
+_shared_cache: Optional[LLMResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """
+    Process-wide cache configured from the environment, or None when disabled.
+
+    LLM_CACHE_ENABLED      "true" to enable (default off)
+    LLM_CACHE_MAX_ENTRIES  in-memory LRU size (default 1024)
+    LLM_CACHE_TTL_SECONDS  entry lifetime (default 3600)
+    LLM_CACHE_PATH         SQLite file for the shared tier; empty for memory only
+    """
+    global _shared_cache
+    if os.getenv("LLM_CACHE_ENABLED", "false").lower() != "true":
+        return None
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            ttl = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+            memory_tier = MemoryTier(int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")), ttl)
+            path = os.getenv("LLM_CACHE_PATH", "./antigravity_data/llm_cache.db")
+            sqlite_tier = SQLiteTier(path, ttl) if path else None
+            _shared_cache = LLMResponseCache(memory_tier, sqlite_tier)
+            logger.info(f"LLM response cache enabled (persistent tier: {path or 'none'})")
+        return _shared_cache
@@ -0,0 +1,108 @@
+import os
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+
+from anti_gravity_system.src.utils.logger import logger
+
+ClientKey = Tuple[Optional[str], str, str]
+
+
+def _pool_limits() -> httpx.Limits:
+    """
+    Connection pool limits from the environment.
+
+    LLM_POOL_MAX_CONNECTIONS     total connections per client (default 100)
+    LLM_POOL_MAX_KEEPALIVE       idle keep-alive connections kept warm (default 20)
+    LLM_POOL_KEEPALIVE_EXPIRY    seconds an idle connection is kept (default 30)
+    """
+    return httpx.Limits(
+        max_connections=int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "30"))
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    """
+    LLM_TIMEOUT_SECONDS          read/write/pool timeout (default 60)
+    LLM_CONNECT_TIMEOUT_SECONDS  connect timeout (default 5)
+    """
+    return httpx.Timeout(
+        float(os.getenv("LLM_TIMEOUT_SECONDS", "60")),
+        connect=float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+    )
+
+
+class LLMClientRegistry:
+    """
+    Hands out one keep-alive pooled OpenAI client per (base_url, api_key, model).
+
+    Sync clients are shared process-wide. Async clients hold connections bound to the
+    event loop that opened them, so they are shared per running loop instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[ClientKey, OpenAI] = {}
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ClientKey, AsyncOpenAI]]" = \
+            weakref.WeakKeyDictionary()
+
+    def get_client(self, api_key: str, base_url: Optional[str] = None, model: str = "") -> OpenAI:
+        key = (base_url, api_key, model)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    timeout=_timeout(),
+                    # Retries are owned by the per-model rate limiter
+                    max_retries=0,
+                    http_client=DefaultHttpxClient(limits=_pool_limits(), timeout=_timeout())
+                )
+                self._clients[key] = client
+                logger.info(f"Created pooled LLM client for {base_url or 'default endpoint'} ({model})")
+            return client
+
+    def get_async_client(self, api_key: str, base_url: Optional[str] = None, model: str = "") -> AsyncOpenAI:
+        key = (base_url, api_key, model)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    timeout=_timeout(),
+                    # Retries are owned by the per-model rate limiter
+                    max_retries=0,
+                    http_client=DefaultAsyncHttpxClient(limits=_pool_limits(), timeout=_timeout())
+                )
+                clients[key] = client
+            return client
+
+    def close(self):
+        """
+        Closes the shared sync clients; async clients are released with their loop.
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.error(f"Failed to close LLM client: {e}")
+
+
+_registry = LLMClientRegistry()
+
+
+def get_client_registry() -> LLMClientRegistry:
+    return _registry
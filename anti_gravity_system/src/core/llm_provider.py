@@ -1,45 +1,290 @@
 import os
-from typing import List, Dict, Any, Optional
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator
 import json
 import re
-from openai import OpenAI
+from openai import AsyncOpenAI
+from anti_gravity_system.src.core.llm_cache import get_response_cache, make_cache_key
+from anti_gravity_system.src.core.llm_clients import get_client_registry
+from anti_gravity_system.src.core.single_flight import SingleFlight, AsyncSingleFlight
+from anti_gravity_system.src.core.rate_limiter import ModelRateLimiter, get_rate_limiter, estimate_tokens
+from anti_gravity_system.src.core.metrics import LLM_CALL_LATENCY, TOKEN_USAGE
 from anti_gravity_system.src.utils.logger import logger
 
+# Identical concurrent completions (e.g. a burst of the same request) share one upstream call
+_completion_flights = SingleFlight("llm_completion")
+_async_completion_flights = AsyncSingleFlight("llm_completion")
+
 class LLMProvider:
-    def __init__(self, model: str = "gpt-4-turbo-preview"):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY", "sk-mock-key"))
+    def __init__(self, model: str = "gpt-4-turbo-preview", temperature: float = 0.7,
+                 api_key: Optional[str] = None, base_url: Optional[str] = None):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY", "sk-mock-key")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        # Pooled keep-alive client shared with every other provider on the same endpoint
+        self.client = get_client_registry().get_client(self.api_key, self.base_url, model)
+        self._async_client: Optional[AsyncOpenAI] = None
         self.model = model
-        self.mock_mode = os.getenv("OPENAI_API_KEY") is None or os.getenv("OPENAI_API_KEY") == "sk-mock-key"
+        self.temperature = temperature
+        # RPM/TPM budgets, adaptive concurrency and retries shared by every provider for this model
+        self.limiter = get_rate_limiter(model)
+        # Opt-in response cache shared by every provider in the process (None when disabled)
+        self.cache = get_response_cache()
+        self.mock_mode = self.api_key == "sk-mock-key"
         if self.mock_mode:
             logger.warning("OPENAI_API_KEY not found. Running in MOCK MODE.")
 
-    def chat_completion(self, messages: List[Dict[str, str]], tools: Optional[List[Dict[str, Any]]] = None) -> str:
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        # Async connections belong to the running event loop, so resolve the shared client lazily
+        if self._async_client is not None:
+            return self._async_client
+        return get_client_registry().get_async_client(self.api_key, self.base_url, self.model)
+
+    @async_client.setter
+    def async_client(self, client: AsyncOpenAI):
+        self._async_client = client
+
+    def chat_completion(self, messages: List[Dict[str, str]], tools: Optional[List[Dict[str, Any]]] = None,
+                        use_cache: bool = True, model: Optional[str] = None, raise_errors: bool = False) -> str:
+        """
+        `model` overrides the provider's default for this call (see ModelRouter).
+        With `raise_errors`, a failed call raises instead of returning an error
+        string, and so does a call in mock mode, for callers that must not act on
+        a placeholder answer.
+        """
         if self.mock_mode:
+            if raise_errors:
+                raise RuntimeError("LLM provider is in mock mode")
             return self._mock_response(messages)
-        
+
+        model = model or self.model
+        cache_key = self._cache_key(messages, tools, model) if use_cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        def create() -> str:
+            return self._create(messages, tools, model).choices[0].message.content
+
+        try:
+            content = _completion_flights.do(self._flight_key(messages, tools, model), create)
+        except Exception as e:
+            logger.error(f"LLM Error: {e}")
+            if raise_errors:
+                raise
+            return f"Error generating response: {e}"
+
+        if cache_key and content is not None:
+            self.cache.set(cache_key, content)
+        return content
+
+    async def achat_completion(self, messages: List[Dict[str, str]], tools: Optional[List[Dict[str, Any]]] = None,
+                               use_cache: bool = True, model: Optional[str] = None, raise_errors: bool = False) -> str:
+        """
+        Non-blocking twin of chat_completion for use inside the event loop.
+        """
+        if self.mock_mode:
+            if raise_errors:
+                raise RuntimeError("LLM provider is in mock mode")
+            return self._mock_response(messages)
+
+        model = model or self.model
+        cache_key = self._cache_key(messages, tools, model) if use_cache else None
+        if cache_key:
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                return cached
+
+        async def create() -> str:
+            return (await self._acreate(messages, tools, model)).choices[0].message.content
+
         try:
-            # Basic implementation - in production would handle tools properly
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.7
-            )
-            return response.choices[0].message.content
+            content = await _async_completion_flights.do(self._flight_key(messages, tools, model), create)
         except Exception as e:
             logger.error(f"LLM Error: {e}")
+            if raise_errors:
+                raise
             return f"Error generating response: {e}"
 
-    def generate_structured_response(self, messages: List[Dict[str, str]], schema_description: str) -> Dict[str, Any]:
+        if cache_key and content is not None:
+            await self.cache.aset(cache_key, content)
+        return content
+
+    def stream_chat_completion(self, messages: List[Dict[str, str]], tools: Optional[List[Dict[str, Any]]] = None,
+                               use_cache: bool = True, model: Optional[str] = None) -> Iterator[str]:
+        """
+        Yields content deltas as the model produces them (stream=True).
+        Cached and mock responses are replayed in word-sized chunks.
+        """
+        if self.mock_mode:
+            yield from self._chunks(self._mock_response(messages))
+            return
+
+        model = model or self.model
+        cache_key = self._cache_key(messages, tools, model) if use_cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield from self._chunks(cached)
+                return
+
+        parts = []
+        try:
+            with self._stream(messages, tools, model) as stream:
+                for chunk in stream:
+                    delta = self._delta(chunk)
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+        except Exception as e:
+            logger.error(f"LLM Error: {e}")
+            yield f"Error generating response: {e}"
+            return
+
+        if cache_key and parts:
+            self.cache.set(cache_key, "".join(parts))
+
+    async def astream_chat_completion(self, messages: List[Dict[str, str]], tools: Optional[List[Dict[str, Any]]] = None,
+                                      use_cache: bool = True, model: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Async twin of stream_chat_completion.
+        """
+        if self.mock_mode:
+            for delta in self._chunks(self._mock_response(messages)):
+                yield delta
+            return
+
+        model = model or self.model
+        cache_key = self._cache_key(messages, tools, model) if use_cache else None
+        if cache_key:
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                for delta in self._chunks(cached):
+                    yield delta
+                return
+
+        parts = []
+        try:
+            async with self._astream(messages, tools, model) as stream:
+                async for chunk in stream:
+                    delta = self._delta(chunk)
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+        except Exception as e:
+            logger.error(f"LLM Error: {e}")
+            yield f"Error generating response: {e}"
+            return
+
+        if cache_key and parts:
+            await self.cache.aset(cache_key, "".join(parts))
+
+    @staticmethod
+    def _delta(chunk) -> Optional[str]:
+        if not chunk.choices:
+            return None
+        return chunk.choices[0].delta.content
+
+    @staticmethod
+    def _chunks(content: str) -> List[str]:
+        return re.findall(r"\s*\S+\s*", content) or [content]
+
+    def _create(self, messages: List[Dict[str, str]], tools: Optional[List[Dict[str, Any]]], model: str):
+        start = time.time()
+        response = self._limiter(model).call(
+            lambda: self.client.chat.completions.create(**self._request_kwargs(messages, tools, model)),
+            estimate_tokens(messages)
+        )
+        self._observe(model, start, response)
+        return response
+
+    async def _acreate(self, messages: List[Dict[str, str]], tools: Optional[List[Dict[str, Any]]], model: str):
+        start = time.time()
+        response = await self._limiter(model).acall(
+            lambda: self.async_client.chat.completions.create(**self._request_kwargs(messages, tools, model)),
+            estimate_tokens(messages)
+        )
+        self._observe(model, start, response)
+        return response
+
+    @contextmanager
+    def _stream(self, messages: List[Dict[str, str]], tools: Optional[List[Dict[str, Any]]], model: str):
+        # The rate limiter's slot is held while the stream is read (see ModelRateLimiter.stream)
+        start = time.time()
+        with self._limiter(model).stream(
+            lambda: self.client.chat.completions.create(**self._request_kwargs(messages, tools, model), stream=True),
+            estimate_tokens(messages)
+        ) as stream:
+            self._observe(model, start, stream)
+            try:
+                yield stream
+            finally:
+                # Also ends the upstream generation when the reader stops early
+                stream.close()
+
+    @asynccontextmanager
+    async def _astream(self, messages: List[Dict[str, str]], tools: Optional[List[Dict[str, Any]]], model: str):
+        start = time.time()
+        async with self._limiter(model).astream(
+            lambda: self.async_client.chat.completions.create(**self._request_kwargs(messages, tools, model), stream=True),
+            estimate_tokens(messages)
+        ) as stream:
+            self._observe(model, start, stream)
+            try:
+                yield stream
+            finally:
+                await stream.close()
+
+    def _limiter(self, model: str) -> ModelRateLimiter:
+        return self.limiter if model == self.model else get_rate_limiter(model)
+
+    def _observe(self, model: str, start: float, response: Any):
+        # Streams report time to the first response only and carry no usage block
+        LLM_CALL_LATENCY.labels(model=model).observe(time.time() - start)
+        usage = getattr(response, "usage", None)
+        for kind in ("prompt", "completion"):
+            tokens = getattr(usage, f"{kind}_tokens", None)
+            if isinstance(tokens, int):
+                TOKEN_USAGE.labels(model=model, kind=kind).inc(tokens)
+
+    def _flight_key(self, messages: List[Dict[str, str]], tools: Optional[List[Dict[str, Any]]], model: str) -> str:
+        return make_cache_key(f"{self.base_url}|{model}", messages, self.temperature, tools)
+
+    def _cache_key(self, messages: List[Dict[str, str]], tools: Optional[List[Dict[str, Any]]], model: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return make_cache_key(model, messages, self.temperature, tools)
+
+    def generate_structured_response(self, messages: List[Dict[str, str]], schema_description: str,
+                                     use_cache: bool = True, model: Optional[str] = None) -> Dict[str, Any]:
         """
         Forces the LLM to return JSON matching the schema.
         """
+        self._append_schema_instruction(messages, schema_description)
+        raw_content = self.chat_completion(messages, use_cache=use_cache, model=model)
+        return self._parse_json(raw_content)
+
+    async def agenerate_structured_response(self, messages: List[Dict[str, str]], schema_description: str,
+                                            use_cache: bool = True, model: Optional[str] = None) -> Dict[str, Any]:
+        self._append_schema_instruction(messages, schema_description)
+        raw_content = await self.achat_completion(messages, use_cache=use_cache, model=model)
+        return self._parse_json(raw_content)
+
+    def _request_kwargs(self, messages: List[Dict[str, str]], tools: Optional[List[Dict[str, Any]]], model: str) -> Dict[str, Any]:
+        # Basic implementation - in production would handle tools properly
+        return {
+            "model": model,
+            "messages": messages,
+            "temperature": self.temperature
+        }
+
+    def _append_schema_instruction(self, messages: List[Dict[str, str]], schema_description: str):
         messages.append({
             "role": "system", 
             "content": f"You must respond with valid JSON matching this schema: {schema_description}"
         })
-        
-        raw_content = self.chat_completion(messages)
-        return self._parse_json(raw_content)
 
     def _parse_json(self, content: str) -> Dict[str, Any]:
         try:
@@ -57,8 +302,8 @@ class LLMProvider:
         # Mocking generic plan request
         if "plan" in last_msg or "step" in last_msg:
              return json.dumps([
-                 {"id": 1, "task": "Research the request", "worker": "worker_research"},
-                 {"id": 2, "task": "Write python code", "worker": "worker_coder"}
+                 {"id": 1, "task": "Research the request", "worker": "worker_research", "depends_on": []},
+                 {"id": 2, "task": "Write python code", "worker": "worker_coder", "depends_on": [1]}
              ])
              
         if "python" in last_msg:
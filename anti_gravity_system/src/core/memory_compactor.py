@@ -0,0 +1,263 @@
+import os
+import time
+import threading
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from anti_gravity_system.src.core.metrics import MEMORY_COMPACTION_ITEMS, MEMORY_COMPACTION_BYTES
+from anti_gravity_system.src.utils.logger import logger
+
+SUMMARY_TYPE = "SESSION_SUMMARY"
+
+SUMMARY_PROMPT = (
+    "You condense the task results of a finished agent session into one memory. "
+    "Keep facts, decisions, file names, identifiers and errors; drop repetition and chatter. "
+    "Answer with the summary only."
+)
+
+
+@dataclass
+class CompactionReport:
+    items_expired: int = 0
+    sessions_summarized: int = 0
+    items_summarized: int = 0
+    summaries_written: int = 0
+    content_bytes_reclaimed: int = 0
+    disk_bytes_reclaimed: int = 0
+    duration_seconds: float = 0.0
+    dry_run: bool = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def add(self, other: "CompactionReport"):
+        for f in fields(self):
+            if f.name != "dry_run":
+                setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+
+class MemoryCompactor:
+    """
+    Bounds the growth of a MemoryStore. Each run:
+
+    1. collapses the `summarize_types` items of sessions idle for more than
+       `summarize_after_days` into one SESSION_SUMMARY memory written by the LLM,
+       then deletes the originals;
+    2. deletes items older than their type's TTL (`ttl_days`, type -> days);
+    3. optionally compacts the vector backend and VACUUMs SQLite so the freed
+       space is returned to the filesystem.
+
+    The summary is stored before its sources are deleted, so an interrupted run
+    can leave a duplicate but never loses a session's results. Sessions are left
+    alone when the LLM is in mock mode or returns no usable summary.
+    """
+
+    def __init__(self, store, llm=None, ttl_days: Optional[Dict[str, float]] = None,
+                 summarize_after_days: Optional[float] = 7, summarize_types: Tuple[str, ...] = ("TASK_RESULT",),
+                 min_items_to_summarize: int = 2, max_chars_per_item: int = 2000, vacuum: bool = False):
+        self.store = store
+        self.llm = llm
+        self.ttl_days = ttl_days or {}
+        self.summarize_after_days = summarize_after_days
+        self.summarize_types = tuple(summarize_types)
+        self.min_items_to_summarize = min_items_to_summarize
+        self.max_chars_per_item = max_chars_per_item
+        self.vacuum = vacuum
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, store, config: Dict[str, Any], llm=None) -> "MemoryCompactor":
+        """
+        Builds a compactor from the `memory_retention` config block.
+        """
+        if llm is None and config.get("summarize_after_days") is not None:
+            from anti_gravity_system.src.core.llm_provider import LLMProvider
+            llm = LLMProvider(model=config.get("summary_model", "gpt-4o-mini"), temperature=0.2)
+        return cls(
+            store,
+            llm=llm,
+            ttl_days={k: float(v) for k, v in (config.get("ttl_days") or {}).items()},
+            summarize_after_days=config.get("summarize_after_days"),
+            summarize_types=tuple(config.get("summarize_types", ["TASK_RESULT"])),
+            min_items_to_summarize=int(config.get("min_items_to_summarize", 2)),
+            vacuum=bool(config.get("vacuum", False))
+        )
+
+    # --- one pass ---
+
+    def run(self, now: Optional[datetime] = None, dry_run: bool = False) -> CompactionReport:
+        started = time.perf_counter()
+        now = now or datetime.now()
+        report = CompactionReport(dry_run=dry_run)
+        disk_before = self._disk_usage()
+
+        # Items still in the write-behind buffer are invisible to the SQL below
+        self.store.flush()
+        if self.summarize_after_days is not None and self.llm is not None:
+            if getattr(self.llm, "mock_mode", False):
+                # A mock answer would replace real session results
+                logger.warning("Memory compaction: LLM provider is in mock mode, skipping session summaries")
+            else:
+                self._summarize_idle_sessions(now, report, dry_run)
+        self._expire(now, report, dry_run)
+
+        if not dry_run and (report.items_expired or report.items_summarized):
+            self.store.backend.compact()
+            if self.vacuum:
+                with self.store.db.writer() as conn:
+                    conn.execute("VACUUM")
+            report.disk_bytes_reclaimed = max(0, disk_before - self._disk_usage())
+            MEMORY_COMPACTION_BYTES.labels(kind="content").inc(max(0, report.content_bytes_reclaimed))
+            MEMORY_COMPACTION_BYTES.labels(kind="disk").inc(report.disk_bytes_reclaimed)
+
+        report.duration_seconds = round(time.perf_counter() - started, 3)
+        logger.info(f"Memory compaction: {report.as_dict()}")
+        return report
+
+    def run_all(self, shards, now: Optional[datetime] = None, dry_run: bool = False) -> CompactionReport:
+        """
+        run() on this compactor's store, then on every tenant shard of `shards`
+        (a TenantShards), one at a time. Returns the combined report.
+        """
+        from anti_gravity_system.src.core.memory_store import open_memory_store
+
+        total = self.run(now, dry_run)
+        for tenant_id, path in shards.tenants():
+            # Opened as the tenant, so a shard first opened here gets its own Chroma database
+            store = open_memory_store(path, shards.vector_backend, tenant_id=tenant_id)
+            try:
+                total.add(self.for_store(store).run(now, dry_run))
+            finally:
+                store.close()
+        return total
+
+    def for_store(self, store) -> "MemoryCompactor":
+        """
+        A compactor with these settings for another store.
+        """
+        return MemoryCompactor(
+            store, llm=self.llm, ttl_days=self.ttl_days, summarize_after_days=self.summarize_after_days,
+            summarize_types=self.summarize_types, min_items_to_summarize=self.min_items_to_summarize,
+            max_chars_per_item=self.max_chars_per_item, vacuum=self.vacuum
+        )
+
+    def _summarize_idle_sessions(self, now: datetime, report: CompactionReport, dry_run: bool):
+        cutoff = (now - timedelta(days=self.summarize_after_days)).isoformat()
+        placeholders = ",".join("?" * len(self.summarize_types))
+        with self.store.db.reader() as conn:
+            sessions = [r[0] for r in conn.execute(
+                f"SELECT session_id FROM memory_items GROUP BY session_id "
+                f"HAVING MAX(timestamp) < ? AND SUM(type IN ({placeholders})) >= ?",
+                (cutoff, *self.summarize_types, self.min_items_to_summarize)
+            ).fetchall()]
+
+        for session_id in sessions:
+            with self.store.db.reader() as conn:
+                rows = conn.execute(
+                    f"SELECT id, content FROM memory_items WHERE session_id = ? AND type IN ({placeholders}) "
+                    f"ORDER BY timestamp",
+                    (session_id, *self.summarize_types)
+                ).fetchall()
+            removed_bytes = sum(len((r[1] or "").encode("utf-8")) for r in rows)
+            report.sessions_summarized += 1
+            report.items_summarized += len(rows)
+            if dry_run:
+                report.content_bytes_reclaimed += removed_bytes
+                continue
+            try:
+                summary = self._summarize([r[1] or "" for r in rows])
+            except Exception as e:
+                # Keep the originals; the session is retried on the next run
+                logger.error(f"Summarizing session {session_id} failed: {e}")
+                report.sessions_summarized -= 1
+                report.items_summarized -= len(rows)
+                continue
+            summary_id = self.store.add_memory(summary, SUMMARY_TYPE, session_id, {
+                "summarized_items": len(rows),
+                "summarized_types": ",".join(self.summarize_types)
+            })
+            self.store.flush(session_id)
+            # A failed flush is re-queued rather than raised; only delete what the summary now covers
+            with self.store.db.reader() as conn:
+                stored = conn.execute("SELECT 1 FROM memory_items WHERE id = ?", (summary_id,)).fetchone()
+            if stored is None:
+                logger.error(f"Summary of session {session_id} was not written; keeping its results")
+                report.sessions_summarized -= 1
+                report.items_summarized -= len(rows)
+                continue
+            report.summaries_written += 1
+            self.store.delete_memories([r[0] for r in rows])
+            report.content_bytes_reclaimed += removed_bytes - len(summary.encode("utf-8"))
+            MEMORY_COMPACTION_ITEMS.labels(reason="summarized").inc(len(rows))
+
+    def _summarize(self, contents: List[str]) -> str:
+        results = "\n\n".join(
+            f"[{i}] {content[:self.max_chars_per_item]}" for i, content in enumerate(contents, start=1)
+        )
+        summary = self.llm.chat_completion([
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": f"Task results:\n\n{results}"}
+        ], use_cache=False, raise_errors=True)
+        if not summary or not summary.strip() or summary.startswith("Error generating response"):
+            raise ValueError(f"no usable summary: {summary!r}")
+        return summary
+
+    def _expire(self, now: datetime, report: CompactionReport, dry_run: bool):
+        for type_, days in self.ttl_days.items():
+            cutoff = (now - timedelta(days=days)).isoformat()
+            with self.store.db.reader() as conn:
+                rows = conn.execute(
+                    "SELECT id, LENGTH(CAST(content AS BLOB)) FROM memory_items WHERE type = ? AND timestamp < ?",
+                    (type_, cutoff)
+                ).fetchall()
+            if not rows:
+                continue
+            report.content_bytes_reclaimed += sum(r[1] or 0 for r in rows)
+            if dry_run:
+                report.items_expired += len(rows)
+                continue
+            deleted = self.store.delete_memories([r[0] for r in rows])
+            report.items_expired += deleted
+            MEMORY_COMPACTION_ITEMS.labels(reason="expired").inc(deleted)
+
+    def _disk_usage(self) -> int:
+        total = 0
+        for root, _, files in os.walk(self.store.persist_dir):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+
+    # --- schedule ---
+
+    def start(self, interval_seconds: float, shards=None):
+        """
+        Runs compaction every `interval_seconds` on a daemon thread until stop(),
+        over the tenant shards too when `shards` is given.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval_seconds, shards),
+                                        name="memory-compactor", daemon=True)
+        self._thread.start()
+
+    def _loop(self, interval_seconds: float, shards=None):
+        while not self._stop.wait(interval_seconds):
+            try:
+                if shards is not None:
+                    self.run_all(shards)
+                else:
+                    self.run()
+            except Exception as e:
+                logger.error(f"Memory compaction failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
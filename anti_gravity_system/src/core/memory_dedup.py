@@ -0,0 +1,167 @@
+import os
+import re
+import hashlib
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from anti_gravity_system.src.core.metrics import MEMORY_DEDUP_WRITES, MEMORY_DEDUP_RATIO
+
+DEDUP_MODES = ("off", "exact", "near")
+DEDUP_SCOPES = ("type", "session")
+
+# 64-bit signatures split into four 16-bit bands: two signatures within Hamming
+# distance 3 share at least one band exactly, so an indexed band match finds every
+# candidate without scanning
+BANDS = 4
+BAND_BITS = 16
+
+_TOKEN = re.compile(r"\w+")
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def tokens(content: str) -> List[str]:
+    return _TOKEN.findall(content.lower())
+
+
+def simhash(words: List[str]) -> int:
+    """
+    64-bit SimHash over word unigrams and bigrams, so reordered text still differs.
+    """
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not features:
+        return 0
+    digests = b"".join(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest() for f in features)
+    # One row of 64 bits per feature, most significant first; each bit votes +1 / -1
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(len(features), 64)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(features)
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+
+def bands(signature: int) -> List[int]:
+    mask = (1 << BAND_BITS) - 1
+    return [signature >> (i * BAND_BITS) & mask for i in range(BANDS)]
+
+
+def to_signed(signature: int) -> int:
+    # SQLite integers are signed 64-bit
+    return signature - (1 << 64) if signature >= 1 << 63 else signature
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & ((1 << 64) - 1)).count("1")
+
+
+_writes = {"inserted": 0, "duplicate": 0}
+_writes_lock = threading.Lock()
+
+
+def record_write(outcome: str):
+    """
+    Counts a write made with dedup on: "inserted", "exact" or "near".
+    """
+    MEMORY_DEDUP_WRITES.labels(outcome=outcome).inc()
+    with _writes_lock:
+        _writes["inserted" if outcome == "inserted" else "duplicate"] += 1
+        MEMORY_DEDUP_RATIO.set(_writes["duplicate"] / (_writes["inserted"] + _writes["duplicate"]))
+
+
+def dedup_ratio() -> float:
+    """
+    Share of this process's deduplicated writes that matched a stored item.
+    """
+    with _writes_lock:
+        total = _writes["inserted"] + _writes["duplicate"]
+        return _writes["duplicate"] / total if total else 0.0
+
+
+class Deduplicator:
+    """
+    Decides whether a new memory repeats one already stored, so MemoryStore can count
+    a hit on the existing item instead of inserting (and embedding) another copy.
+
+    mode "exact" matches identical content by SHA-256; "near" also matches content
+    whose SimHash is within `max_distance` bits, for items of at least `min_tokens`
+    words (shorter texts give signatures too noisy to compare). Items only match
+    items of the same type, and with scope "session" of the same session too, which
+    keeps every session's history complete at the cost of cross-session duplicates.
+    """
+
+    def __init__(self, mode: str = "off", scope: str = "type", max_distance: int = 3, min_tokens: int = 8):
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode {mode!r}; expected one of {DEDUP_MODES}")
+        if scope not in DEDUP_SCOPES:
+            raise ValueError(f"Unknown dedup scope {scope!r}; expected one of {DEDUP_SCOPES}")
+        if max_distance > BANDS - 1:
+            raise ValueError(f"max_distance above {BANDS - 1} could miss matches with {BANDS} bands")
+        self.mode = mode
+        self.scope = scope
+        self.max_distance = max_distance
+        self.min_tokens = min_tokens
+
+    @classmethod
+    def from_env(cls) -> "Deduplicator":
+        """
+        MEMORY_DEDUP               off | exact | near (default off)
+        MEMORY_DEDUP_SCOPE         type | session (default type)
+        MEMORY_DEDUP_MAX_DISTANCE  SimHash bits two near-duplicates may differ by (default 3)
+        """
+        return cls(
+            mode=os.getenv("MEMORY_DEDUP", "off"),
+            scope=os.getenv("MEMORY_DEDUP_SCOPE", "type"),
+            max_distance=int(os.getenv("MEMORY_DEDUP_MAX_DISTANCE", "3"))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def fingerprint(self, content: str) -> Tuple[str, Optional[int]]:
+        """
+        (content hash, SimHash or None when near matching does not apply).
+        """
+        signature = None
+        if self.mode == "near":
+            words = tokens(content)
+            if len(words) >= self.min_tokens:
+                signature = simhash(words)
+        return content_hash(content), signature
+
+    def scope_key(self, type_: str, session_id: str) -> Tuple[str, ...]:
+        return (type_, session_id) if self.scope == "session" else (type_,)
+
+    def find(self, conn, type_: str, session_id: str, fingerprint: Tuple[str, Optional[int]]) -> Optional[Tuple[str, str]]:
+        """
+        (id, "exact" | "near") of a stored item `fingerprint` duplicates, or None.
+        """
+        digest, signature = fingerprint
+        scope_sql, scope_params = "type = ?", [type_]
+        if self.scope == "session":
+            scope_sql += " AND session_id = ?"
+            scope_params.append(session_id)
+
+        row = conn.execute(
+            f"SELECT item_id FROM memory_fingerprints WHERE {scope_sql} AND content_hash = ? LIMIT 1",
+            (*scope_params, digest)
+        ).fetchone()
+        if row:
+            return row[0], "exact"
+        if signature is None:
+            return None
+
+        band_sql = " OR ".join(f"band{i} = ?" for i in range(BANDS))
+        candidates = conn.execute(
+            f"SELECT item_id, simhash FROM memory_fingerprints WHERE {scope_sql} AND ({band_sql})",
+            (*scope_params, *bands(signature))
+        ).fetchall()
+        best = min(
+            ((hamming(signature, stored), item_id) for item_id, stored in candidates if stored is not None),
+            default=None
+        )
+        if best is not None and best[0] <= self.max_distance:
+            return best[1], "near"
+        return None
@@ -1,53 +1,231 @@
 import os
+import re
 import json
-import sqlite3
-import chromadb
+import base64
 from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from uuid import uuid4
 from datetime import datetime
+import threading
+from anti_gravity_system.src.core.single_flight import SingleFlight
+from anti_gravity_system.src.core.write_behind import WriteBehindBuffer, PendingMemory
+from anti_gravity_system.src.core.embedding_cache import default_embedding_function
+from anti_gravity_system.src.core.sqlite_pool import SQLiteConnectionPool
+from anti_gravity_system.src.core.vector_backends import create_vector_backend
+from anti_gravity_system.src.core.search_cache import SearchResultCache
+from anti_gravity_system.src.core.chroma_client import ChromaConnector
+from anti_gravity_system.src.core.memory_dedup import BANDS, Deduplicator, bands, content_hash, record_write, to_signed
+
+# Identical concurrent searches against the same store share one Chroma query
+_search_flights = SingleFlight("memory_search")
+
+# Schema migrations for metadata.db; entry i upgrades `PRAGMA user_version` i -> i + 1.
+# Append new steps, never edit shipped ones; steps must be idempotent since several
+# processes may open the same database at once.
+MIGRATIONS = [
+    # 1: base tables (databases created before versioning already have them)
+    '''
+    CREATE TABLE IF NOT EXISTS sessions (
+        id TEXT PRIMARY KEY,
+        user_id TEXT,
+        start_time TEXT,
+        status TEXT
+    );
+    CREATE TABLE IF NOT EXISTS memory_items (
+        id TEXT PRIMARY KEY,
+        session_id TEXT,
+        type TEXT,
+        content TEXT,
+        timestamp TEXT,
+        embedding_id TEXT
+    );
+    ''',
+    # 2: history lookups and type filters
+    '''
+    CREATE INDEX IF NOT EXISTS idx_memory_items_session_timestamp ON memory_items (session_id, timestamp);
+    CREATE INDEX IF NOT EXISTS idx_memory_items_type ON memory_items (type);
+    ''',
+    # 3: full-text index over memory_items.content, kept in sync by triggers. `_` is a
+    # token character so snake_case identifiers stay whole.
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS memory_items_fts USING fts5(
+        content, content='memory_items', content_rowid='rowid', tokenize="unicode61 tokenchars '_'"
+    );
+    CREATE TRIGGER IF NOT EXISTS memory_items_fts_insert AFTER INSERT ON memory_items BEGIN
+        INSERT INTO memory_items_fts (rowid, content) VALUES (new.rowid, new.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS memory_items_fts_delete AFTER DELETE ON memory_items BEGIN
+        INSERT INTO memory_items_fts (memory_items_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS memory_items_fts_update AFTER UPDATE OF content ON memory_items BEGIN
+        INSERT INTO memory_items_fts (memory_items_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+        INSERT INTO memory_items_fts (rowid, content) VALUES (new.rowid, new.content);
+    END;
+    INSERT INTO memory_items_fts (memory_items_fts) VALUES ('rebuild');
+    ''',
+    # 4: history pages are keyset-ordered on (timestamp, id); this index serves that
+    # order directly and every lookup the (session_id, timestamp) one did
+    '''
+    CREATE INDEX IF NOT EXISTS idx_memory_items_session_timestamp_id ON memory_items (session_id, timestamp, id);
+    DROP INDEX IF EXISTS idx_memory_items_session_timestamp;
+    ''',
+    # 5: duplicate detection. One row per item written while dedup was on: content
+    # hash, SimHash split into indexed bands, and how often the content recurred.
+    '''
+    CREATE TABLE IF NOT EXISTS memory_fingerprints (
+        item_id TEXT PRIMARY KEY,
+        type TEXT,
+        session_id TEXT,
+        content_hash TEXT,
+        simhash INTEGER,
+        band0 INTEGER,
+        band1 INTEGER,
+        band2 INTEGER,
+        band3 INTEGER,
+        hit_count INTEGER NOT NULL DEFAULT 1,
+        last_seen TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_memory_fingerprints_hash ON memory_fingerprints (type, content_hash);
+    CREATE INDEX IF NOT EXISTS idx_memory_fingerprints_band0 ON memory_fingerprints (type, band0);
+    CREATE INDEX IF NOT EXISTS idx_memory_fingerprints_band1 ON memory_fingerprints (type, band1);
+    CREATE INDEX IF NOT EXISTS idx_memory_fingerprints_band2 ON memory_fingerprints (type, band2);
+    CREATE INDEX IF NOT EXISTS idx_memory_fingerprints_band3 ON memory_fingerprints (type, band3);
+    CREATE TRIGGER IF NOT EXISTS memory_fingerprints_delete AFTER DELETE ON memory_items BEGIN
+        DELETE FROM memory_fingerprints WHERE item_id = old.id;
+    END;
+    ''',
+]
+
+HISTORY_FIELDS = ("id", "type", "content", "timestamp")
+
+SEARCH_MODES = ("auto", "hybrid", "vector", "lexical")
+
+# Reciprocal rank fusion constant; 60 is the value from the original RRF paper
+RRF_K = 60
+
+# A single token with path, dotted, snake_case, numeric or camelCase structure
+_IDENTIFIER = re.compile(r"^(?=\S*(?:[._/\\:#-]|\d|[a-z][A-Z]))\S+$")
+
+
+def looks_like_identifier(query: str) -> bool:
+    """
+    True for queries such as `memory_store.py`, `ERR_CONN_RESET`, `E1101` or
+    `getUserById`, and for quoted strings, which embed poorly but match exactly.
+    """
+    query = query.strip()
+    return bool(_IDENTIFIER.match(query)) or (len(query) > 2 and query[0] == query[-1] == '"')
+
+
+def fts_query(query: str) -> str:
+    """
+    Quotes every whitespace-separated term so FTS5 syntax in user text is matched
+    literally; terms are OR-ed and ranked by BM25. A query wrapped in double quotes
+    is one phrase instead: its terms must appear together, in order.
+    """
+    stripped = query.strip()
+    if len(stripped) > 2 and stripped[0] == stripped[-1] == '"' and stripped[1:-1].strip():
+        # FTS5 escapes a quote inside a string by doubling it
+        return '"' + stripped[1:-1].strip().replace('"', '""') + '"'
+    terms = [t.replace('"', "") for t in query.split()]
+    return " OR ".join(f'"{t}"' for t in terms if t)
 
 class MemoryStore:
-    def __init__(self, persist_dir: str = "./memory_db"):
+    """
+    Vector index plus SQLite metadata for one persist directory. Safe to share
+    between threads; agents obtain the process-wide instance for a directory via
+    open_memory_store() rather than constructing their own.
+    """
+
+    def __init__(self, persist_dir: str = "./memory_db", vector_backend: Optional[str] = None,
+                 tenant_id: Optional[str] = None):
+        """
+        vector_backend: "chroma" or "numpy" (an in-process brute-force index, cheaper to
+        start and run for small deployments); defaults to MEMORY_VECTOR_BACKEND, else "chroma".
+        tenant_id: the user a tenant shard belongs to (see TenantShards), recorded
+        as the user_id of its sessions.
+        """
         self.persist_dir = persist_dir
+        self.tenant_id = tenant_id
         os.makedirs(persist_dir, exist_ok=True)
+        # Handles held through open_memory_store(); a directly constructed store has one
+        self._refs = 1
+        self._refs_lock = threading.Lock()
+        # Set by the last close(), which keeps the registry entry until shutdown
+        # finishes so a concurrent open waits rather than opening the files twice
+        self._closing = False
+        self._shut_down = threading.Event()
         
-        # Initialize Vector DB (Chroma)
-        self.chroma_client = chromadb.PersistentClient(path=os.path.join(persist_dir, "chroma"))
-        self.collection = self.chroma_client.get_or_create_collection(
-            name="antigravity_memory",
-            metadata={"hnsw:space": "cosine"}
-        )
+        # Initialize Vector DB
+        self._chroma_client = None
+        self._chroma_lock = threading.Lock()
+        self._chroma_connector = ChromaConnector.from_env()
+        self.vector_backend = vector_backend or os.getenv("MEMORY_VECTOR_BACKEND", "chroma")
+        # Embeddings are computed here, through the content-hash cache, and handed to
+        # the backend explicitly; a Chroma collection keeps its persisted embedding function config
+        self.embedding_function = default_embedding_function(os.path.join(persist_dir, "embedding_cache"))
+        # One index per embedding model: switching EMBEDDER starts an empty index
+        # (re-embed into it with export_memories/import_memories) instead of
+        # upserting vectors of another dimension into the old one
+        self.backend = create_vector_backend(self.vector_backend, persist_dir, lambda: self.chroma_client,
+                                             getattr(self.embedding_function, "model", None))
         
-        # Initialize Relational DB (SQLite)
-        self.sql_conn = sqlite3.connect(os.path.join(persist_dir, "metadata.db"), check_same_thread=False)
+        # Initialize Relational DB (SQLite): WAL, one writer and pooled readers,
+        # shared by concurrently executing plan steps
+        self.db = SQLiteConnectionPool(
+            os.path.join(persist_dir, "metadata.db"),
+            max_readers=int(os.getenv("SQLITE_MAX_READERS", "4"))
+        )
         self.init_sql_tables()
 
+        # Repeated searches are answered from a cache invalidated by write generations
+        # (MEMORY_SEARCH_CACHE_SIZE entries; 0 disables it). Off when the vectors live
+        # on a shared Chroma server: other replicas' writes never bump its generations.
+        cache_size = int(os.getenv("MEMORY_SEARCH_CACHE_SIZE", "1024"))
+        if self.vector_backend == "chroma" and self._chroma_connector.remote:
+            cache_size = 0
+        self.search_cache = SearchResultCache(cache_size)
+
+        # Repeated content counts a hit on the stored item instead of adding another
+        # (MEMORY_DEDUP; off by default). Items still in the write buffer are matched
+        # on exact content only.
+        self.dedup = Deduplicator.from_env()
+        self._dedup_lock = threading.Lock()
+        self._pending_hashes: Dict[tuple, str] = {}
+        # pending item id -> (repeats, last seen)
+        self._pending_hits: Dict[str, tuple] = {}
+
+        # Writes are batched; reads flush first so callers see their own writes
+        self.write_buffer = WriteBehindBuffer.from_env(self.write_batch, on_drop=self._forget_pending)
+
+    @property
+    def chroma_client(self):
+        # Created on first use, so the numpy backend never pays for Chroma unless
+        # something else (the plan cache, VectorDBTool) asks for it. Embedded, or the
+        # Chroma server at CHROMA_HOST (see ChromaConnector)
+        with self._chroma_lock:
+            if self._chroma_client is None:
+                self._chroma_client = self._chroma_connector.connect(self.persist_dir, self.tenant_id)
+            return self._chroma_client
+
+    @chroma_client.setter
+    def chroma_client(self, client):
+        self._chroma_client = client
+
     def init_sql_tables(self):
-        cursor = self.sql_conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sessions (
-                id TEXT PRIMARY KEY,
-                user_id TEXT,
-                start_time TEXT,
-                status TEXT
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS memory_items (
-                id TEXT PRIMARY KEY,
-                session_id TEXT,
-                type TEXT,
-                content TEXT,
-                timestamp TEXT,
-                embedding_id TEXT
-            )
-        ''')
-        self.sql_conn.commit()
+        self.db.migrate(MIGRATIONS)
 
     def add_memory(self, content: str, type: str, session_id: str, metadata: Dict[str, Any] = None) -> str:
+        """
+        Queues an item for writing and returns its id; with dedup on, a repeat of a
+        stored item returns that item's id instead.
+        """
         memory_id = str(uuid4())
         timestamp = datetime.now().isoformat()
+
+        if self.dedup.enabled:
+            duplicate = self._find_duplicate(content, type, session_id, timestamp)
+            if duplicate:
+                return duplicate
         
         if metadata is None:
             metadata = {}
@@ -59,58 +237,443 @@ class MemoryStore:
             "timestamp": timestamp
         })
 
+        item = PendingMemory(memory_id, session_id, type, content, timestamp, metadata)
+        if self.dedup.enabled:
+            with self._dedup_lock:
+                self._pending_hashes[self._pending_key(item)] = memory_id
+            record_write("inserted")
+        self.write_buffer.add(item)
+        return memory_id
+
+    def _pending_key(self, item: PendingMemory) -> tuple:
+        return self.dedup.scope_key(item.type, item.session_id) + (content_hash(item.content),)
+
+    def _find_duplicate(self, content: str, type_: str, session_id: str, timestamp: str) -> Optional[str]:
+        fingerprint = self.dedup.fingerprint(content)
+        with self._dedup_lock:
+            # Pending items leave this map only once committed, so a repeat is found
+            # either here or in SQLite below
+            pending = self._pending_hashes.get(self.dedup.scope_key(type_, session_id) + (fingerprint[0],))
+            if pending:
+                self._pending_hits[pending] = (self._pending_hits.get(pending, (0, None))[0] + 1, timestamp)
+        if pending:
+            record_write("exact")
+            return pending
+        with self.db.reader() as conn:
+            match = self.dedup.find(conn, type_, session_id, fingerprint)
+        if not match:
+            return None
+        item_id, kind = match
+        with self.db.writer() as conn:
+            conn.execute(
+                "UPDATE memory_fingerprints SET hit_count = hit_count + 1, last_seen = ? WHERE item_id = ?",
+                (timestamp, item_id)
+            )
+        record_write(kind)
+        return item_id
+
+    def write_batch(self, items: List[PendingMemory], embeddings: Optional[List[Any]] = None):
+        """
+        Persists a batch with one vector DB call and one SQLite transaction. Both are
+        idempotent so a partially applied batch can be retried. The write-behind buffer
+        flushes through here; bulk loads call it directly, with `embeddings` when the
+        vectors are already known (None entries are embedded).
+        """
+        if embeddings is None:
+            embeddings = self.embedding_function([item.content for item in items])
+        else:
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if missing:
+                embeddings = list(embeddings)
+                for i, embedding in zip(missing, self.embedding_function([items[i].content for i in missing])):
+                    embeddings[i] = embedding
+
         # Add to Vector DB
-        self.collection.add(
-            documents=[content],
-            metadatas=[metadata],
-            ids=[memory_id]
+        self.backend.upsert(
+            ids=[item.id for item in items],
+            embeddings=embeddings,
+            documents=[item.content for item in items],
+            metadatas=[item.metadata for item in items]
         )
 
         # Add to SQLite
-        cursor = self.sql_conn.cursor()
-        cursor.execute(
-            "INSERT INTO memory_items (id, session_id, type, content, timestamp, embedding_id) VALUES (?, ?, ?, ?, ?, ?)",
-            (memory_id, session_id, type, content, timestamp, memory_id)
-        )
-        self.sql_conn.commit()
-        return memory_id
+        with self.db.writer() as conn:
+            conn.executemany(
+                # An upsert rather than INSERT OR REPLACE: REPLACE deletes without firing the FTS delete trigger
+                "INSERT INTO memory_items (id, session_id, type, content, timestamp, embedding_id) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET session_id = excluded.session_id, type = excluded.type, "
+                "content = excluded.content, timestamp = excluded.timestamp, embedding_id = excluded.embedding_id",
+                [(item.id, item.session_id, item.type, item.content, item.timestamp, item.id) for item in items]
+            )
+            # A session starts with its first stored item
+            started: Dict[str, str] = {}
+            for item in items:
+                started.setdefault(item.session_id, item.timestamp)
+            conn.executemany(
+                "INSERT INTO sessions (id, user_id, start_time, status) VALUES (?, ?, ?, 'active') "
+                "ON CONFLICT(id) DO NOTHING",
+                [(session_id, self.tenant_id, timestamp) for session_id, timestamp in started.items()]
+            )
+            if self.dedup.enabled:
+                conn.executemany(
+                    "INSERT INTO memory_fingerprints (item_id, type, session_id, content_hash, simhash, "
+                    "band0, band1, band2, band3, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(item_id) DO UPDATE SET content_hash = excluded.content_hash, "
+                    "simhash = excluded.simhash, band0 = excluded.band0, band1 = excluded.band1, "
+                    "band2 = excluded.band2, band3 = excluded.band3",
+                    [self._fingerprint_row(item) for item in items]
+                )
+        if self.dedup.enabled:
+            self._settle_pending(items)
+        self.search_cache.bump(item.type for item in items)
+
+    def _fingerprint_row(self, item: PendingMemory) -> tuple:
+        digest, signature = self.dedup.fingerprint(item.content)
+        band_values = bands(signature) if signature is not None else [None] * BANDS
+        return (item.id, item.type, item.session_id, digest,
+                to_signed(signature) if signature is not None else None, *band_values, item.timestamp)
+
+    def _settle_pending(self, items: List[PendingMemory]):
+        """
+        Once a batch is committed, its items are found in SQLite; repeats counted
+        while they were pending are added to their stored hit counts.
+        """
+        with self._dedup_lock:
+            for item in items:
+                key = self._pending_key(item)
+                if self._pending_hashes.get(key) == item.id:
+                    del self._pending_hashes[key]
+            hits = [(*self._pending_hits.pop(item.id), item.id) for item in items if item.id in self._pending_hits]
+        if hits:
+            with self.db.writer() as conn:
+                conn.executemany(
+                    "UPDATE memory_fingerprints SET hit_count = hit_count + ?, last_seen = ? WHERE item_id = ?", hits
+                )
+
+    def _forget_pending(self, items: List[PendingMemory]):
+        # Items the buffer gave up on must not absorb later repeats
+        if not self.dedup.enabled:
+            return
+        with self._dedup_lock:
+            for item in items:
+                key = self._pending_key(item)
+                if self._pending_hashes.get(key) == item.id:
+                    del self._pending_hashes[key]
+                self._pending_hits.pop(item.id, None)
+
+    def flush(self, session_id: Optional[str] = None):
+        """
+        Writes out pending items; with a session_id, only if that session has any.
+        """
+        if self.write_buffer.has_pending(session_id):
+            self.write_buffer.flush()
+
+    def search_memory(self, query: str, type_filter: Optional[str] = None, limit: int = 5,
+                      session_id: Optional[str] = None, mode: str = "auto") -> List[Dict[str, Any]]:
+        """
+        Searches memory. Pending writes of `session_id` (or of every session when it is
+        not given) are flushed first, so a session always finds what it stored.
 
-    def search_memory(self, query: str, type_filter: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        mode: "vector" (semantic), "lexical" (FTS5/BM25, no embedding), "hybrid" (both,
+        fused by reciprocal rank) or "auto": lexical for identifier-like queries, falling
+        back to hybrid when that finds nothing, otherwise hybrid.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {mode!r}; expected one of {SEARCH_MODES}")
+        self.flush(session_id)
+        key = (query, type_filter, limit, mode)
+        cached = self.search_cache.get(key, type_filter)
+        if cached is not None:
+            return cached
+
+        # Stamped before searching: a write landing meanwhile invalidates the entry.
+        # The stamp also keys the flight, so a search that started before the flush
+        # above landed (and may miss its items) is not shared with this caller.
+        stamp = self.search_cache.stamp(type_filter)
+
+        def search():
+            results = self._search_memory(query, type_filter, limit, mode)
+            self.search_cache.put(key, stamp, results)
+            return results
+
+        return _search_flights.do((os.path.abspath(self.persist_dir), stamp) + key, search)
+
+    def _search_memory(self, query: str, type_filter: Optional[str] = None, limit: int = 5,
+                       mode: str = "vector") -> List[Dict[str, Any]]:
+        if mode == "auto":
+            if looks_like_identifier(query):
+                results = self._lexical_search(query, type_filter, limit)
+                if results:
+                    return results
+            mode = "hybrid"
+        if mode == "lexical":
+            return self._lexical_search(query, type_filter, limit)
+        if mode == "vector":
+            return self._vector_search(query, type_filter, limit)
+        # Each ranking contributes a deeper candidate list than the final limit
+        candidates = limit * 4
+        return self._fuse([
+            self._vector_search(query, type_filter, candidates),
+            self._lexical_search(query, type_filter, candidates)
+        ], limit)
+
+    def _vector_search(self, query: str, type_filter: Optional[str], limit: int) -> List[Dict[str, Any]]:
         where_filter = {}
         if type_filter:
             where_filter["type"] = type_filter
             
-        # ChromaDB search
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=limit,
+        return self.backend.query(
+            self.embedding_function([query])[0],
+            limit=limit,
             where=where_filter if where_filter else None
         )
-        
-        # Format results
-        formatted_results = []
-        if results['ids']:
-            for i in range(len(results['ids'][0])):
-                formatted_results.append({
-                    "id": results['ids'][0][i],
-                    "content": results['documents'][0][i],
-                    "metadata": results['metadatas'][0][i],
-                    "distance": results['distances'][0][i] if results['distances'] else None
-                })
-                
-        return formatted_results
 
-    def get_session_history(self, session_id: str) -> List[Dict[str, Any]]:
-        cursor = self.sql_conn.cursor()
-        cursor.execute(
-            "SELECT id, type, content, timestamp FROM memory_items WHERE session_id = ? ORDER BY timestamp ASC",
-            (session_id,)
+    def _lexical_search(self, query: str, type_filter: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        match = fts_query(query)
+        if not match:
+            return []
+        sql = (
+            "SELECT m.id, m.content, m.type, m.session_id, m.timestamp, bm25(memory_items_fts) AS rank "
+            "FROM memory_items_fts JOIN memory_items m ON m.rowid = memory_items_fts.rowid "
+            "WHERE memory_items_fts MATCH ?"
         )
-        rows = cursor.fetchall()
+        params: List[Any] = [match]
+        if type_filter:
+            sql += " AND m.type = ?"
+            params.append(type_filter)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        with self.db.reader() as conn:
+            rows = conn.execute(sql, params).fetchall()
         return [
-            {"id": r[0], "type": r[1], "content": r[2], "timestamp": r[3]}
+            {
+                "id": r[0],
+                "content": r[1],
+                "metadata": {"type": r[2], "session_id": r[3], "timestamp": r[4]},
+                "distance": None,
+                # bm25() is lower-is-better; flip it so larger means more relevant
+                "bm25": -r[5]
+            }
             for r in rows
         ]
 
+    @staticmethod
+    def _fuse(rankings: List[List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+        """
+        Reciprocal rank fusion: each result scores sum(1 / (RRF_K + rank)) over the
+        rankings it appears in. The first ranking's copy of a result is kept.
+        """
+        fused: Dict[str, Dict[str, Any]] = {}
+        for ranking in rankings:
+            for rank, result in enumerate(ranking, start=1):
+                entry = fused.setdefault(result["id"], dict(result, score=0.0))
+                entry["score"] += 1.0 / (RRF_K + rank)
+        return sorted(fused.values(), key=lambda r: r["score"], reverse=True)[:limit]
+
+    def get_session_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        The whole session, oldest first. Long sessions should page with
+        get_session_history_page() or stream with iter_session_history() instead.
+        """
+        return list(self.iter_session_history(session_id))
+
+    def get_session_history_page(self, session_id: str, cursor: Optional[str] = None, limit: int = 100,
+                                 fields: Optional[List[str]] = None,
+                                 max_content_chars: Optional[int] = None) -> Dict[str, Any]:
+        """
+        One page of a session's history, oldest first: {"items": [...], "next_cursor": ...}.
+        Pass next_cursor back for the following page; it is None on the last one.
+
+        Pages are keyset-paginated on (timestamp, id), so each costs the same however
+        deep into the session it is and items stored meanwhile are neither skipped nor
+        repeated. `fields` projects items onto a subset of HISTORY_FIELDS;
+        `max_content_chars` cuts content in SQL and marks cut items "truncated".
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        _check_history_fields(fields)
+        self.flush(session_id)
+        after = _decode_cursor(cursor) if cursor else None
+        # One extra row tells whether another page follows
+        rows = self._history_rows(session_id, after, limit + 1, max_content_chars)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "items": [_history_item(r, fields) for r in rows],
+            "next_cursor": _encode_cursor(rows[-1][3], rows[-1][0]) if has_more else None
+        }
+
+    def iter_session_history(self, session_id: str, fields: Optional[List[str]] = None,
+                             max_content_chars: Optional[int] = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Streams a session's history, oldest first, holding at most `batch_size` rows.
+        Batches are fetched as keyset pages, so no pooled reader connection is held
+        while the caller consumes them. Arguments are checked on the call, not on the
+        first item.
+        """
+        _check_history_fields(fields)
+        return self._iter_history(session_id, fields, max_content_chars, batch_size)
+
+    def _iter_history(self, session_id: str, fields: Optional[List[str]], max_content_chars: Optional[int],
+                      batch_size: int) -> Iterator[Dict[str, Any]]:
+        self.flush(session_id)
+        after = None
+        while True:
+            rows = self._history_rows(session_id, after, batch_size, max_content_chars)
+            for r in rows:
+                yield _history_item(r, fields)
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1][3], rows[-1][0])
+
+    def _history_rows(self, session_id: str, after: Optional[tuple], limit: int,
+                      max_content_chars: Optional[int]) -> List[tuple]:
+        if max_content_chars is None:
+            columns = "id, type, content, timestamp, 0"
+            params: List[Any] = []
+        else:
+            columns = "id, type, substr(content, 1, ?), timestamp, length(content) > ?"
+            params = [max_content_chars, max_content_chars]
+        sql = f"SELECT {columns} FROM memory_items WHERE session_id = ?"
+        params.append(session_id)
+        if after is not None:
+            sql += " AND (timestamp, id) > (?, ?)"
+            params.extend(after)
+        sql += " ORDER BY timestamp, id LIMIT ?"
+        params.append(limit)
+        with self.db.reader() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def delete_memories(self, ids: List[str]) -> int:
+        """
+        Removes items from the vector index and SQLite (and with it the FTS index).
+        The vector delete goes first and both are idempotent, so a failure part way
+        leaves items that a retry removes rather than orphaned index entries.
+        Returns the number of SQLite rows deleted.
+        """
+        self.flush()
+        deleted = 0
+        # Bounded chunks keep each statement under SQLite's host parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            self.backend.delete(chunk)
+            with self.db.writer() as conn:
+                deleted += conn.execute(
+                    f"DELETE FROM memory_items WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).rowcount
+            self.search_cache.bump()
+        return deleted
+
+    def export_memories(self, path: str, format: Optional[str] = None, chunk_size: int = 10_000) -> int:
+        """
+        Streams every item, with its stored vector, to a Parquet or Arrow IPC file
+        (requires pyarrow). See memory_transfer.export_memories.
+        """
+        from anti_gravity_system.src.core.memory_transfer import export_memories
+        return export_memories(self, path, format, chunk_size)
+
+    def import_memories(self, path: str, format: Optional[str] = None, batch_size: int = 5_000,
+                        reembed: Optional[bool] = None) -> int:
+        """
+        Loads an export_memories() file, reusing its vectors instead of re-embedding
+        (requires pyarrow). See memory_transfer.import_memories.
+        """
+        from anti_gravity_system.src.core.memory_transfer import import_memories
+        return import_memories(self, path, format, batch_size, reembed)
+
     def close(self):
-        self.sql_conn.close()
+        """
+        Releases one handle; the last one flushes pending writes and closes the
+        databases.
+        """
+        # Same lock order as open_memory_store, so a handle cannot be taken on a store being closed
+        with _stores_lock, self._refs_lock:
+            if self._refs == 0:
+                return
+            self._refs -= 1
+            if self._refs:
+                return
+            self._closing = True
+        try:
+            self.write_buffer.close()
+            self.backend.close()
+            self.db.close()
+        finally:
+            with _stores_lock:
+                key = os.path.realpath(self.persist_dir)
+                if _stores.get(key) is self:
+                    del _stores[key]
+            self._shut_down.set()
+
+
+def _encode_cursor(timestamp: str, memory_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([timestamp, memory_id]).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        timestamp, memory_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid history cursor {cursor!r}") from e
+    return timestamp, memory_id
+
+
+def _history_item(row: tuple, fields: Optional[List[str]]) -> Dict[str, Any]:
+    item = {"id": row[0], "type": row[1], "content": row[2], "timestamp": row[3]}
+    if row[4]:
+        item["truncated"] = True
+    if fields:
+        item = {k: v for k, v in item.items() if k in fields or k == "truncated"}
+    return item
+
+
+def _check_history_fields(fields: Optional[List[str]]):
+    unknown = set(fields or ()) - set(HISTORY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown history fields {sorted(unknown)}; expected a subset of {HISTORY_FIELDS}")
+
+
+_stores: Dict[str, MemoryStore] = {}
+_stores_lock = threading.Lock()
+_store_opens = SingleFlight("memory_store_open")
+
+
+def open_memory_store(persist_dir: str = "./antigravity_data/memory",
+                      vector_backend: Optional[str] = None, tenant_id: Optional[str] = None) -> MemoryStore:
+    """
+    The process-wide store for `persist_dir` (resolved, so relative paths and
+    symlinks to one directory share it), opened on first use. Every call takes a
+    handle that the caller gives back with store.close(). `vector_backend` and
+    `tenant_id` only apply to the first open; asking an open store for a different
+    backend is an error.
+    """
+    key = os.path.realpath(persist_dir)
+    while True:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is not None and not store._closing:
+                if vector_backend and vector_backend != store.vector_backend:
+                    raise ValueError(f"Memory store at {key} is already open with the {store.vector_backend} backend")
+                with store._refs_lock:
+                    store._refs += 1
+                return store
+        if store is not None:
+            # The last handle is being closed: its files are in use until it finishes
+            store._shut_down.wait()
+            continue
+
+        # Migrations, the Chroma connection and the embedder make opening slow, so it
+        # happens outside the registry lock; concurrent opens of this directory wait
+        # for the one construction and then take a handle on it like any other caller
+        built: List[MemoryStore] = []
+
+        def build():
+            opened = MemoryStore(persist_dir=key, vector_backend=vector_backend, tenant_id=tenant_id)
+            with _stores_lock:
+                _stores[key] = opened
+            built.append(opened)
+
+        _store_opens.do(key, build)
+        if built:
+            return built[0]
+
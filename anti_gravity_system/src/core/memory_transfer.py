@@ -0,0 +1,203 @@
+import os
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from anti_gravity_system.src.core.write_behind import PendingMemory
+from anti_gravity_system.src.utils.logger import logger
+
+# Bump when the column layout changes; import refuses versions it does not know
+FORMAT_VERSION = "1"
+FORMATS = ("parquet", "arrow")
+
+COLUMNS = ("id", "session_id", "type", "content", "timestamp", "metadata", "embedding")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Memory export/import needs pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def infer_format(path: str, format: Optional[str] = None) -> str:
+    if format:
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format {format!r}; expected one of {FORMATS}")
+        return format
+    return "parquet" if path.endswith(".parquet") else "arrow"
+
+
+def embedding_model(store) -> str:
+    # Unknown for a bare callable (tests stub the embedder with one)
+    return getattr(store.embedding_function, "model", "") or ""
+
+
+def _schema(pa, store):
+    return pa.schema([
+        ("id", pa.string()),
+        ("session_id", pa.string()),
+        ("type", pa.string()),
+        ("content", pa.string()),
+        ("timestamp", pa.string()),
+        # JSON, since metadata keys vary by item
+        ("metadata", pa.string()),
+        # Null when the vector index had no vector for the row; import embeds those
+        ("embedding", pa.list_(pa.float32())),
+    ], metadata={
+        "antigravity.format_version": FORMAT_VERSION,
+        "antigravity.embedding_model": embedding_model(store),
+        "antigravity.vector_backend": store.vector_backend,
+    })
+
+
+def _embedding_array(pa, embeddings: List[Optional[np.ndarray]]):
+    lengths = np.array([0 if e is None else len(e) for e in embeddings], dtype=np.int32)
+    offsets = np.zeros(len(embeddings) + 1, dtype=np.int32)
+    np.cumsum(lengths, out=offsets[1:])
+    present = [e for e in embeddings if e is not None]
+    values = np.concatenate(present).astype(np.float32, copy=False) if present else np.zeros(0, dtype=np.float32)
+    missing = pa.array([e is None for e in embeddings], type=pa.bool_())
+    return pa.ListArray.from_arrays(pa.array(offsets), pa.array(values), mask=missing)
+
+
+def export_memories(store, path: str, format: Optional[str] = None, chunk_size: int = 10_000) -> int:
+    """
+    Writes every item of `store`, with its stored vector and metadata, to a Parquet
+    or Arrow IPC file, `chunk_size` rows per record batch. Rows are read from SQLite
+    by rowid in chunks, so memory use is bounded by the chunk, not the store. The
+    file is written beside `path` and renamed into place when complete.
+    Returns the number of rows written.
+    """
+    pa = _pyarrow()
+    format = infer_format(path, format)
+    schema = _schema(pa, store)
+    store.flush()
+
+    tmp = path + ".tmp"
+    if format == "parquet":
+        writer = pa.parquet.ParquetWriter(tmp, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(tmp, schema)
+    written = 0
+    try:
+        for rows in _chunks(store, chunk_size):
+            ids = [r[1] for r in rows]
+            stored = store.backend.get(ids)
+            metadatas = []
+            for r in rows:
+                metadata = stored.get(r[1], {}).get("metadata") or {
+                    "type": r[3], "session_id": r[2], "timestamp": r[5]
+                }
+                metadatas.append(json.dumps(metadata))
+            batch = pa.record_batch([
+                pa.array(ids, type=pa.string()),
+                pa.array([r[2] for r in rows], type=pa.string()),
+                pa.array([r[3] for r in rows], type=pa.string()),
+                pa.array([r[4] for r in rows], type=pa.string()),
+                pa.array([r[5] for r in rows], type=pa.string()),
+                pa.array(metadatas, type=pa.string()),
+                _embedding_array(pa, [stored[i]["embedding"] if i in stored else None for i in ids]),
+            ], schema=schema)
+            writer.write_batch(batch)
+            written += len(rows)
+    except BaseException:
+        writer.close()
+        os.remove(tmp)
+        raise
+    writer.close()
+    os.replace(tmp, path)
+    logger.info(f"Exported {written} memory items from {store.persist_dir} to {path}")
+    return written
+
+
+def _chunks(store, chunk_size: int) -> Iterator[List[tuple]]:
+    last = 0
+    while True:
+        with store.db.reader() as conn:
+            rows = conn.execute(
+                "SELECT rowid, id, session_id, type, content, timestamp FROM memory_items "
+                "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last, chunk_size)
+            ).fetchall()
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def import_memories(store, path: str, format: Optional[str] = None, batch_size: int = 5_000,
+                    reembed: Optional[bool] = None) -> int:
+    """
+    Loads a file written by export_memories() into `store`, `batch_size` rows per
+    write. Stored vectors are written as they are; only rows without one are
+    embedded. With reembed=None, vectors are recomputed when the file records a
+    different embedding model than the store uses. Items keep their ids, so
+    importing twice overwrites rather than duplicates. Returns the number of rows.
+    """
+    pa = _pyarrow()
+    format = infer_format(path, format)
+    if format == "parquet":
+        source = pa.parquet.ParquetFile(path)
+        metadata = source.schema_arrow.metadata or {}
+        batches = source.iter_batches(batch_size=batch_size)
+    else:
+        # Memory-mapped, so record batches are read from the page cache rather than copied
+        source = pa.ipc.open_file(pa.memory_map(path, "r"))
+        metadata = source.schema.metadata or {}
+        batches = (
+            sliced
+            for i in range(source.num_record_batches)
+            for sliced in _slices(source.get_batch(i), batch_size)
+        )
+
+    version = metadata.get(b"antigravity.format_version", b"").decode()
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a memory export this version can read (format version {version!r})")
+    if reembed is None:
+        exported_model = metadata.get(b"antigravity.embedding_model", b"").decode()
+        current_model = embedding_model(store)
+        reembed = bool(exported_model and current_model and exported_model != current_model)
+        if reembed:
+            logger.warning(f"{path} was embedded with {exported_model}, the store uses {current_model}: re-embedding")
+
+    imported = 0
+    for batch in batches:
+        columns = _columns(batch)
+        items = [
+            PendingMemory(id, session_id, type_, content, timestamp, json.loads(metadata_json))
+            for id, session_id, type_, content, timestamp, metadata_json in zip(
+                columns["id"], columns["session_id"], columns["type"], columns["content"],
+                columns["timestamp"], columns["metadata"]
+            )
+        ]
+        # Bypasses the write-behind buffer: the batch is already as large as a flush
+        store.write_batch(items, None if reembed else columns["embedding"])
+        imported += len(items)
+    logger.info(f"Imported {imported} memory items from {path} into {store.persist_dir}")
+    return imported
+
+
+def _slices(batch, size: int):
+    for start in range(0, batch.num_rows, size):
+        yield batch.slice(start, size)
+
+
+def _columns(batch) -> Dict[str, Any]:
+    """
+    The batch as Python lists, except embeddings: one float32 array per row (None
+    when missing), viewed from the Arrow buffer rather than boxed float by float.
+    """
+    columns = {name: batch.column(name).to_pylist() for name in COLUMNS if name != "embedding"}
+    embeddings = batch.column("embedding")
+    values = embeddings.values.to_numpy(zero_copy_only=False)
+    offsets = embeddings.offsets.to_numpy()
+    valid = embeddings.is_valid().to_numpy(zero_copy_only=False)
+    columns["embedding"] = [
+        values[offsets[i]:offsets[i + 1]] if valid[i] else None for i in range(len(embeddings))
+    ]
+    return columns
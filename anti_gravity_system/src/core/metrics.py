@@ -1,8 +1,82 @@
 from typing import Dict, Any, List
 import time
 from dataclasses import dataclass, field
+from prometheus_client import Counter, Histogram, Gauge
 from anti_gravity_system.src.utils.logger import logger
 
+# --- Process-wide Prometheus collectors (exported via /metrics) ---
+POOL_CHECKOUT_WAIT = Histogram(
+    "agent_pool_checkout_wait_seconds", "Time spent waiting to check out a pooled agent", ["pool"]
+)
+POOL_AVAILABLE = Gauge("agent_pool_available", "Idle agents currently in the pool", ["pool"])
+
+LLM_CACHE_HITS = Counter("llm_cache_hits_total", "LLM response cache hits", ["tier"])
+LLM_CACHE_MISSES = Counter("llm_cache_misses_total", "LLM response cache misses")
+LLM_CACHE_EVICTIONS = Counter("llm_cache_evictions_total", "LLM response cache evictions", ["tier", "reason"])
+
+PLAN_CACHE_SERVED = Counter("plan_cache_served_total", "Plans served from the semantic plan cache")
+PLAN_CACHE_EVICTIONS = Counter("plan_cache_evictions_total", "Plans evicted from the semantic plan cache", ["reason"])
+PLAN_LATENCY = Histogram("plan_stage_latency_seconds", "Think+plan latency by plan source", ["source"])
+
+SINGLE_FLIGHT_COALESCED = Counter(
+    "single_flight_coalesced_total", "Calls served by an identical in-flight call", ["group"]
+)
+
+LLM_QUEUE_WAIT = Histogram(
+    "llm_queue_wait_seconds", "Time an LLM call waited for rate-limit budget and a concurrency slot", ["model"]
+)
+LLM_CONCURRENCY_LIMIT = Gauge("llm_concurrency_limit", "Current adaptive concurrency cap", ["model"])
+LLM_THROTTLED = Counter("llm_throttled_total", "LLM calls rejected with 429 or timed out", ["model", "reason"])
+LLM_RETRIES = Counter("llm_retries_total", "LLM call retries", ["model"])
+LLM_CALL_LATENCY = Histogram("llm_call_latency_seconds", "Upstream LLM call latency", ["model"])
+TOKEN_USAGE = Counter("llm_token_usage_total", "Total LLM tokens used", ["model", "kind"])
+
+MEMORY_WRITE_BATCH_SIZE = Histogram(
+    "memory_write_batch_size", "Items per write-behind memory flush", buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+
+# Hit rate = hit / (hit + miss)
+EMBEDDING_CACHE_LOOKUPS = Counter("embedding_cache_lookups_total", "Embedding cache lookups", ["model", "result"])
+EMBEDDING_CACHE_EVICTIONS = Counter("embedding_cache_evictions_total", "Embeddings evicted from the LRU cache", ["model"])
+EMBEDDING_BATCH_SIZE = Histogram(
+    "embedding_batch_size", "Texts per embedding model call", ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048)
+)
+EMBEDDING_BATCH_LATENCY = Histogram("embedding_batch_latency_seconds", "Embedding model call latency", ["model"])
+EMBEDDING_TEXTS = Counter("embedding_texts_total", "Texts embedded (cache misses)", ["model"])
+EMBEDDING_THROUGHPUT = Gauge(
+    "embedding_throughput_texts_per_second", "Texts per second over the latest embedding call", ["model"]
+)
+
+MEMORY_COMPACTION_ITEMS = Counter("memory_compaction_items_total", "Memory items removed by compaction", ["reason"])
+MEMORY_COMPACTION_BYTES = Counter("memory_compaction_bytes_reclaimed_total", "Bytes reclaimed by memory compaction", ["kind"])
+
+MEMORY_SEARCH_CACHE_LOOKUPS = Counter(
+    "memory_search_cache_lookups_total", "Memory search result cache lookups", ["result"]
+)
+MEMORY_SEARCH_CACHE_EVICTIONS = Counter(
+    "memory_search_cache_evictions_total", "Memory search results evicted from the LRU cache"
+)
+
+MEMORY_SHARDS_OPEN = Gauge("memory_tenant_shards_open", "Tenant memory shards kept open between requests")
+MEMORY_SHARD_EVICTIONS = Counter("memory_tenant_shard_evictions_total", "Tenant memory shards released by the open-shard LRU")
+
+MEMORY_DEDUP_WRITES = Counter(
+    "memory_dedup_writes_total", "Memory writes with dedup on, by outcome (inserted, exact, near)", ["outcome"]
+)
+MEMORY_DEDUP_RATIO = Gauge("memory_dedup_ratio", "Share of memory writes suppressed as duplicates")
+
+CHROMA_REQUEST_RETRIES = Counter(
+    "chroma_request_retries_total", "Chroma server requests resent, by reason (error type or status)", ["reason"]
+)
+CHROMA_FALLBACKS = Counter("chroma_fallbacks_total", "Memory stores opened on the local index because the Chroma server was unreachable")
+
+BACKGROUND_QUEUE_DEPTH = Gauge("background_queue_depth", "Tasks waiting in a background executor", ["executor"])
+BACKGROUND_BACKPRESSURE = Counter(
+    "background_backpressure_total", "Submissions that found a background queue full", ["executor", "outcome"]
+)
+BACKGROUND_TASK_ERRORS = Counter("background_task_errors_total", "Background tasks that raised", ["executor"])
+
 @dataclass
 class MetricRecord:
     metric_name: str
@@ -17,6 +91,13 @@ class MetricsTracker:
         self.start_times: Dict[str, float] = {}
         logger.info("MetricsTracker initialized")
 
+    def reset(self):
+        """
+        Drops all per-session records and pending timers.
+        """
+        self.records = []
+        self.start_times = {}
+
     def start_timer(self, operation_id: str):
         self.start_times[operation_id] = time.time()
 
@@ -37,7 +118,12 @@ class MetricsTracker:
             "total_latency": 0.0,
             "total_cost": 0.0,
             "total_errors": 0,
-            "tasks_completed": 0
+            "tasks_completed": 0,
+            # Memory I/O moved off the critical path: time spent in background memory
+            # calls, time the session blocked on them, and the difference
+            "memory_io_time": 0.0,
+            "memory_wait_time": 0.0,
+            "memory_latency_saved": 0.0
         }
         
         for r in self.records:
@@ -49,5 +135,10 @@ class MetricsTracker:
                 summary["total_errors"] += int(r.value)
             elif r.metric_name == "task_completion":
                 summary["tasks_completed"] += int(r.value)
-                
+            elif r.metric_name == "memory_io":
+                summary["memory_io_time"] += r.value
+            elif r.metric_name == "memory_wait":
+                summary["memory_wait_time"] += r.value
+
+        summary["memory_latency_saved"] = max(0.0, summary["memory_io_time"] - summary["memory_wait_time"])
         return summary
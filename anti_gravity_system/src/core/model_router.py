@@ -0,0 +1,42 @@
+from typing import Dict, Any, List, Optional
+
+DEFAULT_MODEL = "gpt-4-turbo-preview"
+
+
+class ModelRouter:
+    """
+    Resolves which model an agent uses for a given stage, from the `model_routing`
+    section of agents.yaml and the per-agent `model` fields.
+
+    Resolution order for (agent_id, stage):
+        1. model_routing.stages["<agent_id>.<stage>"]
+        2. model_routing.stages["<agent_id>"]
+        3. the agent's own `model` field
+        4. model_routing.default_model
+    Values may name a tier (model_routing.tiers) or a concrete model.
+    """
+
+    def __init__(self, routing_config: Optional[Dict[str, Any]] = None,
+                 agents_config: Optional[List[Dict[str, Any]]] = None):
+        routing_config = routing_config or {}
+        self.tiers: Dict[str, str] = routing_config.get("tiers", {})
+        self.default_model = self._model(routing_config.get("default_model", DEFAULT_MODEL))
+        self.stages: Dict[str, str] = routing_config.get("stages", {})
+        self.agent_models = {
+            agent["id"]: agent["model"] for agent in (agents_config or []) if agent.get("id") and agent.get("model")
+        }
+        # Model a rejected step is retried on, or None when escalation is off
+        escalation = routing_config.get("escalation", {})
+        self.escalation_model = (
+            self._model(escalation.get("model", "large")) if escalation.get("enabled", False) else None
+        )
+
+    def resolve(self, agent_id: str, stage: Optional[str] = None) -> str:
+        route = None
+        if stage:
+            route = self.stages.get(f"{agent_id}.{stage}")
+        route = route or self.stages.get(agent_id) or self.agent_models.get(agent_id)
+        return self._model(route) if route else self.default_model
+
+    def _model(self, name: str) -> str:
+        return self.tiers.get(name, name)
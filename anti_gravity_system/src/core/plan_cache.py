@@ -0,0 +1,195 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from anti_gravity_system.src.core.metrics import PLAN_CACHE_SERVED, PLAN_CACHE_EVICTIONS
+from anti_gravity_system.src.core.vector_backends import VectorBackend, ChromaBackend, NumpyBackend, index_suffix
+from anti_gravity_system.src.utils.logger import logger
+
+
+def create_plan_backend(store, name: str = "antigravity_plans") -> VectorBackend:
+    """
+    A plan index next to the store's memory index, on the same kind of backend and
+    suffixed by the same embedding model. Chroma is only opened for the chroma backend.
+    """
+    name += index_suffix(getattr(store.embedding_function, "model", None))
+    if store.vector_backend == "numpy":
+        return NumpyBackend(os.path.join(store.persist_dir, name), indexed_fields=("user_id",))
+    return ChromaBackend(store.chroma_client, name)
+
+
+class PlanCache:
+    """
+    Semantic cache of plans that previously completed with critic approval.
+
+    Requests are normalised and embedded with the memory store's embedder, and
+    the vectors kept in a dedicated `antigravity_plans` index on the store's
+    vector backend. A stored plan is reused when the nearest request of the same
+    user is similar enough and the plan's approval history is good; plans are
+    never served across users, since a plan carries the request it was made for.
+    """
+
+    def __init__(self, store, similarity_threshold: float = 0.92, min_approval_rate: float = 0.8,
+                 max_age_days: float = 30, max_entries: int = 1000,
+                 name: str = "antigravity_plans", backend: Optional[VectorBackend] = None):
+        self.store = store
+        self.similarity_threshold = similarity_threshold
+        self.min_approval_rate = min_approval_rate
+        self.max_age_seconds = max_age_days * 86400
+        self.max_entries = max_entries
+        self.backend = backend or create_plan_backend(store, name)
+        self._lock = threading.Lock()
+        self._records_since_eviction = 0
+
+    @classmethod
+    def from_config(cls, store, config: Dict[str, Any]) -> Optional["PlanCache"]:
+        """
+        Builds a cache from the orchestrator's `plan_cache` config block, or None when disabled.
+        """
+        if not config or not config.get("enabled", False):
+            return None
+        try:
+            return cls(
+                store,
+                similarity_threshold=float(config.get("similarity_threshold", 0.92)),
+                min_approval_rate=float(config.get("min_approval_rate", 0.8)),
+                max_age_days=float(config.get("max_age_days", 30)),
+                max_entries=int(config.get("max_entries", 1000))
+            )
+        except Exception as e:
+            logger.error(f"Plan cache unavailable: {e}")
+            return None
+
+    @staticmethod
+    def normalize(request: str) -> str:
+        text = re.sub(r"[^\w\s]", " ", request.lower())
+        return re.sub(r"\s+", " ", text).strip()
+
+    @staticmethod
+    def entry_id(normalized_request: str, user_id: Optional[str] = None) -> str:
+        return hashlib.sha256(f"{user_id or ''}\0{normalized_request}".encode("utf-8")).hexdigest()
+
+    def lookup(self, request: str, user_id: Optional[str] = None) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Returns (entry_id, plan) for a sufficiently similar, well-reviewed plan that
+        `user_id` recorded (anonymous sessions share the plans of user None).
+        """
+        normalized = self.normalize(request)
+        try:
+            embedding = self.store.embedding_function([normalized])[0]
+            results = self.backend.query(embedding, limit=1, where={"user_id": user_id or ""})
+        except Exception as e:
+            logger.error(f"Plan cache lookup failed: {e}")
+            return None
+
+        if not results:
+            return None
+
+        entry_id = results[0]["id"]
+        metadata = results[0]["metadata"]
+        similarity = 1.0 - results[0]["distance"]
+        if similarity < self.similarity_threshold:
+            return None
+        if time.time() - metadata.get("created_at", 0) > self.max_age_seconds:
+            return None
+        reviews = metadata.get("reviews", 0)
+        if reviews and metadata.get("approvals", 0) / reviews < self.min_approval_rate:
+            return None
+
+        try:
+            with self._lock:
+                self._update(entry_id, lambda m: {"uses": m.get("uses", 0) + 1, "last_used": time.time()})
+        except Exception as e:
+            logger.error(f"Plan cache usage update failed: {e}")
+
+        PLAN_CACHE_SERVED.inc()
+        logger.info(f"Plan cache hit (similarity {similarity:.3f}) for: {request}")
+        return entry_id, json.loads(metadata["plan"])
+
+    def record(self, request: str, plan: List[Dict[str, Any]], approved_steps: int, total_steps: int,
+               entry_id: Optional[str] = None, user_id: Optional[str] = None):
+        """
+        Records the outcome of a session. Outcomes of a served plan update its approval
+        history; new plans are only stored when every step was approved.
+        """
+        try:
+            store_new = not entry_id and total_steps and approved_steps == total_steps
+            if store_new:
+                normalized = self.normalize(request)
+                # Embedded outside the lock, which lookups take too
+                embeddings = self.store.embedding_function([normalized])
+            with self._lock:
+                if entry_id:
+                    self._update_history(entry_id, approved_steps, total_steps)
+                elif store_new:
+                    now = time.time()
+                    self.backend.upsert(
+                        ids=[self.entry_id(normalized, user_id)],
+                        embeddings=embeddings,
+                        documents=[normalized],
+                        metadatas=[{
+                            "request": normalized,
+                            "user_id": user_id or "",
+                            "plan": json.dumps(plan),
+                            "approvals": approved_steps,
+                            "reviews": total_steps,
+                            "uses": 0,
+                            "created_at": now,
+                            "last_used": now
+                        }]
+                    )
+                self._records_since_eviction += 1
+                if self._records_since_eviction >= 50:
+                    self._records_since_eviction = 0
+                    self.evict()
+        except Exception as e:
+            logger.error(f"Plan cache record failed: {e}")
+
+    def _update_history(self, entry_id: str, approved_steps: int, total_steps: int):
+        self._update(entry_id, lambda m: {
+            "approvals": m.get("approvals", 0) + approved_steps,
+            "reviews": m.get("reviews", 0) + total_steps
+        })
+
+    def _update(self, entry_id: str, changes: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        # Backends have no partial update: re-upsert the stored vector with merged metadata
+        existing = self.backend.get([entry_id]).get(entry_id)
+        if existing is None:
+            return
+        metadata = {**existing["metadata"], **changes(existing["metadata"])}
+        self.backend.upsert([entry_id], [existing["embedding"]], [metadata.get("request", "")], [metadata])
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """
+        Drops plans older than max_age, then the least used / least recently used
+        plans beyond max_entries. Returns the number of evicted plans.
+        """
+        now = now or time.time()
+        entries = {entry_id: entry["metadata"] for entry_id, entry in self.backend.get(self.backend.ids()).items()}
+        expired = [
+            entry_id for entry_id, metadata in entries.items()
+            if now - metadata.get("created_at", 0) > self.max_age_seconds
+        ]
+
+        expired_ids = set(expired)
+        live = [
+            (metadata.get("uses", 0), metadata.get("last_used", 0), entry_id)
+            for entry_id, metadata in entries.items()
+            if entry_id not in expired_ids
+        ]
+        overflow = []
+        if len(live) > self.max_entries:
+            live.sort()
+            overflow = [entry_id for _, _, entry_id in live[:len(live) - self.max_entries]]
+
+        if expired or overflow:
+            self.backend.delete(expired + overflow)
+        if expired:
+            PLAN_CACHE_EVICTIONS.labels(reason="age").inc(len(expired))
+        if overflow:
+            PLAN_CACHE_EVICTIONS.labels(reason="usage").inc(len(overflow))
+        return len(expired) + len(overflow)
@@ -0,0 +1,153 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, List, Callable, Awaitable
+from anti_gravity_system.src.utils.logger import logger
+
+
+class PlanCycleError(ValueError):
+    """Raised when the `depends_on` edges of a plan do not form a DAG."""
+
+
+class PlanGraph:
+    """
+    Dependency graph over plan steps.
+
+    Steps reference each other through `depends_on: [step_id, ...]`. When no step
+    declares `depends_on` at all, the plan is treated as a plain list and each step
+    depends on the one before it (legacy sequential behaviour).
+    """
+
+    def __init__(self, plan: List[Dict[str, Any]]):
+        self.order: List[str] = []
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.dependencies: Dict[str, List[str]] = {}
+
+        for index, step in enumerate(plan):
+            step_id = self._key(step.get("id", index + 1))
+            if step_id in self.steps:
+                # Duplicate ids from the LLM; keep them distinct
+                step_id = f"{step_id}#{index}"
+            self.order.append(step_id)
+            self.steps[step_id] = step
+
+        has_edges = any("depends_on" in step for step in plan)
+        for position, step_id in enumerate(self.order):
+            if not has_edges:
+                self.dependencies[step_id] = [self.order[position - 1]] if position else []
+                continue
+            deps = []
+            for dep in self.steps[step_id].get("depends_on") or []:
+                dep_id = self._key(dep)
+                if dep_id not in self.steps or dep_id == step_id:
+                    logger.warning(f"Plan step {step_id} has invalid dependency '{dep}', ignoring it.")
+                    continue
+                deps.append(dep_id)
+            self.dependencies[step_id] = deps
+
+        self._check_acyclic()
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    @staticmethod
+    def _key(step_id: Any) -> str:
+        return str(step_id)
+
+    def _check_acyclic(self):
+        # Kahn's algorithm: anything left unvisited sits on a cycle
+        remaining = {step_id: len(deps) for step_id, deps in self.dependencies.items()}
+        dependents: Dict[str, List[str]] = {step_id: [] for step_id in self.order}
+        for step_id, deps in self.dependencies.items():
+            for dep in deps:
+                dependents[dep].append(step_id)
+
+        frontier = [step_id for step_id, count in remaining.items() if count == 0]
+        visited = 0
+        while frontier:
+            current = frontier.pop()
+            visited += 1
+            for child in dependents[current]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    frontier.append(child)
+
+        if visited != len(self.order):
+            cyclic = [step_id for step_id, count in remaining.items() if count > 0]
+            raise PlanCycleError(f"Plan contains a dependency cycle between steps: {cyclic}")
+
+    def ready(self, finished, scheduled) -> List[str]:
+        """
+        Step ids whose dependencies have all finished and which are not yet scheduled.
+        """
+        return [
+            step_id for step_id in self.order
+            if step_id not in scheduled and all(dep in finished for dep in self.dependencies[step_id])
+        ]
+
+    @classmethod
+    def sequential(cls, plan: List[Dict[str, Any]]) -> "PlanGraph":
+        """
+        Builds a graph that ignores any declared edges and runs steps in list order.
+        """
+        return cls([{k: v for k, v in step.items() if k != "depends_on"} for step in plan])
+
+
+def execute_plan_graph(graph: PlanGraph,
+                       run_step: Callable[[Dict[str, Any], Dict[str, Any]], Any],
+                       max_workers: int = 4) -> List[Any]:
+    """
+    Runs every step as soon as its dependencies have finished, with at most
+    `max_workers` steps in flight. `run_step(step, upstream)` receives the results
+    of the step's direct dependencies keyed by step id. Results are returned in
+    plan order. The first step failure is re-raised.
+    """
+    results: Dict[str, Any] = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="plan-step") as executor:
+        in_flight = {}
+        while len(results) < len(graph):
+            scheduled = set(results) | set(in_flight.values())
+            for step_id in graph.ready(results, scheduled):
+                upstream = {dep: results[dep] for dep in graph.dependencies[step_id]}
+                future = executor.submit(run_step, graph.steps[step_id], upstream)
+                in_flight[future] = step_id
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                step_id = in_flight.pop(future)
+                results[step_id] = future.result()
+
+    return [results[step_id] for step_id in graph.order]
+
+
+async def aexecute_plan_graph(graph: PlanGraph,
+                              run_step: Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Any]],
+                              max_concurrency: int = 4) -> List[Any]:
+    """
+    Asyncio twin of execute_plan_graph: ready steps run as tasks on the current
+    event loop, bounded by a semaphore. Remaining tasks are cancelled if a step fails.
+    """
+    results: Dict[str, Any] = {}
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def bounded(step: Dict[str, Any], upstream: Dict[str, Any]) -> Any:
+        async with semaphore:
+            return await run_step(step, upstream)
+
+    in_flight: Dict[asyncio.Task, str] = {}
+    try:
+        while len(results) < len(graph):
+            scheduled = set(results) | set(in_flight.values())
+            for step_id in graph.ready(results, scheduled):
+                upstream = {dep: results[dep] for dep in graph.dependencies[step_id]}
+                task = asyncio.ensure_future(bounded(graph.steps[step_id], upstream))
+                in_flight[task] = step_id
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                step_id = in_flight.pop(task)
+                results[step_id] = task.result()
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+    return [results[step_id] for step_id in graph.order]
@@ -0,0 +1,291 @@
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import openai
+
+from anti_gravity_system.src.core.metrics import (
+    LLM_QUEUE_WAIT, LLM_CONCURRENCY_LIMIT, LLM_THROTTLED, LLM_RETRIES
+)
+from anti_gravity_system.src.utils.logger import logger
+
+# Errors that signal an overloaded upstream; they shrink the concurrency limit and are retried
+THROTTLE_ERRORS = (openai.RateLimitError, openai.APITimeoutError)
+RETRYABLE_ERRORS = THROTTLE_ERRORS + (openai.APIConnectionError, openai.InternalServerError)
+
+
+class TokenBucket:
+    """
+    Continuously refilling bucket sized to one minute of budget. reserve() debits
+    immediately and returns how long the caller must wait for the debt to refill,
+    so waiting callers are served in arrival order. A budget <= 0 means unlimited.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        if self.capacity <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            # A single request larger than the whole budget still gets through, alone
+            self.tokens -= min(amount, self.capacity)
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, amount: float):
+        """
+        Debits (or refunds, when negative) the difference between estimated and actual usage.
+        """
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    AIMD concurrency cap: each success raises the limit by 1/limit (about +1 per
+    window of requests), a throttle signal halves it, at most once per cooldown.
+    Other failures release the slot without adapting.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32, cooldown_seconds: float = 1.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.cooldown_seconds = cooldown_seconds
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    async def aacquire(self):
+        # The limit is shared with threads, so the event loop polls instead of blocking on the condition
+        delay = 0.005
+        while not self.try_acquire():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def release(self, outcome: str = "success"):
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if outcome == "throttled":
+                if now - self._last_decrease >= self.cooldown_seconds:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self._last_decrease = now
+            elif outcome == "success":
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class ModelRateLimiter:
+    """
+    Per-model admission control for LLM calls: RPM and TPM token buckets, an
+    adaptive concurrency cap and jittered retries that honour Retry-After.
+    """
+
+    def __init__(self, model: str, rpm: float = 500, tpm: float = 150000, initial_concurrency: int = 4,
+                 max_concurrency: int = 32, max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 20.0):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.concurrency = AdaptiveConcurrencyLimit(initial_concurrency, 1, max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        LLM_CONCURRENCY_LIMIT.labels(model=model).set(self.concurrency.limit)
+
+    def call(self, fn: Callable[[], Any], estimated_tokens: int, hold: bool = False) -> Any:
+        """
+        Runs `fn` once admitted, retrying throttles and transient errors. With
+        `hold`, a successful call keeps its concurrency slot for the caller to
+        give back through _finish() (see stream()).
+        """
+        for attempt in range(self.max_retries + 1):
+            start = time.time()
+            time.sleep(self._reserve(estimated_tokens))
+            self.concurrency.acquire()
+            LLM_QUEUE_WAIT.labels(model=self.model).observe(time.time() - start)
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self._on_success(result, estimated_tokens, release=not hold)
+            return result
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], estimated_tokens: int, hold: bool = False) -> Any:
+        for attempt in range(self.max_retries + 1):
+            start = time.time()
+            await asyncio.sleep(self._reserve(estimated_tokens))
+            await self.concurrency.aacquire()
+            LLM_QUEUE_WAIT.labels(model=self.model).observe(time.time() - start)
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                self.concurrency.release("cancelled")
+                raise
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self._on_success(result, estimated_tokens, release=not hold)
+            return result
+
+    @contextmanager
+    def stream(self, fn: Callable[[], Any], estimated_tokens: int) -> Iterator[Any]:
+        """
+        call() for a streamed response. Creating the stream only opens it; the
+        upstream keeps generating while it is read, so the concurrency slot is held
+        until the block exits: the stream read to the end, failed or abandoned.
+        """
+        result = self.call(fn, estimated_tokens, hold=True)
+        outcome = "cancelled"
+        try:
+            yield result
+            outcome = "success"
+        except Exception as e:
+            outcome = "throttled" if isinstance(e, THROTTLE_ERRORS) else "error"
+            raise
+        finally:
+            self._finish(outcome)
+
+    @asynccontextmanager
+    async def astream(self, fn: Callable[[], Awaitable[Any]], estimated_tokens: int) -> AsyncIterator[Any]:
+        """
+        Async twin of stream().
+        """
+        result = await self.acall(fn, estimated_tokens, hold=True)
+        outcome = "cancelled"
+        try:
+            yield result
+            outcome = "success"
+        except Exception as e:
+            outcome = "throttled" if isinstance(e, THROTTLE_ERRORS) else "error"
+            raise
+        finally:
+            self._finish(outcome)
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+
+    def _on_success(self, result: Any, estimated_tokens: int, release: bool = True):
+        if release:
+            self._finish("success")
+        usage = getattr(result, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None)
+        if isinstance(total_tokens, int):
+            self.tokens.adjust(total_tokens - estimated_tokens)
+
+    def _finish(self, outcome: str):
+        self.concurrency.release(outcome)
+        LLM_CONCURRENCY_LIMIT.labels(model=self.model).set(self.concurrency.limit)
+
+    def _on_error(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Releases the slot and returns the delay before the next attempt, or None to give up.
+        """
+        throttled = isinstance(error, THROTTLE_ERRORS)
+        self.concurrency.release("throttled" if throttled else "error")
+        LLM_CONCURRENCY_LIMIT.labels(model=self.model).set(self.concurrency.limit)
+        if throttled:
+            LLM_THROTTLED.labels(model=self.model, reason=type(error).__name__).inc()
+
+        if not isinstance(error, RETRYABLE_ERRORS) or attempt >= self.max_retries:
+            return None
+
+        # Full jitter, but never sooner than the server asked for
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = min(self.max_delay, retry_after) + random.uniform(0, self.base_delay)
+        LLM_RETRIES.labels(model=self.model).inc()
+        logger.warning(f"LLM call to {self.model} failed ({type(error).__name__}); retry {attempt + 1} in {delay:.2f}s")
+        return delay
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000.0
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        # HTTP-date form; fall back to jittered backoff
+        pass
+    return None
+
+
+def estimate_tokens(messages: List[Dict[str, str]], completion_allowance: int = 512) -> int:
+    """
+    Rough prompt size (~4 characters per token) plus room for the completion,
+    corrected against reported usage once the call returns.
+    """
+    return len(json.dumps(messages)) // 4 + completion_allowance
+
+
+_limiters: Dict[str, ModelRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> ModelRateLimiter:
+    """
+    Process-wide limiter for a model, configured from the environment.
+
+    LLM_RPM / LLM_TPM                 per-model request and token budgets per minute (<= 0 disables)
+    LLM_INITIAL_CONCURRENCY           starting concurrency cap (default 4)
+    LLM_MAX_CONCURRENCY               ceiling the cap can grow to (default 32)
+    LLM_MAX_RETRIES                   retries for 429/timeout/5xx/connection errors (default 4)
+    LLM_RETRY_BASE_DELAY / _MAX_DELAY backoff bounds in seconds (default 0.5 / 20)
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = ModelRateLimiter(
+                model,
+                rpm=float(os.getenv("LLM_RPM", "500")),
+                tpm=float(os.getenv("LLM_TPM", "150000")),
+                initial_concurrency=int(os.getenv("LLM_INITIAL_CONCURRENCY", "4")),
+                max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "32")),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+                base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")),
+                max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "20"))
+            )
+            _limiters[model] = limiter
+        return limiter
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from anti_gravity_system.src.core.metrics import MEMORY_SEARCH_CACHE_LOOKUPS, MEMORY_SEARCH_CACHE_EVICTIONS
+
+Stamp = Tuple[int, int]
+
+
+class SearchResultCache:
+    """
+    LRU of memory search results, invalidated by write generations rather than a TTL.
+
+    The store bumps a generation after every committed write: the written types'
+    counters and a global one. A result is stamped, before its search runs, with the
+    generation it depends on (its type's for a type-filtered search, the global one
+    otherwise) and is served only while that generation is unchanged. A write that
+    races a search therefore leaves a stamp that is already out of date, never a
+    result that hides the write. Deletes, whose types are not known up front, bump
+    an epoch that every stamp includes.
+
+    Only writes made through this process's store are seen; processes sharing a
+    persist directory should disable the cache (MEMORY_SEARCH_CACHE_SIZE=0).
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Stamp, List[Dict[str, Any]]]]" = OrderedDict()
+        self._epoch = 0
+        self._generation = 0
+        self._type_generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def stamp(self, type_filter: Optional[str] = None) -> Stamp:
+        with self._lock:
+            return self._stamp(type_filter)
+
+    def _stamp(self, type_filter: Optional[str]) -> Stamp:
+        if type_filter is None:
+            return self._epoch, self._generation
+        return self._epoch, self._type_generations.get(type_filter, 0)
+
+    def bump(self, types: Optional[Iterable[str]] = None):
+        """
+        Records a committed write of `types`; None invalidates every entry.
+        """
+        with self._lock:
+            if types is None:
+                self._epoch += 1
+                return
+            self._generation += 1
+            for type_ in set(types):
+                self._type_generations[type_] = self._type_generations.get(type_, 0) + 1
+
+    def get(self, key: Hashable, type_filter: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        if not self.max_entries:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                MEMORY_SEARCH_CACHE_LOOKUPS.labels(result="miss").inc()
+                return None
+            stamp, results = entry
+            if stamp != self._stamp(type_filter):
+                del self._entries[key]
+                MEMORY_SEARCH_CACHE_LOOKUPS.labels(result="stale").inc()
+                return None
+            self._entries.move_to_end(key)
+        MEMORY_SEARCH_CACHE_LOOKUPS.labels(result="hit").inc()
+        # Copies, so a caller editing its results cannot change what others are served
+        return [dict(r) for r in results]
+
+    def put(self, key: Hashable, stamp: Stamp, results: List[Dict[str, Any]]):
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = (stamp, [dict(r) for r in results])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                MEMORY_SEARCH_CACHE_EVICTIONS.inc()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from anti_gravity_system.src.core.metrics import SINGLE_FLIGHT_COALESCED
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls from threads: the first caller for a key
+    runs the function, later callers for the same key block and receive its result
+    (or re-raise its error). Results are shared, not copied.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            SINGLE_FLIGHT_COALESCED.labels(group=self.name).inc()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+# What a cancelled leader hands its waiters: one of them runs the call instead
+_LEADER_CANCELLED = object()
+
+
+class AsyncSingleFlight:
+    """
+    Event-loop twin of SingleFlight. In-flight calls are tracked per running loop
+    since their futures cannot be awaited from another one. A cancelled leader
+    does not take its waiters down with it: the first of them to resume runs the
+    call afresh and the rest coalesce onto that.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        while True:
+            future = self._calls.get(flight_key)
+            if future is None:
+                break
+            SINGLE_FLIGHT_COALESCED.labels(group=self.name).inc()
+            # Shielded so a cancelled waiter does not cancel the shared call
+            result = await asyncio.shield(future)
+            if result is not _LEADER_CANCELLED:
+                return result
+
+        future = loop.create_future()
+        self._calls[flight_key] = future
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.set_result(_LEADER_CANCELLED)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an error without waiters is not reported as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._calls[flight_key]
@@ -0,0 +1,108 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Union
+
+from anti_gravity_system.src.utils.logger import logger
+
+
+def sqlite_pragmas_from_env() -> Dict[str, Union[str, int]]:
+    """
+    Connection pragmas, tunable from the environment.
+
+    SQLITE_SYNCHRONOUS      OFF | NORMAL | FULL (default NORMAL, safe with WAL)
+    SQLITE_CACHE_SIZE_KB    page cache per connection in KiB (default 16384)
+    SQLITE_MMAP_SIZE        bytes of the file to memory-map (default 256 MiB, 0 disables)
+    SQLITE_BUSY_TIMEOUT_MS  wait on a locked database before failing (default 5000)
+    """
+    return {
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        # Negative cache_size is interpreted by SQLite as KiB rather than pages
+        "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384")),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    }
+
+
+class SQLiteConnectionPool:
+    """
+    One writer connection serialised by a lock plus a small pool of reader
+    connections. In WAL mode readers never block the writer (or each other).
+    """
+
+    def __init__(self, path: str, max_readers: int = 4, pragmas: Optional[Dict[str, Union[str, int]]] = None):
+        self.path = path
+        self.max_readers = max_readers
+        self.pragmas = pragmas if pragmas is not None else sqlite_pragmas_from_env()
+        self._writer = self._connect()
+        # WAL is a property of the database file, so setting it once on the writer is enough
+        mode = self._writer.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if mode.lower() != "wal":
+            logger.warning(f"SQLite at {path} is using journal_mode={mode}, not WAL")
+        self._write_lock = threading.Lock()
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all_readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """
+        Exclusive use of the writer; the block runs in one transaction, committed on
+        success and rolled back on error.
+        """
+        with self._write_lock:
+            with self._writer:
+                yield self._writer
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self._checkout_reader()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def _checkout_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if len(self._all_readers) < self.max_readers:
+                conn = self._connect()
+                self._all_readers.append(conn)
+                return conn
+        return self._readers.get()
+
+    def migrate(self, migrations: List[str]):
+        """
+        Brings the schema up to date in place. migrations[i] upgrades from
+        `PRAGMA user_version` i to i + 1; each runs in its own transaction.
+        """
+        with self._write_lock:
+            version = self._writer.execute("PRAGMA user_version").fetchone()[0]
+            for target, script in enumerate(migrations[version:], start=version + 1):
+                # executescript commits on its own, so wrap the script in an explicit transaction
+                try:
+                    self._writer.executescript(f"BEGIN;\n{script}\nPRAGMA user_version={target};\nCOMMIT;")
+                except sqlite3.Error:
+                    if self._writer.in_transaction:
+                        self._writer.rollback()
+                    raise
+                logger.info(f"Migrated {os.path.basename(self.path)} to schema version {target}")
+
+    def close(self):
+        with self._readers_lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers = []
+        with self._write_lock:
+            self._writer.close()
@@ -0,0 +1,136 @@
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from anti_gravity_system.src.core.memory_store import MemoryStore, open_memory_store
+from anti_gravity_system.src.core.metrics import MEMORY_SHARDS_OPEN, MEMORY_SHARD_EVICTIONS
+from anti_gravity_system.src.utils.logger import logger
+
+# Tenant ids used verbatim as directory names; anything else is hashed
+_SAFE_TENANT = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+# Written into each shard directory: hashed names cannot be mapped back to the user
+TENANT_FILE = "tenant_id"
+
+
+def shard_name(tenant_id: str) -> str:
+    if _SAFE_TENANT.match(tenant_id) and ".." not in tenant_id:
+        return tenant_id
+    return "u_" + hashlib.sha256(tenant_id.encode("utf-8")).hexdigest()[:32]
+
+
+class TenantShards:
+    """
+    One MemoryStore per user under `<root>/tenants/<user>`: its own vector index,
+    SQLite database and caches, so a tenant's searches never see another's memories
+    and cost what that tenant's data costs, not what everyone's does.
+
+    Shards open on first use. The `max_open` most recently used stay open between
+    requests; older ones are released, and close once no request is using them.
+    """
+
+    def __init__(self, root: str, max_open: int = 64, vector_backend: Optional[str] = None):
+        self.root = root
+        self.max_open = max_open
+        self.vector_backend = vector_backend
+        # tenant -> the handle that keeps a recently used shard open
+        self._warm: "OrderedDict[str, MemoryStore]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def shard_path(self, tenant_id: str) -> str:
+        return os.path.join(self.root, "tenants", shard_name(tenant_id))
+
+    @contextmanager
+    def acquire(self, tenant_id: str) -> Iterator[MemoryStore]:
+        """
+        The tenant's store, held open for the duration of the block.
+        """
+        store = self.open(tenant_id)
+        try:
+            yield store
+        finally:
+            store.close()
+
+    def open(self, tenant_id: str) -> MemoryStore:
+        """
+        A handle on the tenant's store that the caller gives back with store.close().
+        """
+        path = self.shard_path(tenant_id)
+        evicted: List[MemoryStore] = []
+        # A cold open is slow; not under the lock, so it holds up no other tenant
+        store = open_memory_store(path, self.vector_backend, tenant_id=tenant_id)
+        tenant_file = os.path.join(path, TENANT_FILE)
+        if not os.path.exists(tenant_file):
+            with open(tenant_file, "w", encoding="utf-8") as f:
+                f.write(tenant_id)
+        with self._lock:
+            if tenant_id in self._warm:
+                self._warm.move_to_end(tenant_id)
+            else:
+                # `store` is open, so this only takes another handle on it
+                self._warm[tenant_id] = open_memory_store(path, tenant_id=tenant_id)
+                while len(self._warm) > self.max_open:
+                    evicted.append(self._warm.popitem(last=False)[1])
+            MEMORY_SHARDS_OPEN.set(len(self._warm))
+        # Closing the last handle flushes and closes databases; not under the lock
+        for shard in evicted:
+            MEMORY_SHARD_EVICTIONS.inc()
+            shard.close()
+        return store
+
+    def tenants(self) -> List[Tuple[str, str]]:
+        """
+        (tenant_id, shard directory) of every shard on disk, open or not.
+        """
+        directory = os.path.join(self.root, "tenants")
+        if not os.path.isdir(directory):
+            return []
+        found = []
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not os.path.isdir(path):
+                continue
+            try:
+                with open(os.path.join(path, TENANT_FILE), encoding="utf-8") as f:
+                    tenant_id = f.read()
+            except FileNotFoundError:
+                if shard_name(name) != name:
+                    logger.warning(f"Skipping memory shard {path}: its tenant id is not recorded")
+                    continue
+                # A verbatim name is the tenant id
+                tenant_id = name
+            found.append((tenant_id, path))
+        return found
+
+    def open_count(self) -> int:
+        return len(self._warm)
+
+    def close(self):
+        with self._lock:
+            warm = list(self._warm.values())
+            self._warm.clear()
+            MEMORY_SHARDS_OPEN.set(0)
+        for shard in warm:
+            shard.close()
+
+
+_shards: Dict[str, TenantShards] = {}
+_shards_lock = threading.Lock()
+
+
+def get_tenant_shards(root: str = "./antigravity_data/memory") -> TenantShards:
+    """
+    The process-wide shard set under `root`.
+
+    MEMORY_MAX_OPEN_SHARDS  tenant stores kept open between requests (default 64)
+    """
+    key = os.path.realpath(root)
+    with _shards_lock:
+        shards = _shards.get(key)
+        if shards is None:
+            shards = _shards[key] = TenantShards(key, max_open=int(os.getenv("MEMORY_MAX_OPEN_SHARDS", "64")))
+        return shards
@@ -0,0 +1,400 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from anti_gravity_system.src.core.embedders import DEFAULT_MODELS
+from anti_gravity_system.src.utils.logger import logger
+
+
+class VectorBackend(ABC):
+    """
+    Nearest-neighbour storage behind MemoryStore. Vectors are supplied by the
+    caller; `query` returns results ordered by cosine distance, each as
+    {"id", "content", "metadata", "distance"}.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def upsert(self, ids: List[str], embeddings: Sequence[Sequence[float]], documents: List[str],
+               metadatas: List[Dict[str, Any]]):
+        pass
+
+    @abstractmethod
+    def query(self, embedding: Sequence[float], limit: int = 5,
+              where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        pass
+
+    @abstractmethod
+    def get(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Stored vectors and metadata by id, as {id: {"embedding", "metadata"}}; ids
+        that are not stored are left out.
+        """
+
+    @abstractmethod
+    def ids(self) -> List[str]:
+        """
+        Ids of every stored item.
+        """
+
+    def compact(self):
+        """
+        Reclaims space held by deleted items, where the backend needs to be asked.
+        """
+
+    def close(self):
+        pass
+
+
+class ChromaBackend(VectorBackend):
+    name = "chroma"
+
+    def __init__(self, client, collection_name: str = "antigravity_memory"):
+        self.collection = client.get_or_create_collection(
+            name=collection_name,
+            metadata={"hnsw:space": "cosine"}
+        )
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def query(self, embedding, limit=5, where=None):
+        results = self.collection.query(query_embeddings=[embedding], n_results=limit, where=where or None)
+        formatted_results = []
+        if results['ids']:
+            for i in range(len(results['ids'][0])):
+                formatted_results.append({
+                    "id": results['ids'][0][i],
+                    "content": results['documents'][0][i],
+                    "metadata": results['metadatas'][0][i],
+                    "distance": results['distances'][0][i] if results['distances'] else None
+                })
+        return formatted_results
+
+    def delete(self, ids):
+        self.collection.delete(ids=ids)
+
+    def count(self):
+        return self.collection.count()
+
+    def ids(self):
+        return self.collection.get(include=[])["ids"]
+
+    def get(self, ids):
+        results = self.collection.get(ids=ids, include=["embeddings", "metadatas"])
+        return {
+            id: {"embedding": np.asarray(embedding, dtype=np.float32), "metadata": metadata}
+            for id, embedding, metadata in zip(results["ids"], results["embeddings"], results["metadatas"])
+        }
+
+
+class NumpyBackend(VectorBackend):
+    """
+    Exact cosine search over a contiguous float32 matrix, for deployments small
+    enough that a brute-force scan beats running Chroma.
+
+    Rows are unit-normalised and appended to a memory-mapped `vectors.f32`;
+    documents and metadata go to an append-only `items.jsonl` whose line i
+    describes row i. Only ids, file offsets and codes for the `indexed_fields`
+    are held in memory, so those are the fields `where` can filter on.
+    Re-upserting an id appends a new row and tombstones the old one, and a delete
+    appends a tombstone row; once dead rows exceed `compact_ratio` of the matrix,
+    both files are rewritten.
+    """
+
+    name = "numpy"
+
+    def __init__(self, path: str, indexed_fields: Tuple[str, ...] = ("type", "session_id"),
+                 initial_capacity: int = 1024, compact_ratio: float = 0.25):
+        self.path = path
+        self.indexed_fields = indexed_fields
+        self.initial_capacity = initial_capacity
+        self.compact_ratio = compact_ratio
+        os.makedirs(path, exist_ok=True)
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._items_path = os.path.join(path, "items.jsonl")
+        self._meta_path = os.path.join(path, "meta.json")
+        self._lock = threading.Lock()
+        self.dim: Optional[int] = None
+        self._load()
+
+    # --- storage ---
+
+    def _reset(self, capacity: int):
+        self._capacity = capacity
+        self._rows = 0
+        self._dead = 0
+        self._vectors: Optional[np.memmap] = None
+        self._offsets = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._codes = {field: np.full(capacity, -1, dtype=np.int32) for field in self.indexed_fields}
+        self._vocab: Dict[str, Dict[Any, int]] = {field: {} for field in self.indexed_fields}
+        self._row_of: Dict[str, int] = {}
+        self._ids: List[str] = []
+
+    def _load(self):
+        self._reset(self.initial_capacity)
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path) as f:
+            self.dim = json.load(f)["dim"]
+        stored_rows = os.path.getsize(self._vectors_path) // (4 * self.dim)
+        self._grow(max(stored_rows, self.initial_capacity))
+        offset = 0
+        with open(self._items_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n") or self._rows >= stored_rows:
+                    # Torn tail from an interrupted write; the row is rewritten on next upsert
+                    break
+                item = json.loads(line)
+                self._index_row(item["id"], item.get("metadata", {}), offset, item.get("deleted", False))
+                offset += len(line)
+        with open(self._items_path, "r+b") as f:
+            f.truncate(offset)
+
+    def _grow(self, capacity: int):
+        if self._vectors is not None:
+            self._vectors.flush()
+        if os.path.getsize(self._vectors_path) < capacity * self.dim * 4:
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(capacity * self.dim * 4)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        extra = capacity - self._capacity
+        if extra > 0:
+            self._offsets = np.concatenate([self._offsets, np.zeros(extra, dtype=np.int64)])
+            self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+            for field in self.indexed_fields:
+                self._codes[field] = np.concatenate([self._codes[field], np.full(extra, -1, dtype=np.int32)])
+        self._capacity = capacity
+
+    def _create(self, dim: int):
+        self.dim = dim
+        open(self._vectors_path, "wb").close()
+        open(self._items_path, "wb").close()
+        with open(self._meta_path, "w") as f:
+            json.dump({"dim": dim}, f)
+        self._grow(self._capacity)
+
+    def _index_row(self, id: str, metadata: Dict[str, Any], offset: int, deleted: bool = False):
+        row = self._rows
+        previous = self._row_of.pop(id, None)
+        if previous is not None:
+            self._alive[previous] = False
+            self._dead += 1
+        self._ids.append(id)
+        self._offsets[row] = offset
+        if deleted:
+            # The tombstone row itself is dead weight until the next compaction
+            self._dead += 1
+        else:
+            self._row_of[id] = row
+            self._alive[row] = True
+        for field in self.indexed_fields:
+            value = metadata.get(field)
+            if value is not None:
+                vocab = self._vocab[field]
+                self._codes[field][row] = vocab.setdefault(value, len(vocab))
+        self._rows += 1
+
+    # --- VectorBackend ---
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1, norms)
+        with self._lock:
+            if self.dim is None:
+                self._create(matrix.shape[1])
+            if matrix.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match index dimension {self.dim}")
+            self._append(matrix, [{"id": i, "document": d, "metadata": m} for i, d, m in zip(ids, documents, metadatas)])
+
+    def delete(self, ids):
+        with self._lock:
+            ids = [id for id in dict.fromkeys(ids) if id in self._row_of]
+            if ids:
+                self._append(np.zeros((len(ids), self.dim), dtype=np.float32),
+                             [{"id": id, "deleted": True} for id in ids])
+
+    def _append(self, matrix: np.ndarray, records: List[Dict[str, Any]]):
+        if self._rows + len(records) > self._capacity:
+            capacity = self._capacity
+            while capacity < self._rows + len(records):
+                capacity *= 2
+            self._grow(capacity)
+        # Vectors land before their items line, so any row listed in items.jsonl has its vector
+        self._vectors[self._rows:self._rows + len(records)] = matrix
+        self._vectors.flush()
+        lines = [(json.dumps(record) + "\n").encode("utf-8") for record in records]
+        with open(self._items_path, "ab") as f:
+            offset = f.tell()
+            f.write(b"".join(lines))
+        for record, line in zip(records, lines):
+            self._index_row(record["id"], record.get("metadata", {}), offset, record.get("deleted", False))
+            offset += len(line)
+        if self._rows >= self.initial_capacity and self._dead > self.compact_ratio * self._rows:
+            self._compact()
+
+    def query(self, embedding, limit=5, where=None):
+        with self._lock:
+            if not self._rows:
+                return []
+            rows = self._rows
+            vectors = self._vectors[:rows]
+            mask = self._mask(where, rows)
+            ids = self._ids
+            offsets = self._offsets
+            # Opened under the lock so a concurrent compaction cannot swap the file under `offsets`
+            items = open(self._items_path, "rb")
+        with items as f:
+            k = min(limit, int(mask.sum()))
+            if k == 0:
+                return []
+            q = np.asarray(embedding, dtype=np.float32)
+            q = q / (np.linalg.norm(q) or 1)
+            scores = np.where(mask, vectors @ q, -np.inf)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results = []
+            for row in top:
+                f.seek(offsets[row])
+                item = json.loads(f.readline())
+                results.append({
+                    "id": ids[row],
+                    "content": item["document"],
+                    "metadata": item["metadata"],
+                    "distance": float(1 - scores[row])
+                })
+        return results
+
+    def _mask(self, where: Optional[Dict[str, Any]], rows: int) -> np.ndarray:
+        mask = self._alive[:rows].copy()
+        for field, value in _equality_terms(where):
+            if field not in self._codes:
+                raise ValueError(f"NumpyBackend can only filter on {self.indexed_fields}, not {field!r}")
+            code = self._vocab[field].get(value)
+            if code is None:
+                return np.zeros(rows, dtype=bool)
+            mask &= self._codes[field][:rows] == code
+        return mask
+
+    def count(self):
+        with self._lock:
+            return self._rows - self._dead
+
+    def get(self, ids):
+        with self._lock:
+            rows = [(id, self._row_of[id]) for id in ids if id in self._row_of]
+            if not rows:
+                return {}
+            vectors = self._vectors[[row for _, row in rows]]
+            offsets = [self._offsets[row] for _, row in rows]
+            items = open(self._items_path, "rb")
+        found = {}
+        with items as f:
+            for (id, _), vector, offset in zip(rows, vectors, offsets):
+                f.seek(offset)
+                found[id] = {"embedding": vector, "metadata": json.loads(f.readline())["metadata"]}
+        return found
+
+    def ids(self):
+        with self._lock:
+            return list(self._row_of)
+
+    def compact(self):
+        with self._lock:
+            if self.dim is not None:
+                self._compact()
+
+    def _compact(self):
+        """
+        Rewrites both files with live rows only and swaps them in atomically.
+        """
+        live = np.flatnonzero(self._alive[:self._rows])
+        capacity = max(self.initial_capacity, 1 << int(max(len(live), 1) - 1).bit_length())
+        vectors_tmp, items_tmp = self._vectors_path + ".tmp", self._items_path + ".tmp"
+        compacted = np.memmap(vectors_tmp, dtype=np.float32, mode="w+", shape=(capacity, self.dim))
+        compacted[:len(live)] = self._vectors[live]
+        compacted.flush()
+        del compacted
+        with open(self._items_path, "rb") as src, open(items_tmp, "wb") as dst:
+            for row in live:
+                src.seek(self._offsets[row])
+                dst.write(src.readline())
+        os.replace(vectors_tmp, self._vectors_path)
+        os.replace(items_tmp, self._items_path)
+        before = self._rows
+        self._vectors = None
+        self._load()
+        logger.info(f"Compacted vector index at {self.path}: {before} -> {self._rows} rows")
+
+    def close(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+
+
+def _equality_terms(where: Optional[Dict[str, Any]]) -> List[Tuple[str, Any]]:
+    """
+    Flattens the subset of Chroma's `where` syntax MemoryStore uses:
+    {"field": value}, {"field": {"$eq": value}} and {"$and": [...]}.
+    """
+    terms = []
+    for field, value in (where or {}).items():
+        if field == "$and":
+            for clause in value:
+                terms.extend(_equality_terms(clause))
+        elif isinstance(value, dict):
+            if set(value) != {"$eq"}:
+                raise ValueError(f"Unsupported filter on {field!r}: {value}")
+            terms.append((field, value["$eq"]))
+        else:
+            terms.append((field, value))
+    return terms
+
+
+def index_suffix(model: Optional[str]) -> str:
+    """
+    Vectors from different embedding models have different dimensions and live in
+    different spaces, so each model gets its own collection / index directory. The
+    default model keeps the unsuffixed names.
+    """
+    if not model or model == DEFAULT_MODELS["onnx"]:
+        return ""
+    # Chroma collection names: [A-Za-z0-9._-], alphanumeric at both ends, at most 63 chars
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "-", model).strip("-._")
+    if not safe or len(safe) > 40 or ".." in safe:
+        safe = hashlib.sha256(model.encode("utf-8")).hexdigest()[:16]
+    return "__" + safe
+
+
+def memory_collection_name(model: Optional[str] = None) -> str:
+    return "antigravity_memory" + index_suffix(model)
+
+
+def create_vector_backend(kind: str, persist_dir: str, chroma_client: Callable[[], Any],
+                          model: Optional[str] = None) -> VectorBackend:
+    """
+    `kind` is "chroma" or "numpy"; `chroma_client` is only called for "chroma".
+    `model` is the embedding model whose vectors the backend holds (see index_suffix).
+    """
+    if kind == "numpy":
+        return NumpyBackend(os.path.join(persist_dir, "numpy_index" + index_suffix(model)))
+    if kind != "chroma":
+        raise ValueError(f"Unknown vector backend {kind!r}; expected 'chroma' or 'numpy'")
+    return ChromaBackend(chroma_client(), memory_collection_name(model))
@@ -0,0 +1,154 @@
+import os
+import time
+import atexit
+import weakref
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from anti_gravity_system.src.core.metrics import MEMORY_WRITE_BATCH_SIZE
+from anti_gravity_system.src.utils.logger import logger
+
+
+@dataclass
+class PendingMemory:
+    id: str
+    session_id: str
+    type: str
+    content: str
+    timestamp: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+
+
+class WriteBehindBuffer:
+    """
+    Accumulates memory items and hands them to `flush_fn` in batches, once
+    `max_items` are pending or the oldest item is `max_delay_seconds` old.
+    A failed batch is re-queued and dropped (with an error log) after `max_attempts`;
+    dropped items are passed to `on_drop`, if given.
+
+    Pending items are flushed on close() and at interpreter exit.
+    """
+
+    def __init__(self, flush_fn: Callable[[List[PendingMemory]], None], max_items: int = 64,
+                 max_delay_seconds: float = 0.5, max_attempts: int = 3,
+                 on_drop: Optional[Callable[[List[PendingMemory]], None]] = None):
+        self.flush_fn = flush_fn
+        self.on_drop = on_drop
+        self.max_items = max_items
+        self.max_delay_seconds = max_delay_seconds
+        self.max_attempts = max_attempts
+        self._items: List[PendingMemory] = []
+        # The batch flush_fn is writing: taken out of _items but not yet readable
+        self._in_flight: List[PendingMemory] = []
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        # Serialises flushes so batches reach the stores in insertion order
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        # The flusher only holds a weak reference so an abandoned buffer can still be collected
+        self._flusher = threading.Thread(
+            target=_flush_when_due, args=(weakref.ref(self), self._closed, max(max_delay_seconds / 2, 0.01)),
+            name="memory-write-behind", daemon=True
+        )
+        self._flusher.start()
+        _open_buffers.add(self)
+
+    @classmethod
+    def from_env(cls, flush_fn: Callable[[List[PendingMemory]], None],
+                 on_drop: Optional[Callable[[List[PendingMemory]], None]] = None) -> "WriteBehindBuffer":
+        """
+        MEMORY_WRITE_BATCH_SIZE        items per batch (default 64; 1 writes through)
+        MEMORY_WRITE_FLUSH_INTERVAL    max seconds an item waits before being flushed (default 0.5)
+        """
+        return cls(
+            flush_fn,
+            max_items=int(os.getenv("MEMORY_WRITE_BATCH_SIZE", "64")),
+            max_delay_seconds=float(os.getenv("MEMORY_WRITE_FLUSH_INTERVAL", "0.5")),
+            on_drop=on_drop
+        )
+
+    def add(self, item: PendingMemory):
+        if self._closed.is_set():
+            # Late writes after shutdown go straight through
+            self.flush_fn([item])
+            return
+        with self._lock:
+            self._items.append(item)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._items) >= self.max_items
+        if full:
+            self.flush()
+
+    def has_pending(self, session_id: Optional[str] = None) -> bool:
+        """
+        True while items are queued or in a batch still being written, so a reader
+        that sees True and calls flush() waits for that batch to land.
+        """
+        with self._lock:
+            if session_id is None:
+                return bool(self._items or self._in_flight)
+            return any(item.session_id == session_id for item in self._items + self._in_flight)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._items, self._oldest = self._items, [], None
+                self._in_flight = batch
+            if not batch:
+                return
+            try:
+                self.flush_fn(batch)
+                MEMORY_WRITE_BATCH_SIZE.observe(len(batch))
+            except Exception as e:
+                self._requeue(batch, e)
+            finally:
+                with self._lock:
+                    self._in_flight = []
+
+    def _requeue(self, batch: List[PendingMemory], error: Exception):
+        retry, dropped = [], []
+        for item in batch:
+            item.attempts += 1
+            (retry if item.attempts < self.max_attempts else dropped).append(item)
+        logger.error(f"Memory batch flush failed ({error}); re-queued {len(retry)}, dropped {len(dropped)}")
+        if dropped and self.on_drop:
+            self.on_drop(dropped)
+        with self._lock:
+            self._items = retry + self._items
+            if self._items and self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def _flush_if_due(self):
+        with self._lock:
+            due = self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay_seconds
+        if due:
+            self.flush()
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join(timeout=self.max_delay_seconds)
+        self.flush()
+        _open_buffers.discard(self)
+
+
+def _flush_when_due(buffer_ref: "weakref.ref[WriteBehindBuffer]", closed: threading.Event, interval: float):
+    while not closed.wait(interval):
+        buffer = buffer_ref()
+        if buffer is None:
+            return
+        buffer._flush_if_due()
+        del buffer
+
+
+_open_buffers: "weakref.WeakSet[WriteBehindBuffer]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_buffers():
+    for buffer in list(_open_buffers):
+        buffer.close()
@@ -0,0 +1,93 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class OpenAIStubServer:
+    """
+    Minimal OpenAI-compatible chat completions endpoint on localhost for tests.
+    Counts TCP connections and requests so connection reuse can be asserted.
+    """
+
+    def __init__(self, reply: str = "stub reply"):
+        self.reply = reply
+        self.connections = 0
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with stub._lock:
+                    stub.requests.append(body)
+                status, headers, payload = stub.respond(body)
+                if body.get("stream") and status == 200:
+                    content_type, data = "text/event-stream", stream_payload(payload)
+                else:
+                    content_type, data = "application/json", json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def respond(self, body):
+        """
+        Returns (status, extra headers, JSON payload). Override to script failures.
+        """
+        return 200, {}, completion_payload(body.get("model", "stub"), self.reply)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+def completion_payload(model: str, content: str):
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}
+    }
+
+def stream_payload(payload) -> bytes:
+    """
+    Re-encodes a completion payload as chat.completion.chunk SSE events, one per word.
+    """
+    content = payload["choices"][0]["message"]["content"]
+    events = []
+    for word in content.split(" "):
+        delta = word if not events else f" {word}"
+        chunk = {
+            "id": payload["id"],
+            "object": "chat.completion.chunk",
+            "created": payload["created"],
+            "model": payload["model"],
+            "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]
+        }
+        events.append(f"data: {json.dumps(chunk)}\n\n")
+    events.append("data: [DONE]\n\n")
+    return "".join(events).encode()
@@ -11,6 +11,31 @@ from anti_gravity_system.tests.test_workers import TestWorkers
 from anti_gravity_system.tests.test_critic import TestCritic
 from anti_gravity_system.tests.test_integration import TestIntegration
 from anti_gravity_system.tests.test_safety import TestSafety
+from anti_gravity_system.tests.test_agent_pool import TestAgentPool
+from anti_gravity_system.tests.test_plan_graph import TestPlanGraph, TestOrchestratorDagExecution
+from anti_gravity_system.tests.test_async_pipeline import TestAsyncPipeline
+from anti_gravity_system.tests.test_llm_cache import TestLLMCache
+from anti_gravity_system.tests.test_plan_cache import TestPlanCache, TestPlanCacheOnChroma, TestPlanCacheBackend, TestOrchestratorPlanCache
+from anti_gravity_system.tests.test_llm_clients import TestSharedLLMClient
+from anti_gravity_system.tests.test_streaming import TestStreaming
+from anti_gravity_system.tests.test_single_flight import TestSingleFlight
+from anti_gravity_system.tests.test_rate_limiter import TestRateLimiter
+from anti_gravity_system.tests.test_model_router import TestModelRouter
+from anti_gravity_system.tests.test_write_behind import TestWriteBehind
+from anti_gravity_system.tests.test_sqlite_pool import TestSQLitePool
+from anti_gravity_system.tests.test_embedding_cache import TestEmbeddingCache
+from anti_gravity_system.tests.test_vector_backends import TestNumpyBackend
+from anti_gravity_system.tests.test_hybrid_search import TestHybridSearch
+from anti_gravity_system.tests.test_memory_compactor import TestMemoryCompactor
+from anti_gravity_system.tests.test_memory_store_registry import TestMemoryStoreRegistry
+from anti_gravity_system.tests.test_memory_offload import TestBoundedExecutor, TestMemoryOffload
+from anti_gravity_system.tests.test_search_cache import TestSearchCache
+from anti_gravity_system.tests.test_session_history import TestSessionHistory
+from anti_gravity_system.tests.test_tenant_shards import TestTenantShards
+from anti_gravity_system.tests.test_memory_transfer import TestMemoryTransfer
+from anti_gravity_system.tests.test_memory_dedup import TestMemoryDedup
+from anti_gravity_system.tests.test_chroma_client import TestChromaConnector, TestRemoteChroma
+from anti_gravity_system.tests.test_embedders import TestEmbedders
 
 # Create a test suite
 def suite():
@@ -24,6 +49,37 @@ def suite():
     suite.addTests(loader.loadTestsFromTestCase(TestCritic))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
     suite.addTests(loader.loadTestsFromTestCase(TestSafety))
+    suite.addTests(loader.loadTestsFromTestCase(TestAgentPool))
+    suite.addTests(loader.loadTestsFromTestCase(TestPlanGraph))
+    suite.addTests(loader.loadTestsFromTestCase(TestOrchestratorDagExecution))
+    suite.addTests(loader.loadTestsFromTestCase(TestAsyncPipeline))
+    suite.addTests(loader.loadTestsFromTestCase(TestLLMCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestPlanCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestPlanCacheOnChroma))
+    suite.addTests(loader.loadTestsFromTestCase(TestPlanCacheBackend))
+    suite.addTests(loader.loadTestsFromTestCase(TestOrchestratorPlanCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestSharedLLMClient))
+    suite.addTests(loader.loadTestsFromTestCase(TestStreaming))
+    suite.addTests(loader.loadTestsFromTestCase(TestSingleFlight))
+    suite.addTests(loader.loadTestsFromTestCase(TestRateLimiter))
+    suite.addTests(loader.loadTestsFromTestCase(TestModelRouter))
+    suite.addTests(loader.loadTestsFromTestCase(TestWriteBehind))
+    suite.addTests(loader.loadTestsFromTestCase(TestSQLitePool))
+    suite.addTests(loader.loadTestsFromTestCase(TestEmbeddingCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestNumpyBackend))
+    suite.addTests(loader.loadTestsFromTestCase(TestHybridSearch))
+    suite.addTests(loader.loadTestsFromTestCase(TestMemoryCompactor))
+    suite.addTests(loader.loadTestsFromTestCase(TestMemoryStoreRegistry))
+    suite.addTests(loader.loadTestsFromTestCase(TestBoundedExecutor))
+    suite.addTests(loader.loadTestsFromTestCase(TestMemoryOffload))
+    suite.addTests(loader.loadTestsFromTestCase(TestSearchCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestSessionHistory))
+    suite.addTests(loader.loadTestsFromTestCase(TestTenantShards))
+    suite.addTests(loader.loadTestsFromTestCase(TestMemoryTransfer))
+    suite.addTests(loader.loadTestsFromTestCase(TestMemoryDedup))
+    suite.addTests(loader.loadTestsFromTestCase(TestChromaConnector))
+    suite.addTests(loader.loadTestsFromTestCase(TestRemoteChroma))
+    suite.addTests(loader.loadTestsFromTestCase(TestEmbedders))
     
     return suite
 
@@ -0,0 +1,118 @@
+import sys
+import os
+import asyncio
+import threading
+import unittest
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.agent_pool import AgentPool, PoolExhaustedError
+
+class FakeAgent:
+    def __init__(self):
+        self.resets = 0
+        self.closed = False
+        self.session_state = []
+
+    def reset(self):
+        self.resets += 1
+        self.session_state = []
+
+    def close(self):
+        self.closed = True
+
+class TestAgentPool(unittest.TestCase):
+    def setUp(self):
+        self.built = []
+
+        def factory():
+            agent = FakeAgent()
+            self.built.append(agent)
+            return agent
+
+        self.pool = AgentPool(factory, size=2, name="test_pool", checkout_timeout=0.1)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_prewarm_and_reuse(self):
+        self.pool.start()
+        self.assertEqual(len(self.built), 2)
+        self.assertEqual(self.pool.available, 2)
+
+        for _ in range(5):
+            with self.pool.lease() as agent:
+                self.assertIn(agent, self.built)
+        # No new agents are built per request
+        self.assertEqual(len(self.built), 2)
+
+    def test_checkin_resets_session_state(self):
+        agent = self.pool.checkout()
+        agent.session_state.append("turn")
+        self.pool.checkin(agent)
+        self.assertEqual(agent.resets, 1)
+        self.assertEqual(agent.session_state, [])
+
+    def test_exhausted_pool_times_out(self):
+        a = self.pool.checkout()
+        b = self.pool.checkout()
+        with self.assertRaises(PoolExhaustedError):
+            self.pool.checkout()
+        self.pool.checkin(a)
+        self.pool.checkin(b)
+
+    def test_waiter_receives_checked_in_agent(self):
+        held = [self.pool.checkout(), self.pool.checkout()]
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(self.pool.checkout(timeout=2)))
+        waiter.start()
+        self.pool.checkin(held[0])
+        waiter.join()
+        self.assertIs(got[0], held[0])
+
+    def test_async_waiter_does_not_hold_a_thread(self):
+        async def scenario():
+            held = [await self.pool.acheckout(), await self.pool.acheckout()]
+            waiter = asyncio.create_task(self.pool.acheckout(timeout=2))
+            await asyncio.sleep(0.05)
+            self.assertEqual(threading.active_count(), threads)
+            await self.pool.acheckin(held[0])
+            self.assertIs(await waiter, held[0])
+            with self.assertRaises(PoolExhaustedError):
+                await self.pool.acheckout(timeout=0.05)
+            self.pool.checkin(held[1])
+            self.pool.checkin(held[0])
+
+        self.pool.start()
+        threads = threading.active_count()
+        asyncio.run(scenario())
+        self.assertEqual(self.pool.available, 2)
+
+    def test_cancelled_async_waiter_returns_agent(self):
+        async def scenario():
+            held = [await self.pool.acheckout(), await self.pool.acheckout()]
+            cancelled = asyncio.create_task(self.pool.acheckout(timeout=2))
+            await asyncio.sleep(0.01)
+            # The agent is handed over and the waiter cancelled before it resumes
+            self.pool.checkin(held[0])
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await cancelled
+            await asyncio.sleep(0.01)
+            self.assertEqual(self.pool.available, 1)
+            self.assertIs(await self.pool.acheckout(timeout=0.1), held[0])
+            self.pool.checkin(held[0])
+            self.pool.checkin(held[1])
+
+        self.pool.start()
+        asyncio.run(scenario())
+        self.assertEqual(self.pool.available, 2)
+
+    def test_shutdown_closes_agents(self):
+        self.pool.start()
+        self.pool.shutdown()
+        self.assertTrue(all(a.closed for a in self.built))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,16 @@ def test_chat_turn():
     assert len(data["steps"]) > 0
     print("Chat API verification successful:", data["response"][:50] + "...")
 
+def test_chat_stream():
+    with client.stream("POST", "/chat/stream", json={"message": "Research Python news"}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [line[len("event: "):] for line in response.iter_lines() if line.startswith("event: ")]
+    assert events[0] == "session"
+    assert "step_finished" in events and "token" in events
+    assert events[-1] == "done"
+    print("Chat stream verification successful")
+
 def test_agent_run():
     # Test direct worker access
     response = client.post("/agent/worker_research/run", json={"task": "Find X"})
@@ -33,5 +43,6 @@ def test_agent_run():
 if __name__ == "__main__":
     test_health()
     test_chat_turn()
+    test_chat_stream()
     test_agent_run()
     print("All API tests passed!")
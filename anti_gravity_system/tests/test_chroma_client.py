@@ -0,0 +1,143 @@
+import sys
+import os
+import time
+import shutil
+import socket
+import tempfile
+import unittest
+import subprocess
+from unittest.mock import patch
+
+import httpx
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.chroma_client import ChromaConnector, RetryTransport
+from anti_gravity_system.src.core.memory_store import MemoryStore
+
+def embed(texts):
+    return [[float(len(t)), 1.0, float(t.count("a"))] for t in texts]
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+class TestChromaConnector(unittest.TestCase):
+    def client(self, outcomes, retries=3):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            outcome = outcomes[min(len(calls), len(outcomes)) - 1]
+            if isinstance(outcome, Exception):
+                raise outcome
+            return httpx.Response(outcome, json={})
+
+        transport = RetryTransport(httpx.MockTransport(handler), retries=retries, backoff=0)
+        return httpx.Client(transport=transport), calls
+
+    def test_transient_failures_are_retried(self):
+        client, calls = self.client([httpx.ConnectError("refused"), 503, 200])
+        self.assertEqual(client.post("http://chroma/api", content=b"{}").status_code, 200)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls[-1].content, b"{}")
+
+    def test_gives_up_after_retries(self):
+        client, calls = self.client([httpx.ReadTimeout("slow")], retries=2)
+        with self.assertRaises(httpx.ReadTimeout):
+            client.get("http://chroma/api")
+        self.assertEqual(len(calls), 3)
+        client, calls = self.client([503], retries=1)
+        self.assertEqual(client.get("http://chroma/api").status_code, 503)
+
+    def test_client_errors_are_not_retried(self):
+        client, calls = self.client([404, 200])
+        self.assertEqual(client.get("http://chroma/api").status_code, 404)
+        self.assertEqual(len(calls), 1)
+
+    def test_unreachable_server_falls_back_to_local(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            connector = ChromaConnector(host="localhost", port=free_port(), retries=0, timeout=1, fallback="local")
+            client = connector.connect(tmp)
+            client.get_or_create_collection("probe")
+            self.assertTrue(os.path.isdir(os.path.join(tmp, "chroma")))
+
+            # The default refuses to diverge from the shared index
+            connector = ChromaConnector(host="localhost", port=free_port(), retries=0, timeout=1)
+            with self.assertRaises(Exception):
+                connector.connect(tmp)
+
+@unittest.skipIf(shutil.which("chroma") is None, "the chroma server CLI is not installed")
+class TestRemoteChroma(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server_dir = tempfile.TemporaryDirectory()
+        cls.port = free_port()
+        cls.server = subprocess.Popen(
+            ["chroma", "run", "--path", cls.server_dir.name, "--port", str(cls.port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"http://localhost:{cls.port}/api/v2/heartbeat", timeout=1).raise_for_status()
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline or cls.server.poll() is not None:
+                    cls.tearDownClass()
+                    raise unittest.SkipTest("the chroma server did not start")
+                time.sleep(0.2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        cls.server.wait(timeout=10)
+        cls.server_dir.cleanup()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        env = {"CHROMA_HOST": "localhost", "CHROMA_PORT": str(self.port)}
+        self.env = patch.dict(os.environ, env)
+        self.env.start()
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def open(self, name, tenant_id=None):
+        store = MemoryStore(os.path.join(self.tmp.name, name), vector_backend="chroma", tenant_id=tenant_id)
+        store.embedding_function = embed
+        self.stores.append(store)
+        return store
+
+    def test_replicas_share_the_index(self):
+        # Two replicas: separate local directories, one Chroma server
+        first, second = self.open("replica-1"), self.open("replica-2")
+        memory_id = first.add_memory("shared banana fact", "FACT", "s1")
+        first.flush()
+        self.assertIn(memory_id, second.backend.get([memory_id]))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "replica-1", "chroma")))
+        # One pooled session for both
+        self.assertIs(first.chroma_client._server._session, second.chroma_client._server._session)
+
+    def test_search_cache_is_off_for_a_shared_index(self):
+        # A replica cannot see the other replicas' writes to invalidate cached results
+        self.assertEqual(self.open("replica").search_cache.max_entries, 0)
+        local = MemoryStore(os.path.join(self.tmp.name, "local"), vector_backend="numpy")
+        self.stores.append(local)
+        self.assertGreater(local.search_cache.max_entries, 0)
+
+    def test_tenants_get_separate_databases(self):
+        alice, bob = self.open("alice", tenant_id="alice"), self.open("bob", tenant_id="bob@example.com")
+        memory_id = alice.add_memory("alice only", "FACT", "s1")
+        alice.flush()
+        self.assertIn(memory_id, alice.backend.get([memory_id]))
+        self.assertEqual(bob.backend.get([memory_id]), {})
+        self.assertEqual(bob.backend.count(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
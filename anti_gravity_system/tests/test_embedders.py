@@ -0,0 +1,116 @@
+import sys
+import os
+import time
+import tempfile
+import threading
+import unittest
+from functools import partial
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from prometheus_client import REGISTRY
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.embedders import BatchingEmbedder, OpenAIEmbedder, create_embedder
+from anti_gravity_system.src.core.embedding_cache import CachedEmbeddingFunction, default_embedding_function
+from anti_gravity_system.src.core.memory_store import MemoryStore
+from anti_gravity_system.src.core.vector_backends import memory_collection_name
+
+class FakeEmbedder:
+    """Module level so process-pool workers can unpickle its factory."""
+    model = "fake"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, input):
+        self.calls.append((len(input), threading.current_thread().name))
+        time.sleep(self.delay)
+        return [np.array([len(t), os.getpid()], dtype=np.float32) for t in input]
+
+def texts(n):
+    return ["x" * i for i in range(n)]
+
+class TestEmbedders(unittest.TestCase):
+    def test_batches_keep_order(self):
+        fake = FakeEmbedder()
+        embedder = BatchingEmbedder(lambda: fake, "fake", batch_size=3)
+        vectors = embedder(texts(10))
+        self.assertEqual([int(v[0]) for v in vectors], list(range(10)))
+        self.assertEqual([size for size, _ in fake.calls], [3, 3, 3, 1])
+        self.assertEqual(embedder([]), [])
+
+    def test_thread_pool_runs_batches_in_parallel(self):
+        fake = FakeEmbedder(delay=0.2)
+        embedder = BatchingEmbedder(lambda: fake, "fake-threads", batch_size=2, workers=4)
+        before = REGISTRY.get_sample_value("embedding_texts_total", {"model": "fake-threads"}) or 0
+        started = time.perf_counter()
+        embedder(texts(8))
+        self.assertLess(time.perf_counter() - started, 0.6)
+        self.assertEqual(len({thread for _, thread in fake.calls}), 4)
+        self.assertEqual(REGISTRY.get_sample_value("embedding_texts_total", {"model": "fake-threads"}) - before, 8)
+        self.assertGreater(REGISTRY.get_sample_value("embedding_throughput_texts_per_second", {"model": "fake-threads"}), 0)
+        self.assertEqual(REGISTRY.get_sample_value("embedding_batch_size_count", {"model": "fake-threads"}), 4)
+        embedder.close()
+
+    def test_process_pool(self):
+        embedder = BatchingEmbedder(partial(FakeEmbedder), "fake-processes", batch_size=2, workers=2, pool="process")
+        try:
+            vectors = embedder(texts(6))
+        finally:
+            embedder.close()
+        self.assertEqual([int(v[0]) for v in vectors], list(range(6)))
+        self.assertNotIn(os.getpid(), {int(v[1]) for v in vectors})
+
+    def test_openai_embedder(self):
+        embedder = OpenAIEmbedder(api_key="sk-test")
+        # The endpoint may return items out of order; `index` places them
+        embedder.client = MagicMock()
+        embedder.client.embeddings.create.return_value = SimpleNamespace(data=[
+            SimpleNamespace(index=1, embedding=[0.0, 1.0]), SimpleNamespace(index=0, embedding=[1.0, 0.0])
+        ])
+        vectors = embedder(["a", "b"])
+        np.testing.assert_array_equal(vectors[0], [1.0, 0.0])
+        embedder.client.embeddings.create.assert_called_once_with(model="text-embedding-3-small", input=["a", "b"])
+        with self.assertRaises(ValueError):
+            create_embedder("word2vec")
+
+    def test_configured_embedder_sits_behind_the_cache(self):
+        env = {"EMBEDDER": "openai", "EMBEDDING_BATCH_SIZE": "128", "OPENAI_API_KEY": "sk-test"}
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, env):
+            function = default_embedding_function(tmp)
+        self.assertIsInstance(function, CachedEmbeddingFunction)
+        self.assertEqual(function.model, "text-embedding-3-small")
+        self.assertEqual(function.cache.model, "text-embedding-3-small")
+        self.assertEqual(function.embed.batch_size, 128)
+
+    def test_each_model_gets_its_own_index(self):
+        env = {"EMBEDDER": "openai", "OPENAI_API_KEY": "sk-test"}
+        with tempfile.TemporaryDirectory() as tmp:
+            default = MemoryStore(tmp, vector_backend="numpy")
+            default.embedding_function = lambda texts: [[1.0, 0.0, 0.0] for _ in texts]
+            default.add_memory("three dimensions", "FACT", "s1")
+            default.close()
+
+            # A store reopened on another model does not upsert into the old index
+            with patch.dict(os.environ, env):
+                switched = MemoryStore(tmp, vector_backend="numpy")
+            switched.embedding_function = lambda texts: [[1.0, 0.0] for _ in texts]
+            switched.add_memory("two dimensions", "FACT", "s1")
+            switched.flush()
+            self.assertEqual(os.path.basename(switched.backend.path), "numpy_index__text-embedding-3-small")
+            self.assertEqual(switched.backend.count(), 1)
+            switched.close()
+
+        self.assertEqual(memory_collection_name("all-MiniLM-L6-v2"), "antigravity_memory")
+        for model in ("org/model:v2", "x" * 80, "a..b"):
+            name = memory_collection_name(model)
+            self.assertLessEqual(len(name), 63)
+            self.assertRegex(name, r"^[A-Za-z0-9][A-Za-z0-9_.-]*[A-Za-z0-9]$")
+            self.assertNotIn("..", name)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from prometheus_client import REGISTRY
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.embedding_cache import EmbeddingCache, CachedEmbeddingFunction
+from anti_gravity_system.src.core.memory_store import MemoryStore
+
+class CountingEmbedder:
+    """Deterministic 4-d embeddings; records every batch it is asked for."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(t)), float(sum(map(ord, t)) % 97), 1.0, 0.0] for t in texts]
+
+def lookups(model, result):
+    return REGISTRY.get_sample_value("embedding_cache_lookups_total", {"model": model, "result": result}) or 0
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_only_misses_are_embedded(self):
+        embedder = CountingEmbedder()
+        ef = CachedEmbeddingFunction(embedder, EmbeddingCache(self.tmp.name, "counting-a", capacity=8))
+        first = ef(["alpha", "beta", "alpha"])
+        second = ef(["beta", "gamma"])
+
+        self.assertEqual(embedder.batches, [["alpha", "beta"], ["gamma"]])
+        np.testing.assert_array_equal(first[0], first[2])
+        np.testing.assert_array_equal(first[1], second[0])
+        self.assertEqual(second[0].dtype, np.float32)
+        self.assertEqual(lookups("counting-a", "hit"), 1)
+        self.assertEqual(lookups("counting-a", "miss"), 4)
+
+    def test_keys_include_the_model(self):
+        a = EmbeddingCache(self.tmp.name, "model-a")
+        b = EmbeddingCache(self.tmp.name, "model-b")
+        self.assertNotEqual(a.key("same text"), b.key("same text"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = EmbeddingCache(self.tmp.name, "counting-lru", capacity=2)
+        cache.put_many(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+        cache.get_many(["a"])
+        cache.put_many(["c"], [[1.0, 1.0]])
+
+        found = cache.get_many(["a", "b", "c"])
+        self.assertIsNotNone(found[0])
+        self.assertIsNone(found[1])
+        np.testing.assert_array_equal(found[2], [1.0, 1.0])
+        self.assertEqual(len(cache), 2)
+
+    def test_survives_reopen(self):
+        cache = EmbeddingCache(self.tmp.name, "counting-disk", capacity=4)
+        cache.put_many(["persisted"], [[0.25, 0.5, 0.75]])
+        cache.flush()
+
+        reopened = EmbeddingCache(self.tmp.name, "counting-disk", capacity=4)
+        np.testing.assert_array_equal(reopened.get_many(["persisted"])[0], [0.25, 0.5, 0.75])
+        self.assertIsNone(reopened.get_many(["never stored"])[0])
+
+    def test_memory_store_embeds_repeated_content_once(self):
+        store = MemoryStore(persist_dir=self.tmp.name)
+        embedder = CountingEmbedder()
+        store.embedding_function = CachedEmbeddingFunction(
+            embedder, EmbeddingCache(os.path.join(self.tmp.name, "cache"), "counting-store")
+        )
+        store.add_memory("User asked: weather in Paris", "USER_INPUT", "s1")
+        store.add_memory("User asked: weather in Paris", "USER_INPUT", "s2")
+        results = store.search_memory("User asked: weather in Paris", limit=2)
+
+        self.assertEqual(embedder.batches, [["User asked: weather in Paris"]])
+        self.assertEqual(len(results), 2)
+        self.assertAlmostEqual(results[0]["distance"], 0.0, places=5)
+        store.close()
+
+if __name__ == "__main__":
+    unittest.main()
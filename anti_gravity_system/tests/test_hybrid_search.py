@@ -0,0 +1,105 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.memory_store import MemoryStore, MIGRATIONS, looks_like_identifier, fts_query
+from anti_gravity_system.src.agents.memory_agent import MemoryAgent
+
+def embed(texts):
+    # "forecast" and "weather" are synonyms to the vector ranking but not to the lexical one
+    return [[t.lower().count("weather") + t.lower().count("forecast") + 0.01, t.lower().count("code") + 0.01]
+            for t in texts]
+
+def no_embedding(texts):
+    raise AssertionError("lexical search must not embed")
+
+class TestHybridSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = MemoryStore(persist_dir=self.tmp.name, vector_backend="numpy")
+        self.store.embedding_function = embed
+        self.store.add_memory("Forecast: sunny in Paris", "FACT", "s1")
+        self.store.add_memory("Traceback in memory_store.py: ERR_CONN_RESET", "STEP_RESULT", "s1")
+        self.store.add_memory("Code review notes for the weather widget", "FACT", "s1")
+        self.store.flush()
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_identifier_detection(self):
+        for query in ["memory_store.py", "ERR_CONN_RESET", "E1101", "getUserById", "src/core", '"connection refused"']:
+            self.assertTrue(looks_like_identifier(query), query)
+        for query in ["weather in Paris", "weather", "What failed"]:
+            self.assertFalse(looks_like_identifier(query), query)
+
+    def test_fts_query_quotes_user_syntax(self):
+        self.assertEqual(fts_query('foo" OR bar* NEAR(x'), '"foo" OR "OR" OR "bar*" OR "NEAR(x"')
+        self.assertEqual(self.store.search_memory('bar* NEAR( "', mode="lexical"), [])
+
+    def test_quoted_query_is_a_phrase(self):
+        self.assertEqual(fts_query('"weather widget"'), '"weather widget"')
+        self.assertEqual(fts_query(' "say "hi" now" '), '"say ""hi"" now"')
+        self.assertEqual(fts_query('""'), "")
+        # Both words, but not as the phrase
+        self.store.add_memory("The widget shows the weather", "FACT", "s1")
+        self.assertEqual(len(self.store.search_memory("weather widget", mode="lexical")), 2)
+        results = self.store.search_memory('"weather widget"', mode="lexical")
+        self.assertEqual([r["content"] for r in results], ["Code review notes for the weather widget"])
+
+    def test_identifier_query_skips_embedding(self):
+        self.store.embedding_function = no_embedding
+        for query in ["ERR_CONN_RESET", "memory_store.py"]:
+            results = self.store.search_memory(query)
+            self.assertEqual([r["content"] for r in results], ["Traceback in memory_store.py: ERR_CONN_RESET"])
+            self.assertEqual(results[0]["metadata"]["type"], "STEP_RESULT")
+
+    def test_auto_falls_back_when_nothing_matches_lexically(self):
+        results = self.store.search_memory("forecast_v2", limit=1)
+        self.assertEqual(len(results), 1)
+
+    def test_hybrid_ranks_results_found_by_both(self):
+        results = self.store.search_memory("weather widget", mode="hybrid", limit=3)
+        self.assertEqual(results[0]["content"], "Code review notes for the weather widget")
+        self.assertTrue(all("score" in r for r in results))
+        self.assertEqual(self.store.search_memory("weather widget", mode="vector", limit=3)[0]["content"],
+                         "Forecast: sunny in Paris")
+
+    def test_type_filter_applies_to_lexical_results(self):
+        self.assertEqual(self.store.search_memory("weather", type_filter="STEP_RESULT", mode="lexical"), [])
+
+    def test_index_follows_rewrites_and_backfills(self):
+        with self.store.db.writer() as conn:
+            conn.execute("UPDATE memory_items SET content = 'renamed to store_v2.py' WHERE type = 'STEP_RESULT'")
+        self.assertEqual(self.store.search_memory("ERR_CONN_RESET", mode="lexical"), [])
+        self.assertEqual(len(self.store.search_memory("store_v2.py", mode="lexical")), 1)
+
+        # A database from before the FTS migration is indexed on upgrade
+        path = os.path.join(self.tmp.name, "legacy")
+        os.makedirs(path)
+        legacy = sqlite3.connect(os.path.join(path, "metadata.db"))
+        legacy.executescript(MIGRATIONS[0] + MIGRATIONS[1] + "PRAGMA user_version=2;")
+        legacy.execute("INSERT INTO memory_items VALUES ('m1', 's1', 'FACT', 'old ERR_DISK_FULL entry', '2024-01-01', 'm1')")
+        legacy.commit()
+        legacy.close()
+        upgraded = MemoryStore(persist_dir=path, vector_backend="numpy")
+        self.assertEqual([r["id"] for r in upgraded.search_memory("ERR_DISK_FULL", mode="lexical")], ["m1"])
+        upgraded.close()
+
+    def test_agent_passes_mode(self):
+        agent = MemoryAgent({"role": "Memory"})
+        agent.store.close()
+        agent.store = MagicMock()
+        agent.store.search_memory.return_value = []
+        agent.process_request({"action": "search", "payload": {"query": "x.py", "mode": "lexical"}})
+        self.assertEqual(agent.store.search_memory.call_args.kwargs["mode"], "lexical")
+        with self.assertRaises(ValueError):
+            self.store.search_memory("x", mode="fuzzy")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import sys
+import os
+import time
+import asyncio
+import threading
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.llm_cache import LLMResponseCache, MemoryTier, SQLiteTier, make_cache_key
+from anti_gravity_system.src.core.llm_provider import LLMProvider
+
+def completion(content):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "llm_cache.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_is_canonical(self):
+        a = make_cache_key("m", [{"role": "user", "content": "hi"}], 0.7)
+        b = make_cache_key("m", [{"content": "hi", "role": "user"}], 0.7)
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, make_cache_key("m", [{"role": "user", "content": "hi"}], 0.2))
+        self.assertNotEqual(a, make_cache_key("other", [{"role": "user", "content": "hi"}], 0.7))
+
+    def test_memory_tier_lru_and_ttl(self):
+        tier = MemoryTier(max_entries=2, ttl_seconds=60)
+        tier.set("a", "1")
+        tier.set("b", "2")
+        tier.get("a")          # a is now most recently used
+        tier.set("c", "3")     # evicts b
+        self.assertIsNone(tier.get("b"))
+        self.assertEqual(tier.get("a"), "1")
+
+        tier.set("d", "4", expires_at=time.time() - 1)
+        self.assertIsNone(tier.get("d"))
+
+    def test_sqlite_tier_is_shared_between_caches(self):
+        writer = LLMResponseCache(MemoryTier(), SQLiteTier(self.db_path))
+        reader = LLMResponseCache(MemoryTier(), SQLiteTier(self.db_path))
+        writer.set("k", "value")
+        self.assertEqual(reader.get("k"), "value")
+        # Promoted into the reader's memory tier
+        self.assertEqual(reader.memory_tier.get("k"), "value")
+
+    def test_async_path_reads_sqlite_off_the_loop(self):
+        cache = LLMResponseCache(MemoryTier(), SQLiteTier(self.db_path))
+        threads = []
+        sqlite_get, sqlite_set = cache.sqlite_tier.get, cache.sqlite_tier.set
+
+        def tracked(fn):
+            def wrapper(*args):
+                threads.append(threading.current_thread())
+                return fn(*args)
+            return wrapper
+
+        cache.sqlite_tier.get, cache.sqlite_tier.set = tracked(sqlite_get), tracked(sqlite_set)
+
+        async def scenario():
+            await cache.aset("k", "value")
+            cache.memory_tier.clear()
+            value = await cache.aget("k")
+            # Promoted: the second read does not touch SQLite
+            return value, await cache.aget("k")
+
+        self.assertEqual(asyncio.run(scenario()), ("value", "value"))
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    def test_provider_uses_cache_with_bypass(self):
+        provider = LLMProvider()
+        provider.mock_mode = False
+        provider.cache = LLMResponseCache(MemoryTier(), SQLiteTier(self.db_path))
+        provider.client = MagicMock()
+        provider.client.chat.completions.create.return_value = completion("cached answer")
+        messages = [{"role": "user", "content": "What is 2+2?"}]
+
+        self.assertEqual(provider.chat_completion(messages), "cached answer")
+        self.assertEqual(provider.chat_completion(messages), "cached answer")
+        self.assertEqual(provider.client.chat.completions.create.call_count, 1)
+
+        provider.chat_completion(messages, use_cache=False)
+        self.assertEqual(provider.client.chat.completions.create.call_count, 2)
+
+    def test_errors_are_not_cached(self):
+        provider = LLMProvider()
+        provider.mock_mode = False
+        provider.cache = LLMResponseCache(MemoryTier())
+        provider.client = MagicMock()
+        provider.client.chat.completions.create.side_effect = [RuntimeError("boom"), completion("ok")]
+        messages = [{"role": "user", "content": "retry me"}]
+
+        self.assertIn("Error generating response", provider.chat_completion(messages))
+        self.assertEqual(provider.chat_completion(messages), "ok")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import sys
+import os
+import asyncio
+import unittest
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.llm_clients import LLMClientRegistry, get_client_registry
+from anti_gravity_system.src.core.llm_provider import LLMProvider
+from anti_gravity_system.tests.openai_stub import OpenAIStubServer
+
+class TestSharedLLMClient(unittest.TestCase):
+    def _provider(self, base_url):
+        provider = LLMProvider(api_key="sk-test", base_url=base_url)
+        provider.mock_mode = False
+        provider.cache = None
+        return provider
+
+    def test_registry_keys_by_endpoint_key_and_model(self):
+        registry = LLMClientRegistry()
+        a = registry.get_client("sk-1", "http://localhost:1/v1", "m")
+        self.assertIs(a, registry.get_client("sk-1", "http://localhost:1/v1", "m"))
+        self.assertIsNot(a, registry.get_client("sk-2", "http://localhost:1/v1", "m"))
+        self.assertIsNot(a, registry.get_client("sk-1", "http://localhost:1/v1", "other"))
+        registry.close()
+
+    def test_agents_reuse_warm_connections(self):
+        with OpenAIStubServer(reply="pong") as server:
+            # e.g. orchestrator, critic and a worker in the same process
+            providers = [self._provider(server.base_url) for _ in range(3)]
+            self.assertTrue(all(p.client is providers[0].client for p in providers))
+
+            for provider in providers * 2:
+                self.assertEqual(provider.chat_completion([{"role": "user", "content": "ping"}]), "pong")
+
+            self.assertEqual(len(server.requests), 6)
+            self.assertEqual(server.connections, 1)
+
+    def test_async_clients_are_shared_within_a_loop(self):
+        with OpenAIStubServer(reply="pong") as server:
+            providers = [self._provider(server.base_url) for _ in range(2)]
+
+            async def flow():
+                self.assertIs(providers[0].async_client, providers[1].async_client)
+                for provider in providers * 2:
+                    await provider.achat_completion([{"role": "user", "content": "ping"}])
+
+            asyncio.run(flow())
+            self.assertEqual(len(server.requests), 4)
+            self.assertEqual(server.connections, 1)
+
+    def tearDown(self):
+        get_client_registry().close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import sys
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.memory_store import MemoryStore
+from anti_gravity_system.src.core.memory_compactor import MemoryCompactor, SUMMARY_TYPE
+from anti_gravity_system.src.core.llm_provider import LLMProvider
+from anti_gravity_system.tests.openai_stub import OpenAIStubServer
+
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+def embed(texts):
+    return [[float(len(t)), 1.0] for t in texts]
+
+class FailingStubServer(OpenAIStubServer):
+    def respond(self, body):
+        return 400, {}, {"error": {"message": "Bad request", "type": "invalid_request_error", "code": None}}
+
+class TestMemoryCompactor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = MemoryStore(persist_dir=self.tmp.name, vector_backend="numpy")
+        self.store.embedding_function = embed
+        self.llm = MagicMock(mock_mode=False)
+        self.llm.chat_completion.return_value = "Built the parser; tests pass."
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def add(self, content, type_, session_id, days_ago):
+        memory_id = self.store.add_memory(content, type_, session_id)
+        self.store.flush()
+        # Backdate the row; compaction only reads timestamps from SQLite
+        with self.store.db.writer() as conn:
+            conn.execute("UPDATE memory_items SET timestamp = ? WHERE id = ?",
+                         ((NOW - timedelta(days=days_ago)).isoformat(), memory_id))
+        return memory_id
+
+    def types(self, session_id):
+        return [h["type"] for h in self.store.get_session_history(session_id)]
+
+    def test_idle_sessions_are_summarized_and_originals_deleted(self):
+        self.add("Plan the parser", "USER_REQUEST", "old", days_ago=10)
+        self.add("Wrote parser.py", "TASK_RESULT", "old", days_ago=10)
+        self.add("Tests pass", "TASK_RESULT", "old", days_ago=10)
+        self.add("Still going", "TASK_RESULT", "active", days_ago=10)
+        self.add("Fresh result", "TASK_RESULT", "active", days_ago=1)
+
+        compactor = MemoryCompactor(self.store, llm=self.llm, summarize_after_days=7)
+        report = compactor.run(now=NOW)
+
+        self.assertEqual((report.sessions_summarized, report.items_summarized, report.summaries_written), (1, 2, 1))
+        self.assertEqual(sorted(self.types("old")), sorted(["USER_REQUEST", SUMMARY_TYPE]))
+        self.assertEqual(self.types("active"), ["TASK_RESULT", "TASK_RESULT"])
+        prompt = self.llm.chat_completion.call_args.args[0][1]["content"]
+        self.assertIn("Wrote parser.py", prompt)
+        # Gone from the vector index too
+        contents = [r["content"] for r in self.store.search_memory("Wrote parser.py", limit=10, mode="vector")]
+        self.assertNotIn("Wrote parser.py", contents)
+        self.assertIn("Built the parser; tests pass.", contents)
+        self.assertEqual(self.store.backend.count(), 4)
+
+    def assert_session_kept(self, report):
+        self.assertEqual((report.sessions_summarized, report.summaries_written), (0, 0))
+        self.assertEqual(self.types("old"), ["TASK_RESULT", "TASK_RESULT"])
+
+    def test_mock_provider_keeps_originals(self):
+        self.add("a", "TASK_RESULT", "old", days_ago=10)
+        self.add("b", "TASK_RESULT", "old", days_ago=10)
+        llm = LLMProvider(api_key="sk-mock-key")
+        self.assert_session_kept(MemoryCompactor(self.store, llm=llm, summarize_after_days=7).run(now=NOW))
+        # Even a compactor that does not check mock_mode gets an error, not the placeholder
+        compactor = MemoryCompactor(self.store, llm=llm, summarize_after_days=7)
+        with self.assertRaises(RuntimeError):
+            compactor._summarize(["a", "b"])
+
+    def test_failed_llm_call_keeps_originals(self):
+        self.add("a", "TASK_RESULT", "old", days_ago=10)
+        self.add("b", "TASK_RESULT", "old", days_ago=10)
+        with FailingStubServer() as server:
+            llm = LLMProvider(model="stub-compactor", api_key="sk-test", base_url=server.base_url)
+            llm.mock_mode = False
+            llm.cache = None
+            report = MemoryCompactor(self.store, llm=llm, summarize_after_days=7).run(now=NOW)
+            self.assertEqual(len(server.requests), 1)
+        self.assert_session_kept(report)
+
+    def test_ttl_expiry_and_dry_run(self):
+        self.add("x" * 100, "USER_REQUEST", "s1", days_ago=100)
+        self.add("recent", "USER_REQUEST", "s1", days_ago=5)
+        self.add("kept forever", "FACT", "s1", days_ago=1000)
+        compactor = MemoryCompactor(self.store, ttl_days={"USER_REQUEST": 90}, summarize_after_days=None)
+
+        preview = compactor.run(now=NOW, dry_run=True)
+        self.assertEqual((preview.items_expired, preview.content_bytes_reclaimed), (1, 100))
+        self.assertEqual(len(self.types("s1")), 3)
+
+        report = compactor.run(now=NOW)
+        self.assertEqual(report.items_expired, 1)
+        self.assertEqual(sorted(h["content"] for h in self.store.get_session_history("s1")), ["kept forever", "recent"])
+        self.assertEqual(compactor.run(now=NOW).items_expired, 0)
+
+    def test_from_config(self):
+        compactor = MemoryCompactor.from_config(self.store, {
+            "ttl_days": {"USER_REQUEST": "90"}, "summarize_after_days": 3, "vacuum": True
+        }, llm=self.llm)
+        self.assertEqual(compactor.ttl_days, {"USER_REQUEST": 90.0})
+        self.assertEqual(compactor.summarize_types, ("TASK_RESULT",))
+        self.assertTrue(compactor.vacuum)
+        self.add("old", "USER_REQUEST", "s1", days_ago=100)
+        self.assertEqual(compactor.run(now=NOW).items_expired, 1)
+
+if __name__ == "__main__":
+    unittest.main()
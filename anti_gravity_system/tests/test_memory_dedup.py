@@ -0,0 +1,99 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.memory_store import MemoryStore
+from anti_gravity_system.src.core.memory_dedup import Deduplicator, hamming, simhash, tokens
+
+REPORT = ("the quarterly deploy finished after the schema migration and the invoice parser was rolled back "
+          "because the staging checks flagged a regression in the currency rounding of refunds issued before "
+          "the cutover so the team will retry tomorrow morning once the fix for rounding has been reviewed and "
+          "the migration has been rehearsed on a copy of production data")
+
+def embed(texts):
+    return [[float(len(t)), 1.0] for t in texts]
+
+class TestMemoryDedup(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = MemoryStore(self.tmp.name, vector_backend="numpy")
+        self.store.embedding_function = MagicMock(side_effect=embed)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def hits(self, item_id):
+        with self.store.db.reader() as conn:
+            return conn.execute("SELECT hit_count FROM memory_fingerprints WHERE item_id = ?", (item_id,)).fetchone()[0]
+
+    def test_off_by_default(self):
+        self.assertFalse(self.store.dedup.enabled)
+        first = self.store.add_memory(REPORT, "FACT", "s1")
+        self.assertNotEqual(self.store.add_memory(REPORT, "FACT", "s1"), first)
+        self.store.flush()
+        self.assertEqual(len(self.store.get_session_history("s1")), 2)
+
+    def test_exact_duplicate_counts_a_hit(self):
+        self.store.dedup = Deduplicator("exact")
+        first = self.store.add_memory("deploy done", "FACT", "s1")
+        # Still buffered: matched through the pending map
+        self.assertEqual(self.store.add_memory("deploy done", "FACT", "s2"), first)
+        self.store.flush()
+        self.assertEqual(self.hits(first), 2)
+        # Committed: matched in SQLite
+        self.assertEqual(self.store.add_memory("deploy done", "FACT", "s3"), first)
+        self.assertEqual(self.hits(first), 3)
+        self.assertNotEqual(self.store.add_memory("deploy done", "TASK_RESULT", "s1"), first)
+        self.store.flush()
+        self.assertEqual(self.store.embedding_function.call_count, 2)
+        self.assertEqual(len(self.store.get_session_history("s2")), 0)
+
+    def test_near_duplicate(self):
+        self.store.dedup = Deduplicator("near")
+        first = self.store.add_memory(REPORT, "FACT", "s1")
+        self.store.flush()
+        self.assertEqual(self.store.add_memory(REPORT.replace("quarterly", "monthly"), "FACT", "s2"), first)
+        self.assertEqual(self.store.add_memory(REPORT.upper() + ".", "FACT", "s2"), first)
+        self.assertNotEqual(self.store.add_memory("an unrelated note about the hiring budget for next year", "FACT", "s2"), first)
+        self.assertEqual(self.hits(first), 3)
+
+    def test_session_scope(self):
+        self.store.dedup = Deduplicator("exact", scope="session")
+        first = self.store.add_memory("deploy done", "FACT", "s1")
+        self.store.flush()
+        self.assertEqual(self.store.add_memory("deploy done", "FACT", "s1"), first)
+        self.assertNotEqual(self.store.add_memory("deploy done", "FACT", "s2"), first)
+
+    def test_deleted_items_are_forgotten(self):
+        self.store.dedup = Deduplicator("exact")
+        first = self.store.add_memory("deploy done", "FACT", "s1")
+        self.store.flush()
+        self.store.delete_memories([first])
+        self.assertNotEqual(self.store.add_memory("deploy done", "FACT", "s1"), first)
+
+    def test_dropped_write_is_forgotten(self):
+        self.store.dedup = Deduplicator("exact")
+        self.store.write_buffer.max_attempts = 1
+        self.store.embedding_function.side_effect = RuntimeError("embedder down")
+        first = self.store.add_memory("deploy done", "FACT", "s1")
+        self.store.flush()
+        self.store.embedding_function.side_effect = embed
+        second = self.store.add_memory("deploy done", "FACT", "s1")
+        self.assertNotEqual(second, first)
+        self.store.flush()
+        self.assertEqual(self.hits(second), 1)
+
+    def test_simhash_distance(self):
+        near = hamming(simhash(tokens(REPORT)), simhash(tokens(REPORT.replace("quarterly", "monthly"))))
+        far = hamming(simhash(tokens(REPORT)), simhash(tokens("the hiring plan for the support team is on hold until march")))
+        self.assertLess(near, far)
+        with self.assertRaises(ValueError):
+            Deduplicator("near", max_distance=8)
+
+if __name__ == "__main__":
+    unittest.main()
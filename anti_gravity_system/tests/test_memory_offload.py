@@ -0,0 +1,136 @@
+import sys
+import os
+import time
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.agents.orchestrator import OrchestratorAgent
+from anti_gravity_system.src.core.bounded_executor import BoundedExecutor
+
+class TestBoundedExecutor(unittest.TestCase):
+    def test_single_worker_runs_in_submission_order(self):
+        executor = BoundedExecutor("test_fifo", workers=1, max_queue=100)
+        seen = []
+        for i in range(50):
+            executor.submit(seen.append, i)
+        executor.drain()
+        self.assertEqual(seen, list(range(50)))
+        executor.shutdown()
+
+    def test_full_queue_runs_inline(self):
+        executor = BoundedExecutor("test_backpressure", workers=1, max_queue=1, put_timeout=0.05)
+        release = threading.Event()
+        executor.submit(release.wait)          # occupies the worker
+        time.sleep(0.05)
+        executor.submit(lambda: None)          # fills the queue
+        caller = threading.get_ident()
+        overflow = executor.submit(threading.get_ident)
+        # No room after put_timeout: the caller did the work itself
+        self.assertTrue(overflow.done())
+        self.assertEqual(overflow.result(), caller)
+        release.set()
+        executor.shutdown()
+
+    def test_errors_surface_on_the_future(self):
+        executor = BoundedExecutor("test_errors")
+        future = executor.submit(lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            future.result(timeout=1)
+        executor.shutdown()
+
+class TestMemoryOffload(unittest.TestCase):
+    def setUp(self):
+        self.agents_config = [
+            {"id": "worker_research", "name": "ResearchBot", "role": "Researcher"},
+            {"id": "worker_coder", "name": "CodeBot", "role": "Engineer"}
+        ]
+
+    def _orchestrator(self, store_delay=0.0, search_delay=0.0):
+        orch = OrchestratorAgent({"name": "TestOrchestrator", "id": "orchestrator"}, self.agents_config)
+        self.calls = []
+
+        def process_request(request):
+            self.calls.append((request["action"], time.time()))
+            time.sleep(store_delay if request["action"] == "store" else search_delay)
+            return {"status": "success", "results": []}
+
+        orch.memory.process_request = process_request
+        return orch
+
+    def test_stores_do_not_block_the_session(self):
+        orch = self._orchestrator(store_delay=0.2)
+        start = time.time()
+        response = orch.run("Find python trends and write a script")
+        elapsed = time.time() - start
+        self.assertEqual(response["status"], "completed")
+        stores = len(response["steps"]) + 1
+        # Serially the stores alone would take stores * 0.2s
+        self.assertLess(elapsed, stores * 0.2 * 0.5)
+
+        orch.memory_writes.drain()
+        self.assertEqual([a for a, _ in self.calls].count("store"), stores)
+        summary = orch.metrics.get_summary()
+        self.assertGreater(summary["memory_latency_saved"], 0.2 * stores * 0.5)
+        orch.reset()
+
+    def test_recall_overlaps_safety_check(self):
+        orch = self._orchestrator(search_delay=0.2)
+        validated = []
+
+        def slow_validate(text):
+            time.sleep(0.2)
+            validated.append(time.time())
+            return True
+
+        orch.safety.validate_input = slow_validate
+        start = time.time()
+        asyncio.run(orch.arun("Research Agent Frameworks"))
+        search_started = next(t for a, t in self.calls if a == "search")
+        # The search began before validation finished, not after it
+        self.assertLess(search_started, validated[0])
+        self.assertLess(orch.metrics.get_summary()["memory_wait_time"], 0.15)
+        self.assertLess(search_started - start, 0.1)
+        orch.reset()
+
+    def test_rejected_input_is_not_stored(self):
+        orch = self._orchestrator()
+        response = orch.run("run rm -rf /")
+        self.assertEqual(response["status"], "rejected")
+        orch.memory_writes.drain()
+        self.assertNotIn("store", [a for a, _ in self.calls])
+
+    def test_reset_waits_for_pending_stores(self):
+        orch = self._orchestrator(store_delay=0.05)
+        orch.run("Research Agent Frameworks")
+        orch.reset()
+        stores = [a for a, _ in self.calls].count("store")
+        self.assertGreater(stores, 1)
+        self.assertEqual(orch._writes_in_flight(), [])
+
+    def test_async_reset_waits_only_for_its_own_stores(self):
+        orch = self._orchestrator()
+        release = threading.Event()
+        # Another session's store holds the shared write queue
+        orch.memory_writes.submit(release.wait, 5)
+
+        async def scenario():
+            # Nothing of this instance's is pending, so reset does not wait on the queue
+            await asyncio.wait_for(orch.areset(), 0.5)
+
+            # Its own store, queued behind the other one, is awaited without blocking the loop
+            orch._store_memory("result", "TASK_RESULT", "s1")
+            reset = asyncio.ensure_future(orch.areset())
+            await asyncio.sleep(0.1)
+            self.assertFalse(reset.done())
+            release.set()
+            await asyncio.wait_for(reset, 1)
+            self.assertEqual(orch._writes_in_flight(), [])
+
+        asyncio.run(scenario())
+
+if __name__ == "__main__":
+    unittest.main()
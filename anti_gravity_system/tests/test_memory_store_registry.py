@@ -0,0 +1,132 @@
+import sys
+import os
+import time
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.memory_store import MemoryStore, _stores, open_memory_store
+from anti_gravity_system.src.agents.memory_agent import MemoryAgent
+from anti_gravity_system.tools.vector_db import VectorDBTool
+
+class TestMemoryStoreRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_one_instance_per_resolved_directory(self):
+        link = os.path.join(self.tmp.name, "link")
+        target = os.path.join(self.tmp.name, "store")
+        os.makedirs(target)
+        os.symlink(target, link)
+
+        first = open_memory_store(target, vector_backend="numpy")
+        first.embedding_function = lambda texts: [[1.0, 0.0] for _ in texts]
+        self.assertIs(open_memory_store(link + "/", vector_backend="numpy"), first)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            opened = list(pool.map(lambda _: open_memory_store(target, vector_backend="numpy"), range(8)))
+        self.assertTrue(all(store is first for store in opened))
+
+        for _ in range(9):
+            first.close()
+        # One handle left: still usable
+        first.add_memory("still open", "FACT", "s1")
+        self.assertEqual(len(first.get_session_history("s1")), 1)
+        first.close()
+        first.close()
+
+        reopened = open_memory_store(target, vector_backend="numpy")
+        self.assertIsNot(reopened, first)
+        self.assertEqual([h["content"] for h in reopened.get_session_history("s1")], ["still open"])
+        reopened.close()
+
+    def test_open_waits_for_a_closing_store(self):
+        store = open_memory_store(self.tmp.name, vector_backend="numpy")
+        store.embedding_function = lambda texts: [[1.0, 0.0] for _ in texts]
+        store.add_memory("written on close", "FACT", "s1")
+        flushing, release = threading.Event(), threading.Event()
+        close_buffer = store.write_buffer.close
+
+        def slow_close():
+            flushing.set()
+            release.wait(2)
+            close_buffer()
+
+        store.write_buffer.close = slow_close
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            closing = pool.submit(store.close)
+            flushing.wait(2)
+            opening = pool.submit(open_memory_store, self.tmp.name, "numpy")
+            # Not handed the closing store, nor a second one on the same files
+            time.sleep(0.1)
+            self.assertFalse(opening.done())
+            release.set()
+            closing.result()
+            reopened = opening.result(timeout=2)
+        self.assertIsNot(reopened, store)
+        self.assertEqual([h["content"] for h in reopened.get_session_history("s1")], ["written on close"])
+        reopened.close()
+
+    def test_slow_open_does_not_block_other_directories(self):
+        slow_dir, fast_dir = os.path.join(self.tmp.name, "slow"), os.path.join(self.tmp.name, "fast")
+        constructing, release = threading.Event(), threading.Event()
+        builds = []
+        init = MemoryStore.__init__
+
+        def slow_init(store, persist_dir, **kwargs):
+            builds.append(persist_dir)
+            if persist_dir == os.path.realpath(slow_dir):
+                constructing.set()
+                release.wait(2)
+            init(store, persist_dir=persist_dir, **kwargs)
+
+        with patch.object(MemoryStore, "__init__", slow_init), ThreadPoolExecutor(max_workers=2) as pool:
+            slow = [pool.submit(open_memory_store, slow_dir, "numpy") for _ in range(2)]
+            constructing.wait(2)
+            fast = open_memory_store(fast_dir, "numpy")
+            self.assertFalse(any(future.done() for future in slow))
+            release.set()
+            first, second = (future.result(timeout=2) for future in slow)
+        # Concurrent opens of one directory share a single construction
+        self.assertIs(first, second)
+        self.assertEqual(builds.count(os.path.realpath(slow_dir)), 1)
+        for store in (fast, first, second):
+            store.close()
+        self.assertNotIn(os.path.realpath(slow_dir), _stores)
+
+    def test_backend_mismatch_is_rejected(self):
+        store = open_memory_store(self.tmp.name, vector_backend="numpy")
+        with self.assertRaises(ValueError):
+            open_memory_store(self.tmp.name, vector_backend="chroma")
+        # Not asking for a backend takes whichever the open store uses
+        self.assertIs(open_memory_store(self.tmp.name), store)
+        store.close()
+        store.close()
+
+    def test_agents_and_vector_tool_share_the_store(self):
+        first, second = MemoryAgent({"role": "Memory"}), MemoryAgent({"role": "Memory"})
+        self.assertIs(first.store, second.store)
+        first.close()
+        second.close()
+
+        store = open_memory_store(self.tmp.name, vector_backend="numpy")
+        tool = VectorDBTool(persist_dir=self.tmp.name)
+        self.assertIs(tool.store, store)
+        self.assertIs(tool.client, store.chroma_client)
+        self.assertIs(tool.embedding_function, store.embedding_function)
+        tool.close()
+        store.close()
+
+    def test_legacy_module_reexports_the_store(self):
+        from anti_gravity_system.memory import memory_store as legacy
+        self.assertIs(legacy.MemoryStore, MemoryStore)
+        self.assertIs(legacy.open_memory_store, open_memory_store)
+
+if __name__ == "__main__":
+    unittest.main()
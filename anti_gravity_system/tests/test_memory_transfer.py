@@ -0,0 +1,97 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.memory_store import MemoryStore
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+def embed(texts):
+    return [[float(len(t)), 1.0, float(t.count("a"))] for t in texts]
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestMemoryTransfer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = self.open("source")
+        for i in range(25):
+            self.source.add_memory(f"item {i} " + "a" * i, "FACT" if i % 2 else "TASK_RESULT", f"s{i % 3}",
+                                   {"step": i})
+        self.source.flush()
+
+    def tearDown(self):
+        self.source.close()
+        self.tmp.cleanup()
+
+    def open(self, name, embedder=embed):
+        store = MemoryStore(os.path.join(self.tmp.name, name), vector_backend="numpy")
+        store.embedding_function = embedder
+        return store
+
+    def round_trip(self, filename):
+        path = os.path.join(self.tmp.name, filename)
+        self.assertEqual(self.source.export_memories(path, chunk_size=10), 25)
+        # Any embedding call on import would be a failure to reuse the stored vectors
+        embedder = MagicMock(side_effect=AssertionError("re-embedded"))
+        target = self.open("target-" + filename, embedder)
+        self.assertEqual(target.import_memories(path, batch_size=7), 25)
+        return target
+
+    def assert_same(self, target):
+        for session in ("s0", "s1", "s2"):
+            self.assertEqual(target.get_session_history(session), self.source.get_session_history(session))
+        ids = [h["id"] for h in self.source.get_session_history("s1")]
+        original, copied = self.source.backend.get(ids), target.backend.get(ids)
+        for id in ids:
+            np.testing.assert_allclose(copied[id]["embedding"], original[id]["embedding"], rtol=1e-6)
+            self.assertEqual(copied[id]["metadata"], original[id]["metadata"])
+        self.assertEqual(target.search_memory("item", type_filter="FACT", limit=3, mode="lexical"),
+                         self.source.search_memory("item", type_filter="FACT", limit=3, mode="lexical"))
+
+    def test_parquet_round_trip(self):
+        target = self.round_trip("memory.parquet")
+        self.assert_same(target)
+        target.close()
+
+    def test_arrow_round_trip_is_idempotent(self):
+        target = self.round_trip("memory.arrow")
+        target.import_memories(os.path.join(self.tmp.name, "memory.arrow"))
+        self.assertEqual(target.backend.count(), 25)
+        self.assert_same(target)
+        target.close()
+
+    def test_missing_vectors_and_model_change_are_embedded(self):
+        path = os.path.join(self.tmp.name, "memory.parquet")
+        ids = [h["id"] for h in self.source.get_session_history("s0")]
+        self.source.backend.delete(ids[:2])
+        self.source.export_memories(path)
+
+        target = self.open("target", MagicMock(side_effect=embed))
+        target.import_memories(path)
+        self.assertEqual(sum(len(c.args[0]) for c in target.embedding_function.call_args_list), 2)
+
+        target.embedding_function.reset_mock()
+        target.import_memories(path, reembed=True)
+        self.assertEqual(sum(len(c.args[0]) for c in target.embedding_function.call_args_list), 25)
+        target.close()
+
+    def test_foreign_file_is_rejected(self):
+        import pyarrow.parquet
+        path = os.path.join(self.tmp.name, "other.parquet")
+        pyarrow.parquet.write_table(pyarrow.table({"id": ["x"]}), path)
+        target = self.open("target")
+        with self.assertRaises(ValueError):
+            target.import_memories(path)
+        target.close()
+
+if __name__ == "__main__":
+    unittest.main()
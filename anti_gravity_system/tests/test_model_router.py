@@ -0,0 +1,93 @@
+import sys
+import os
+import unittest
+from unittest.mock import MagicMock
+
+from prometheus_client import REGISTRY
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.model_router import ModelRouter
+from anti_gravity_system.src.core.llm_provider import LLMProvider
+from anti_gravity_system.src.agents.orchestrator import OrchestratorAgent
+from anti_gravity_system.tests.openai_stub import OpenAIStubServer
+
+ROUTING = {
+    "default_model": "large",
+    "tiers": {"small": "small-model", "large": "large-model"},
+    "stages": {
+        "orchestrator.think": "small",
+        "orchestrator.plan": "large",
+        "critic_safety.review": "small",
+        "worker_research.summarize": "small"
+    },
+    "escalation": {"enabled": True, "model": "large"}
+}
+
+AGENTS = [
+    {"id": "planner", "name": "Planner", "role": "planner", "model": "gpt-4"},
+    {"id": "worker_research", "name": "ResearchBot", "role": "Researcher"},
+    {"id": "worker_coder", "name": "CodeBot", "role": "Engineer"}
+]
+
+class TestModelRouter(unittest.TestCase):
+    def test_resolution_order(self):
+        router = ModelRouter(ROUTING, AGENTS)
+        self.assertEqual(router.resolve("orchestrator", "think"), "small-model")
+        self.assertEqual(router.resolve("orchestrator", "plan"), "large-model")
+        # Agent `model` field, then default
+        self.assertEqual(router.resolve("planner", "plan"), "gpt-4")
+        self.assertEqual(router.resolve("worker_coder", "code"), "large-model")
+        self.assertEqual(router.escalation_model, "large-model")
+
+        unconfigured = ModelRouter()
+        self.assertEqual(unconfigured.resolve("orchestrator", "think"), "gpt-4-turbo-preview")
+        self.assertIsNone(unconfigured.escalation_model)
+
+    def test_orchestrator_routes_stages_and_escalates_rejected_steps(self):
+        orch = OrchestratorAgent({"name": "TestOrchestrator", "id": "orchestrator"}, AGENTS, ROUTING)
+        orch.memory.process_request = MagicMock(return_value={"status": "success", "results": []})
+        orch.llm.chat_completion = MagicMock(return_value="answer")
+        orch.llm.generate_structured_response = MagicMock(
+            return_value=[{"id": 1, "task": "Research X", "worker": "worker_research", "depends_on": []}]
+        )
+        researcher = orch.workers["worker_research"]
+        researcher.tools.get_tool = MagicMock(return_value=MagicMock(execute=MagicMock(return_value=MagicMock(output="hits"))))
+        researcher.llm.chat_completion = MagicMock(return_value="summary")
+        orch.critic.llm.chat_completion = MagicMock(return_value="REJECTED: thin")
+        orch.critic.llm.mock_mode = False
+
+        orch.run("Research X")
+
+        self.assertEqual(orch.llm.chat_completion.call_args_list[0].kwargs["model"], "small-model")
+        self.assertEqual(orch.llm.generate_structured_response.call_args.kwargs["model"], "large-model")
+        self.assertEqual(orch.critic.llm.chat_completion.call_args.kwargs["model"], "small-model")
+        summary_models = [c.kwargs["model"] for c in researcher.llm.chat_completion.call_args_list]
+        self.assertEqual(summary_models, ["small-model", "large-model"])
+
+    def test_caller_context_cannot_pick_the_model(self):
+        from anti_gravity_system.src.agents.workers import WorkerFactory
+
+        coder = WorkerFactory.create_worker(AGENTS[2], ModelRouter(ROUTING, AGENTS))
+        coder.llm.chat_completion = MagicMock(return_value="print(1)")
+        coder.tools.get_tool = MagicMock(return_value=MagicMock(execute=MagicMock(return_value=MagicMock(status="success"))))
+
+        coder.execute_task("Print one", {"model": "gpt-4-32k"})
+        coder.execute_task("Print one", model="escalated-model")
+        models = [c.kwargs["model"] for c in coder.llm.chat_completion.call_args_list]
+        self.assertEqual(models, ["large-model", "escalated-model"])
+
+    def test_per_model_latency_and_token_metrics(self):
+        with OpenAIStubServer(reply="ok") as server:
+            provider = LLMProvider(model="router-default", api_key="sk-test", base_url=server.base_url)
+            provider.mock_mode = False
+            provider.cache = None
+            provider.chat_completion([{"role": "user", "content": "hi"}], model="router-small")
+
+        self.assertEqual(server.requests[0]["model"], "router-small")
+        labels = {"model": "router-small", "kind": "prompt"}
+        self.assertEqual(REGISTRY.get_sample_value("llm_token_usage_total", labels), 5)
+        self.assertEqual(REGISTRY.get_sample_value("llm_call_latency_seconds_count", {"model": "router-small"}), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import sys
+import os
+import time
+import uuid
+import hashlib
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+import chromadb
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.plan_cache import PlanCache
+from anti_gravity_system.src.core.vector_backends import ChromaBackend, NumpyBackend
+from anti_gravity_system.src.core.memory_store import MemoryStore
+
+def bag_of_words(texts):
+    """Deterministic offline embedding: hashed word counts."""
+    vectors = []
+    for text in texts:
+        vec = np.zeros(64, dtype=np.float32)
+        for word in text.split():
+            vec[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1.0
+        vectors.append(vec)
+    return vectors
+
+PLAN = [{"id": 1, "task": "Research python trends", "worker": "worker_research", "depends_on": []}]
+
+class TestPlanCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        store = MagicMock()
+        store.embedding_function = bag_of_words
+        self.cache = PlanCache(store, similarity_threshold=0.9, backend=self.make_backend())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_backend(self):
+        return NumpyBackend(os.path.join(self.tmp.name, "plans"), indexed_fields=("user_id",))
+
+    def test_paraphrase_is_served_from_cache(self):
+        self.cache.record("Research the latest Python trends", PLAN, approved_steps=1, total_steps=1)
+        hit = self.cache.lookup("research the latest python trends!")
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit[1], PLAN)
+        self.assertIsNone(self.cache.lookup("Write a rust web server with authentication"))
+
+    def test_plans_are_not_served_across_users(self):
+        self.cache.record("Research the latest Python trends", PLAN, 1, 1, user_id="alice")
+        self.assertIsNotNone(self.cache.lookup("Research the latest Python trends", user_id="alice"))
+        self.assertIsNone(self.cache.lookup("Research the latest Python trends", user_id="bob"))
+        self.assertIsNone(self.cache.lookup("Research the latest Python trends"))
+
+        # The same request recorded by another user is a separate entry
+        self.cache.record("Research the latest Python trends", PLAN, 1, 1, user_id="bob")
+        self.assertEqual(self.cache.backend.count(), 2)
+
+    def test_rejected_sessions_are_not_stored(self):
+        self.cache.record("Research the latest Python trends", PLAN, approved_steps=0, total_steps=1)
+        self.assertIsNone(self.cache.lookup("Research the latest Python trends"))
+
+    def test_poor_approval_history_stops_serving(self):
+        self.cache.record("Research the latest Python trends", PLAN, approved_steps=1, total_steps=1)
+        entry_id, _ = self.cache.lookup("Research the latest Python trends")
+        for _ in range(3):
+            self.cache.record("Research the latest Python trends", PLAN, 0, 1, entry_id=entry_id)
+        self.assertIsNone(self.cache.lookup("Research the latest Python trends"))
+
+    def test_eviction_by_age_and_usage(self):
+        self.cache.max_entries = 1
+        self.cache.record("Research the latest Python trends", PLAN, 1, 1)
+        self.cache.record("Write a rust web server", PLAN, 1, 1)
+        self.cache.lookup("Write a rust web server")  # more used, survives
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertIsNotNone(self.cache.lookup("Write a rust web server"))
+
+        self.assertEqual(self.cache.evict(now=time.time() + 31 * 86400), 1)
+        self.assertEqual(self.cache.backend.count(), 0)
+
+class TestPlanCacheOnChroma(TestPlanCache):
+    def make_backend(self):
+        return ChromaBackend(chromadb.EphemeralClient(), f"plans_{uuid.uuid4().hex[:8]}")
+
+class TestPlanCacheBackend(unittest.TestCase):
+    def test_uses_the_store_embedder_and_backend(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = MemoryStore(persist_dir=tmp, vector_backend="numpy")
+            embedded = []
+            store.embedding_function = lambda texts: embedded.extend(texts) or bag_of_words(texts)
+            try:
+                cache = PlanCache(store, similarity_threshold=0.9)
+                cache.record("Research the latest Python trends", PLAN, 1, 1)
+                self.assertIsNotNone(cache.lookup("research the latest python trends"))
+                self.assertIsInstance(cache.backend, NumpyBackend)
+                self.assertEqual(embedded, ["research the latest python trends"] * 2)
+                # The numpy backend never opens Chroma
+                self.assertIsNone(store._chroma_client)
+            finally:
+                store.close()
+
+class TestOrchestratorPlanCache(unittest.TestCase):
+    def test_cache_hit_skips_think_and_plan(self):
+        from anti_gravity_system.src.agents.orchestrator import OrchestratorAgent
+
+        orch = OrchestratorAgent({"name": "TestOrchestrator", "id": "orchestrator"},
+                                 [{"id": "worker_research", "name": "ResearchBot", "role": "Researcher"}])
+        store = MagicMock()
+        store.embedding_function = bag_of_words
+        orch.plan_cache = PlanCache(store, similarity_threshold=0.9,
+                                    backend=ChromaBackend(chromadb.EphemeralClient(), f"plans_{uuid.uuid4().hex[:8]}"))
+        orch.memory.process_request = MagicMock(return_value={"status": "success", "results": []})
+        orch.llm.chat_completion = MagicMock(return_value="analysis")
+        orch.llm.generate_structured_response = MagicMock(return_value=list(PLAN))
+        orch.workers["worker_research"].execute_task = MagicMock(return_value={"status": "success", "output": "facts"})
+        orch.critic.review_task = MagicMock(return_value={"approved": True, "feedback": "APPROVED"})
+
+        orch.run("Research the latest Python trends")
+        orch.run("research the latest python trends?")
+
+        self.assertEqual(orch.llm.generate_structured_response.call_count, 1)
+        sources = [r.tags.get("source") for r in orch.metrics.records if r.metric_name == "plan_latency"]
+        self.assertEqual(sources, ["llm", "cache"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import sys
+import os
+import time
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.plan_graph import PlanGraph, PlanCycleError, execute_plan_graph
+from anti_gravity_system.src.agents.orchestrator import OrchestratorAgent
+
+class TestPlanGraph(unittest.TestCase):
+    def test_no_edges_falls_back_to_sequential(self):
+        graph = PlanGraph([{"id": 1, "task": "a"}, {"id": 2, "task": "b"}, {"id": 3, "task": "c"}])
+        self.assertEqual(graph.dependencies, {"1": [], "2": ["1"], "3": ["2"]})
+
+    def test_cycle_detection(self):
+        plan = [
+            {"id": 1, "task": "a", "depends_on": [3]},
+            {"id": 2, "task": "b", "depends_on": [1]},
+            {"id": 3, "task": "c", "depends_on": [2]},
+        ]
+        with self.assertRaises(PlanCycleError):
+            PlanGraph(plan)
+        self.assertEqual(PlanGraph.sequential(plan).dependencies["3"], ["2"])
+
+    def test_unknown_dependencies_are_ignored(self):
+        graph = PlanGraph([{"id": 1, "task": "a", "depends_on": [7, 1]}])
+        self.assertEqual(graph.dependencies["1"], [])
+
+    def test_parallel_execution_follows_critical_path(self):
+        plan = [
+            {"id": 1, "task": "research A", "depends_on": []},
+            {"id": 2, "task": "research B", "depends_on": []},
+            {"id": 3, "task": "combine", "depends_on": [1, 2]},
+        ]
+        seen_upstream = {}
+
+        def run_step(step, upstream):
+            time.sleep(0.2)
+            seen_upstream[step["task"]] = upstream
+            return step["task"].upper()
+
+        start = time.time()
+        results = execute_plan_graph(PlanGraph(plan), run_step, max_workers=4)
+        elapsed = time.time() - start
+
+        self.assertEqual(results, ["RESEARCH A", "RESEARCH B", "COMBINE"])
+        self.assertEqual(seen_upstream["combine"], {"1": "RESEARCH A", "2": "RESEARCH B"})
+        # Critical path is two steps deep, not three
+        self.assertLess(elapsed, 0.55)
+
+class TestOrchestratorDagExecution(unittest.TestCase):
+    def test_upstream_results_reach_dependent_worker(self):
+        agents_config = [
+            {"id": "worker_research", "name": "ResearchBot", "role": "Researcher"},
+            {"id": "worker_coder", "name": "CodeBot", "role": "Engineer"}
+        ]
+        orch = OrchestratorAgent({"name": "TestOrchestrator", "id": "orchestrator"}, agents_config)
+        orch.memory.process_request = MagicMock(return_value={"status": "success", "results": []})
+        orch.llm.chat_completion = MagicMock(return_value="analysis")
+        orch.llm.generate_structured_response = MagicMock(return_value=[
+            {"id": 1, "task": "Research", "worker": "worker_research", "depends_on": []},
+            {"id": 2, "task": "Code", "worker": "worker_coder", "depends_on": [1]}
+        ])
+        orch.critic.review_task = MagicMock(return_value={"approved": True, "feedback": "APPROVED"})
+        orch.workers["worker_research"].execute_task = MagicMock(return_value={"status": "success", "output": "facts"})
+        orch.workers["worker_coder"].execute_task = MagicMock(return_value={"status": "success", "output": "code"})
+
+        response = orch.run("Research and code")
+
+        self.assertEqual([s["step"]["id"] for s in response["steps"]], [1, 2])
+        _, context = orch.workers["worker_coder"].execute_task.call_args[0]
+        self.assertEqual(context["upstream_results"], {"1": {"status": "success", "output": "facts"}})
+
+if __name__ == "__main__":
+    unittest.main()
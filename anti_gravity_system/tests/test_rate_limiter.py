@@ -0,0 +1,114 @@
+import sys
+import os
+import time
+import asyncio
+import unittest
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.rate_limiter import TokenBucket, AdaptiveConcurrencyLimit, ModelRateLimiter
+from anti_gravity_system.src.core.llm_provider import LLMProvider
+from anti_gravity_system.tests.openai_stub import OpenAIStubServer
+
+class ThrottlingStubServer(OpenAIStubServer):
+    """
+    Answers the first `throttled` requests with 429 and a Retry-After header.
+    """
+
+    def __init__(self, throttled: int, retry_after: str = "0.2", **kwargs):
+        super().__init__(**kwargs)
+        self.throttled = throttled
+        self.retry_after = retry_after
+
+    def respond(self, body):
+        if len(self.requests) <= self.throttled:
+            error = {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+            return 429, {"Retry-After": self.retry_after}, error
+        return super().respond(body)
+
+class TestRateLimiter(unittest.TestCase):
+    def _provider(self, base_url, max_retries=4):
+        provider = LLMProvider(model=f"stub-{time.time_ns()}", api_key="sk-test", base_url=base_url)
+        provider.mock_mode = False
+        provider.cache = None
+        provider.limiter = ModelRateLimiter(provider.model, initial_concurrency=8,
+                                            max_retries=max_retries, base_delay=0.01)
+        return provider
+
+    def test_token_bucket_makes_callers_wait_for_refill(self):
+        bucket = TokenBucket(per_minute=60)  # one per second
+        bucket.tokens = 1
+        self.assertEqual(bucket.reserve(1), 0.0)
+        self.assertAlmostEqual(bucket.reserve(1), 1.0, delta=0.05)
+        self.assertAlmostEqual(bucket.reserve(1), 2.0, delta=0.05)
+        self.assertEqual(TokenBucket(per_minute=0).reserve(10**6), 0.0)
+
+    def test_aimd_limit(self):
+        limit = AdaptiveConcurrencyLimit(initial=8, minimum=1, maximum=10, cooldown_seconds=60)
+        self.assertTrue(limit.try_acquire())
+        limit.release("throttled")
+        self.assertEqual(limit.limit, 4)
+        # Further throttles inside the cooldown window do not compound
+        limit.try_acquire()
+        limit.release("throttled")
+        self.assertEqual(limit.limit, 4)
+        for _ in range(4):
+            limit.try_acquire()
+            limit.release("success")
+        self.assertAlmostEqual(limit.limit, 5, delta=0.1)
+
+        for _ in range(int(limit.limit)):
+            self.assertTrue(limit.try_acquire())
+        self.assertFalse(limit.try_acquire())
+
+    def test_retries_429_honouring_retry_after(self):
+        with ThrottlingStubServer(throttled=2, reply="finally") as server:
+            provider = self._provider(server.base_url)
+            start = time.time()
+            content = provider.chat_completion([{"role": "user", "content": "hi"}])
+            elapsed = time.time() - start
+
+        self.assertEqual(content, "finally")
+        self.assertEqual(len(server.requests), 3)
+        self.assertGreaterEqual(elapsed, 0.4)
+        self.assertLess(provider.limiter.concurrency.limit, 8)
+
+    def test_async_retries_and_gives_up_softly(self):
+        with ThrottlingStubServer(throttled=10, retry_after="0.01") as server:
+            provider = self._provider(server.base_url, max_retries=2)
+            content = asyncio.run(provider.achat_completion([{"role": "user", "content": "hi"}]))
+
+        self.assertTrue(content.startswith("Error generating response"))
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(provider.limiter.concurrency.in_flight, 0)
+
+    def test_stream_holds_its_slot_until_read_or_closed(self):
+        messages = [{"role": "user", "content": "hi"}]
+        with OpenAIStubServer(reply="one two three") as server:
+            provider = self._provider(server.base_url)
+            limit = provider.limiter.concurrency
+
+            stream = provider.stream_chat_completion(messages)
+            self.assertEqual(next(stream), "one")
+            self.assertEqual(limit.in_flight, 1)
+            self.assertEqual("".join(stream), " two three")
+            self.assertEqual(limit.in_flight, 0)
+
+            # Abandoned after the first delta
+            stream = provider.stream_chat_completion(messages)
+            next(stream)
+            stream.close()
+            self.assertEqual(limit.in_flight, 0)
+
+            async def partial_async_read():
+                stream = provider.astream_chat_completion(messages)
+                await stream.__anext__()
+                held = limit.in_flight
+                await stream.aclose()
+                return held
+
+            self.assertEqual(asyncio.run(partial_async_read()), 1)
+            self.assertEqual(limit.in_flight, 0)
+
+if __name__ == "__main__":
+    unittest.main()
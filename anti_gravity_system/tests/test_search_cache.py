@@ -0,0 +1,101 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.memory_store import MemoryStore
+from anti_gravity_system.src.core.search_cache import SearchResultCache
+
+def embed(texts):
+    return [[float(len(t)), 1.0] for t in texts]
+
+class TestSearchCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = MemoryStore(persist_dir=self.tmp.name, vector_backend="numpy")
+        self.store.embedding_function = embed
+        self.store.add_memory("deploy the api", "FACT", "s1")
+        self.store.add_memory("api deployed", "TASK_RESULT", "s1")
+        self.store.flush()
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def search(self, *args, **kwargs):
+        with patch.object(self.store, "_search_memory", wraps=self.store._search_memory) as inner:
+            results = self.store.search_memory(*args, **kwargs)
+        return results, inner.call_count
+
+    def test_repeated_search_is_served_from_cache(self):
+        first, ran = self.search("api", mode="hybrid")
+        self.assertEqual(ran, 1)
+        second, ran = self.search("api", mode="hybrid")
+        self.assertEqual(ran, 0)
+        self.assertEqual(second, first)
+        # A different limit or mode is a different search
+        self.assertEqual(self.search("api", limit=1, mode="hybrid")[1], 1)
+        self.assertEqual(self.search("api", mode="lexical")[1], 1)
+
+    def test_writes_invalidate_by_type(self):
+        self.search("api", type_filter="FACT")
+        self.search("api")
+        self.store.add_memory("api docs", "TASK_RESULT", "s2")
+        self.store.flush()
+        # Another type's write leaves the FACT results valid; the unfiltered ones are stale
+        self.assertEqual(self.search("api", type_filter="FACT")[1], 0)
+        results, ran = self.search("api")
+        self.assertEqual(ran, 1)
+        self.assertIn("api docs", [r["content"] for r in results])
+
+        self.store.add_memory("api facts", "FACT", "s2")
+        self.store.flush()
+        results, ran = self.search("api", type_filter="FACT")
+        self.assertEqual(ran, 1)
+        self.assertIn("api facts", [r["content"] for r in results])
+
+    def test_delete_and_pending_writes_invalidate(self):
+        results, _ = self.search("api", type_filter="FACT")
+        self.store.delete_memories([results[0]["id"]])
+        self.assertEqual(self.search("api", type_filter="FACT"), ([], 1))
+
+        # A pending write of the searching session is flushed, and seen, before the lookup
+        self.store.add_memory("api again", "FACT", "s3")
+        results, _ = self.search("api", type_filter="FACT", session_id="s3")
+        self.assertEqual([r["content"] for r in results], ["api again"])
+
+    def test_write_during_search_is_not_hidden(self):
+        search = self.store._search_memory
+
+        def search_then_write(*args):
+            results = search(*args)
+            self.store.add_memory("late api", "FACT", "s2")
+            self.store.flush()
+            return results
+
+        with patch.object(self.store, "_search_memory", side_effect=search_then_write):
+            self.store.search_memory("api", type_filter="FACT")
+        results, ran = self.search("api", type_filter="FACT")
+        self.assertEqual(ran, 1)
+        self.assertIn("late api", [r["content"] for r in results])
+
+    def test_lru_eviction_and_copies(self):
+        cache = SearchResultCache(max_entries=2)
+        stamp = cache.stamp()
+        cache.put("a", stamp, [{"id": "1"}])
+        cache.put("b", stamp, [])
+        cache.get("a")
+        cache.put("c", stamp, [])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+        cache.get("a")[0]["id"] = "edited"
+        self.assertEqual(cache.get("a"), [{"id": "1"}])
+
+        self.assertIsNone(SearchResultCache(max_entries=0).get("a"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.memory_store import open_memory_store
+from anti_gravity_system.src.agents.memory_agent import MemoryAgent
+from anti_gravity_system.src.core.tenant_shards import get_tenant_shards
+from anti_gravity_system.app import main
+
+def embed(texts):
+    return [[float(len(t)), 1.0] for t in texts]
+
+class TestSessionHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = open_memory_store(self.tmp.name, vector_backend="numpy")
+        self.store.embedding_function = embed
+        for i in range(7):
+            self.store.add_memory(f"step {i} " + "x" * 50, "TASK_RESULT", "s1")
+        self.store.add_memory("other session", "FACT", "s2")
+        self.store.flush()
+        # Several items share a timestamp; the id breaks the tie
+        with self.store.db.writer() as conn:
+            conn.execute("UPDATE memory_items SET timestamp = '2025-01-01T00:00:00' WHERE content LIKE 'step 2%' "
+                         "OR content LIKE 'step 3%' OR content LIKE 'step 4%'")
+        self.history = self.store.get_session_history("s1")
+        self.expected = [h["id"] for h in self.history]
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_pages_cover_the_session_once(self):
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = self.store.get_session_history_page("s1", cursor, limit=3)
+            seen.extend(item["id"] for item in page["items"])
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(pages, 3)
+
+        # A full last page still reports the end
+        self.assertIsNone(self.store.get_session_history_page("s1", limit=7)["next_cursor"])
+
+    def test_stream_projection_and_truncation(self):
+        items = list(self.store.iter_session_history("s1", fields=["id", "content"], max_content_chars=6, batch_size=2))
+        self.assertEqual([i["id"] for i in items], self.expected)
+        self.assertEqual(items[0], {"id": self.expected[0], "content": self.history[0]["content"][:6], "truncated": True})
+
+        with self.assertRaises(ValueError):
+            self.store.iter_session_history("s1", fields=["embedding"])
+        with self.assertRaises(ValueError):
+            self.store.get_session_history_page("s1", cursor="not-a-cursor")
+
+    def test_agent_pages_when_asked(self):
+        agent = MemoryAgent({"role": "Memory"})
+        agent.store.close()
+        agent.store = open_memory_store(self.tmp.name)
+
+        full = agent.process_request({"action": "get_history", "payload": {"session_id": "s1"}})
+        self.assertEqual(len(full["history"]), 7)
+        self.assertNotIn("next_cursor", full)
+
+        page = agent.process_request({"action": "get_history", "payload": {"session_id": "s1", "limit": 5}})
+        rest = agent.process_request({"action": "get_history", "payload": {
+            "session_id": "s1", "cursor": page["next_cursor"], "fields": ["id"]
+        }})
+        self.assertEqual([h["id"] for h in page["history"] + rest["history"]], self.expected)
+        self.assertIsNone(rest["next_cursor"])
+        agent.close()
+
+    def test_http_routes(self):
+        root = os.path.join(self.tmp.name, "api")
+        shards = get_tenant_shards(root)
+        with shards.acquire("regular_user") as store:
+            store.embedding_function = embed
+            for i in range(7):
+                store.add_memory(f"step {i} " + "x" * 50, "TASK_RESULT", "s1")
+            store.flush()
+            expected = [h["id"] for h in store.get_session_history("s1")]
+
+        client = TestClient(main.app)
+        user, admin = {"X-API-Key": "sk-user"}, {"X-API-Key": "sk-admin"}
+        with patch.object(main, "MEMORY_DIR", root), patch.dict(os.environ, {"REQUIRE_AUTH": "true"}):
+            # The authenticated user's shard, without naming it
+            first = client.get("/sessions/s1/history", params={"limit": 4, "fields": "id,type"}, headers=user).json()
+            self.assertEqual(set(first["items"][0]), {"id", "type"})
+            second = client.get("/sessions/s1/history", params={"cursor": first["next_cursor"]}, headers=user).json()
+            self.assertEqual([i["id"] for i in first["items"] + second["items"]], expected)
+            self.assertIsNone(second["next_cursor"])
+
+            self.assertEqual(client.get("/sessions/s1/history", params={"cursor": "bogus"}, headers=user).status_code, 400)
+            self.assertEqual(client.get("/sessions/s1/history", params={"limit": 0}, headers=user).status_code, 422)
+
+            response = client.get("/sessions/s1/history/stream", params={"max_content_chars": 6}, headers=user)
+            self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+            items = [json.loads(line) for line in response.text.splitlines()]
+            self.assertEqual([i["id"] for i in items], expected)
+            self.assertTrue(all(i["truncated"] for i in items))
+
+            # Only admins may name another user's shard
+            for path in ("/sessions/s1/history", "/sessions/s1/history/stream"):
+                self.assertEqual(client.get(path, params={"user_id": "admin_user"}, headers=user).status_code, 403)
+            self.assertEqual(client.get("/sessions/s1/history", headers=admin).json()["items"], [])
+            page = client.get("/sessions/s1/history", params={"user_id": "regular_user"}, headers=admin).json()
+            self.assertEqual([i["id"] for i in page["items"]], expected)
+            self.assertEqual(client.post("/chat/turn", json={"message": "hi", "user_id": "admin_user"},
+                                         headers=user).status_code, 403)
+        shards.close()
+
+if __name__ == "__main__":
+    unittest.main()
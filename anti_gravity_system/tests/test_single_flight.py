@@ -0,0 +1,164 @@
+import sys
+import os
+import time
+import asyncio
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.single_flight import SingleFlight, AsyncSingleFlight
+from anti_gravity_system.src.core.llm_provider import LLMProvider
+from anti_gravity_system.src.core.memory_store import MemoryStore
+from anti_gravity_system.tests.openai_stub import OpenAIStubServer
+
+class SlowStubServer(OpenAIStubServer):
+    def respond(self, body):
+        time.sleep(0.2)
+        return super().respond(body)
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        flights = SingleFlight("test")
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.1)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: flights.do("key", work), range(5)))
+
+        self.assertEqual(results, ["result"] * 5)
+        self.assertEqual(len(calls), 1)
+        # The key is released once the call completes
+        flights.do("key", work)
+        self.assertEqual(len(calls), 2)
+
+    def test_waiters_receive_the_error(self):
+        flights = SingleFlight("test")
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError("upstream down")
+
+        def call():
+            try:
+                flights.do("key", fail)
+            except RuntimeError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            leader = pool.submit(call)
+            started.wait()
+            followers = [pool.submit(call) for _ in range(2)]
+            outcomes = [leader.result()] + [f.result() for f in followers]
+        self.assertEqual(outcomes, ["upstream down"] * 3)
+
+    def test_async_calls_share_one_execution(self):
+        flights = AsyncSingleFlight("test")
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def burst():
+            return await asyncio.gather(*[flights.do("key", work) for _ in range(5)])
+
+        self.assertEqual(asyncio.run(burst()), ["result"] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_cancelled_leader_hands_the_call_to_a_waiter(self):
+        flights = AsyncSingleFlight("test")
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def scenario():
+            leader = asyncio.create_task(flights.do("key", work))
+            await asyncio.sleep(0.01)
+            waiters = [asyncio.create_task(flights.do("key", work)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await asyncio.gather(*waiters)
+
+        self.assertEqual(asyncio.run(scenario()), ["result"] * 3)
+        # The leader's call and one rerun shared by the waiters
+        self.assertEqual(len(calls), 2)
+
+    def test_identical_llm_burst_hits_upstream_once(self):
+        with SlowStubServer(reply="shared") as server:
+            provider = LLMProvider(api_key="sk-test", base_url=server.base_url)
+            provider.mock_mode = False
+            provider.cache = None
+            messages = [{"role": "user", "content": "same question"}]
+
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(lambda _: provider.chat_completion(list(messages)), range(4)))
+
+            async def burst():
+                return await asyncio.gather(*[provider.achat_completion(list(messages)) for _ in range(4)])
+
+            results += asyncio.run(burst())
+
+        self.assertEqual(results, ["shared"] * 8)
+        self.assertEqual(len(server.requests), 2)
+
+    def test_identical_memory_searches_are_coalesced(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = MemoryStore(persist_dir=tmp)
+            calls = []
+
+            def slow_search(query, type_filter=None, limit=5, mode="vector"):
+                calls.append(query)
+                time.sleep(0.1)
+                return [{"id": "1", "content": query}]
+
+            store._search_memory = slow_search
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(lambda _: store.search_memory("python"), range(4)))
+            store.close()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r == [{"id": "1", "content": "python"}] for r in results))
+
+    def test_search_after_a_flush_is_not_coalesced_with_an_older_one(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = MemoryStore(persist_dir=tmp, vector_backend="numpy")
+            store.embedding_function = lambda texts: [[float(len(t)), 1.0] for t in texts]
+            started, release = threading.Event(), threading.Event()
+            search = store._search_memory
+
+            def slow_search(query, type_filter=None, limit=5, mode="vector"):
+                if not started.is_set():
+                    started.set()
+                    release.wait(5)
+                return search(query, type_filter, limit, mode)
+
+            store._search_memory = slow_search
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                # A search is in flight before the session's write lands...
+                stale = pool.submit(store.search_memory, "python", mode="lexical")
+                started.wait(2)
+                store.add_memory("python tips", "FACT", "s1")
+                # ...so the session's own search runs separately and finds the write
+                fresh = pool.submit(store.search_memory, "python", session_id="s1", mode="lexical")
+                self.assertEqual([r["content"] for r in fresh.result(timeout=1)], ["python tips"])
+                release.set()
+                stale.result()
+            store.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import sys
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.sqlite_pool import SQLiteConnectionPool
+from anti_gravity_system.src.core.memory_store import MemoryStore, MIGRATIONS
+
+class TestSQLitePool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "metadata.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_wal_and_pragmas(self):
+        pool = SQLiteConnectionPool(self.path, pragmas={"synchronous": "NORMAL", "cache_size": -2048, "mmap_size": 0})
+        with pool.reader() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+            self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -2048)
+        pool.close()
+
+    def test_readers_are_not_blocked_by_an_open_write(self):
+        pool = SQLiteConnectionPool(self.path, max_readers=2)
+        pool.migrate(MIGRATIONS)
+        writing = threading.Event()
+        release = threading.Event()
+
+        def long_write():
+            with pool.writer() as conn:
+                conn.execute("INSERT INTO memory_items (id, session_id) VALUES ('a', 's')")
+                writing.set()
+                release.wait(5)
+
+        writer = threading.Thread(target=long_write)
+        writer.start()
+        writing.wait(5)
+        with pool.reader() as conn:
+            # The uncommitted row is invisible, but the read does not wait for the writer
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM memory_items").fetchone()[0], 0)
+        release.set()
+        writer.join()
+        with pool.reader() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM memory_items").fetchone()[0], 1)
+        pool.close()
+
+    def test_existing_database_upgrades_in_place(self):
+        # A metadata.db as created before schema versioning
+        legacy = sqlite3.connect(self.path)
+        legacy.execute("CREATE TABLE memory_items (id TEXT PRIMARY KEY, session_id TEXT, type TEXT, "
+                       "content TEXT, timestamp TEXT, embedding_id TEXT)")
+        legacy.execute("INSERT INTO memory_items VALUES ('m1', 's1', 'FACT', 'kept', '2024-01-01', 'm1')")
+        legacy.commit()
+        legacy.close()
+
+        store = MemoryStore(persist_dir=self.tmp.name)
+        with store.db.reader() as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], len(MIGRATIONS))
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM memory_items WHERE session_id = ? ORDER BY timestamp", ("s1",)
+            ).fetchall()
+        self.assertIn("idx_memory_items_session_timestamp", str(plan))
+        self.assertEqual([h["content"] for h in store.get_session_history("s1")], ["kept"])
+        store.close()
+
+        # Reopening is a no-op
+        reopened = MemoryStore(persist_dir=self.tmp.name)
+        reopened.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import sys
+import os
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.agents.orchestrator import OrchestratorAgent
+from anti_gravity_system.src.core.llm_provider import LLMProvider
+from anti_gravity_system.tests.openai_stub import OpenAIStubServer
+
+class TestStreaming(unittest.TestCase):
+    def _provider(self, base_url):
+        provider = LLMProvider(api_key="sk-test", base_url=base_url)
+        provider.mock_mode = False
+        provider.cache = None
+        return provider
+
+    def test_provider_streams_deltas(self):
+        with OpenAIStubServer(reply="the quick brown fox") as server:
+            provider = self._provider(server.base_url)
+            deltas = list(provider.stream_chat_completion([{"role": "user", "content": "hi"}]))
+            self.assertEqual(deltas, ["the", " quick", " brown", " fox"])
+            self.assertTrue(server.requests[0]["stream"])
+
+            async def collect():
+                return [d async for d in provider.astream_chat_completion([{"role": "user", "content": "hi"}])]
+
+            self.assertEqual("".join(asyncio.run(collect())), "the quick brown fox")
+
+    def test_orchestrator_emits_stage_events_then_tokens(self):
+        orch = OrchestratorAgent({"name": "TestOrchestrator", "id": "orchestrator"},
+                                 [{"id": "worker_research", "name": "ResearchBot", "role": "Researcher"},
+                                  {"id": "worker_coder", "name": "CodeBot", "role": "Engineer"}])
+        orch.memory.process_request = MagicMock(return_value={"status": "success", "results": []})
+
+        async def collect():
+            return [event async for event in orch.astream("Find python trends and write a script")]
+
+        events = asyncio.run(collect())
+        types = [event["type"] for event in events]
+
+        self.assertEqual(types[:4], ["session", "observe", "think", "plan"])
+        self.assertEqual(types[-1], "done")
+        for stage in ("step_started", "critic_verdict", "step_finished", "token"):
+            self.assertIn(stage, types)
+        # Every step finishes before the answer starts streaming
+        self.assertLess(max(i for i, t in enumerate(types) if t == "step_finished"), types.index("token"))
+
+        done = events[-1]
+        tokens = "".join(event["delta"] for event in events if event["type"] == "token")
+        self.assertEqual(done["final_response"], tokens)
+        self.assertEqual(done["status"], "completed")
+        self.assertEqual(types.count("step_finished"), len(done["steps"]))
+
+    def test_closed_stream_waits_for_cancelled_steps(self):
+        orch = OrchestratorAgent({"name": "TestOrchestrator", "id": "orchestrator"},
+                                 [{"id": "worker_research", "name": "ResearchBot", "role": "Researcher"}])
+        orch.memory.process_request = MagicMock(return_value={"status": "success", "results": []})
+        unwound = []
+
+        async def slow_plan(plan, session_id, on_event):
+            on_event({"type": "step_started", "step_id": 1})
+            try:
+                await asyncio.sleep(10)
+            finally:
+                # Cleanup that itself yields to the loop
+                await asyncio.sleep(0.01)
+                unwound.append(True)
+
+        orch._aexecute_plan = slow_plan
+
+        async def disconnect():
+            stream = orch.astream("Find python trends")
+            async for event in stream:
+                if event["type"] == "step_started":
+                    break
+            await stream.aclose()
+            return list(unwound)
+
+        self.assertEqual(asyncio.run(disconnect()), [True])
+
+    def test_unsafe_input_is_rejected_before_streaming(self):
+        orch = OrchestratorAgent({"name": "TestOrchestrator", "id": "orchestrator"}, [])
+
+        async def collect():
+            return [event async for event in orch.astream("run rm -rf /")]
+
+        self.assertEqual([e["type"] for e in asyncio.run(collect())], ["rejected"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import sys
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.memory_store import _stores, open_memory_store
+from anti_gravity_system.src.core.tenant_shards import TenantShards, shard_name
+from anti_gravity_system.src.core.memory_compactor import MemoryCompactor
+from anti_gravity_system.src.agents.memory_agent import MemoryAgent
+from anti_gravity_system.src.agents.orchestrator import OrchestratorAgent
+
+def embed(texts):
+    return [[float(len(t)), 1.0] for t in texts]
+
+class TestTenantShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.shards = TenantShards(self.tmp.name, max_open=2, vector_backend="numpy")
+
+    def tearDown(self):
+        self.shards.close()
+        self.tmp.cleanup()
+
+    def warm(self, tenant):
+        # Opens the shard with an offline embedder; the LRU keeps it open afterwards
+        with self.shards.acquire(tenant) as store:
+            store.embedding_function = embed
+        return store
+
+    def is_open(self, tenant):
+        return os.path.realpath(self.shards.shard_path(tenant)) in _stores
+
+    def test_agent_routes_each_user_to_their_shard(self):
+        self.warm("alice")
+        self.warm("bob")
+        agent = MemoryAgent({"role": "Memory"})
+        agent.shards = self.shards
+        store = lambda user, content: agent.process_request({"action": "store", "payload": {
+            "content": content, "type": "FACT", "session_id": f"{user}-s1", "user_id": user
+        }})
+        search = lambda user: agent.process_request({"action": "search", "payload": {
+            "query": "salary", "user_id": user, "mode": "lexical"
+        }})["results"]
+
+        store("alice", "alice salary 100")
+        store("bob", "bob salary 200")
+        self.assertEqual([r["content"] for r in search("alice")], ["alice salary 100"])
+        self.assertEqual([r["content"] for r in search("bob")], ["bob salary 200"])
+        agent.close()
+
+        with self.shards.acquire("alice") as alice:
+            with alice.db.reader() as conn:
+                self.assertEqual(conn.execute("SELECT id, user_id FROM sessions").fetchall(), [("alice-s1", "alice")])
+
+    def test_least_recently_used_shards_close(self):
+        for tenant in ("a", "b"):
+            self.warm(tenant)
+        in_use = self.shards.open("a")
+        self.warm("c")
+        self.warm("d")
+        # "a" left the LRU but a request still holds it
+        self.assertEqual(self.shards.open_count(), 2)
+        self.assertTrue(self.is_open("a"))
+        self.assertFalse(self.is_open("b"))
+        in_use.add_memory("late write", "FACT", "s1")
+        in_use.close()
+        self.assertFalse(self.is_open("a"))
+
+        # Reopening finds the data on disk
+        with self.shards.acquire("a") as store:
+            store.embedding_function = embed
+            self.assertEqual([h["content"] for h in store.get_session_history("s1")], ["late write"])
+
+    def test_unsafe_ids_are_hashed(self):
+        self.assertEqual(shard_name("user_42"), "user_42")
+        for tenant in ("../etc", "a/b", "", "x" * 100):
+            name = shard_name(tenant)
+            self.assertTrue(name.startswith("u_"))
+            self.assertNotIn("/", name)
+        self.assertNotEqual(shard_name("a/b"), shard_name("a/c"))
+
+    def test_orchestrator_threads_user_id(self):
+        orch = OrchestratorAgent({"name": "TestOrchestrator", "id": "orchestrator"}, [
+            {"id": "worker_research", "name": "ResearchBot", "role": "Researcher"}
+        ])
+        orch.memory.process_request = MagicMock(return_value={"status": "success", "results": []})
+        orch.run("Research Agent Frameworks", user_id="alice")
+        orch.memory_writes.drain()
+        users = {call.args[0]["payload"]["user_id"] for call in orch.memory.process_request.call_args_list}
+        self.assertEqual(users, {"alice"})
+        self.assertEqual(orch._session_users, {})
+        orch.reset()
+
+    def test_compaction_covers_every_shard(self):
+        for tenant in ("a", "bob@example.com"):
+            with self.shards.acquire(tenant) as store:
+                store.embedding_function = embed
+                store.add_memory("old", "USER_REQUEST", "s1")
+                store.flush()
+                with store.db.writer() as conn:
+                    conn.execute("UPDATE memory_items SET timestamp = '2020-01-01T00:00:00'")
+        # The shared store sits at the root, the shards beneath it
+        root = open_memory_store(self.tmp.name, vector_backend="numpy")
+        compactor = MemoryCompactor(root, ttl_days={"USER_REQUEST": 30}, summarize_after_days=None)
+        # Closed shards are reopened as their tenant, hashed directory names included
+        self.shards.close()
+        opened = []
+        for_store = compactor.for_store
+        compactor.for_store = lambda store: opened.append(store.tenant_id) or for_store(store)
+        report = compactor.run_all(self.shards, now=datetime(2025, 1, 1))
+        self.assertEqual(report.items_expired, 2)
+        self.assertEqual(sorted(opened), ["a", "bob@example.com"])
+        root.close()
+
+if __name__ == "__main__":
+    unittest.main()
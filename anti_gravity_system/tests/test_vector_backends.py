@@ -0,0 +1,99 @@
+import sys
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.vector_backends import NumpyBackend
+from anti_gravity_system.src.core.memory_store import MemoryStore
+
+class TestNumpyBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "index")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def seed(self, backend):
+        backend.upsert(
+            ids=["a", "b", "c"],
+            embeddings=[[1, 0, 0], [0.9, 0.1, 0], [0, 1, 0]],
+            documents=["doc a", "doc b", "doc c"],
+            metadatas=[{"type": "FACT", "session_id": "s1"}, {"type": "FACT", "session_id": "s2"},
+                       {"type": "USER_INPUT", "session_id": "s1"}]
+        )
+
+    def test_top_k_by_cosine_distance(self):
+        backend = NumpyBackend(self.path)
+        self.seed(backend)
+        results = backend.query([2, 0, 0], limit=2)
+        self.assertEqual([r["id"] for r in results], ["a", "b"])
+        self.assertAlmostEqual(results[0]["distance"], 0.0, places=6)
+        self.assertEqual(results[0]["content"], "doc a")
+        self.assertEqual(results[0]["metadata"]["session_id"], "s1")
+        self.assertEqual(len(backend.query([1, 0, 0], limit=10)), 3)
+
+    def test_metadata_filters(self):
+        backend = NumpyBackend(self.path)
+        self.seed(backend)
+        self.assertEqual([r["id"] for r in backend.query([1, 0, 0], where={"type": "USER_INPUT"})], ["c"])
+        both = {"$and": [{"type": "FACT"}, {"session_id": {"$eq": "s2"}}]}
+        self.assertEqual([r["id"] for r in backend.query([1, 0, 0], where=both)], ["b"])
+        self.assertEqual(backend.query([1, 0, 0], where={"type": "UNKNOWN"}), [])
+        with self.assertRaises(ValueError):
+            backend.query([1, 0, 0], where={"source": "web"})
+
+    def test_growth_upsert_and_reopen(self):
+        backend = NumpyBackend(self.path, initial_capacity=2)
+        self.seed(backend)
+        backend.upsert(ids=["a"], embeddings=[[0, 0, 1]], documents=["doc a v2"],
+                       metadatas=[{"type": "FACT", "session_id": "s1"}])
+        self.assertEqual(backend.count(), 3)
+        backend.close()
+
+        reopened = NumpyBackend(self.path, initial_capacity=2)
+        self.assertEqual(reopened.count(), 3)
+        top = reopened.query([0, 0, 1], limit=1)[0]
+        self.assertEqual((top["id"], top["content"]), ("a", "doc a v2"))
+
+    def test_delete_survives_reopen(self):
+        backend = NumpyBackend(self.path)
+        self.seed(backend)
+        backend.delete(["a", "missing"])
+        self.assertEqual([r["id"] for r in backend.query([1, 0, 0], limit=5)], ["b", "c"])
+        backend.close()
+        reopened = NumpyBackend(self.path)
+        self.assertEqual(reopened.count(), 2)
+        self.assertEqual(sorted(reopened.ids()), ["b", "c"])
+        self.assertEqual(reopened.query([1, 0, 0], limit=1)[0]["id"], "b")
+        reopened.compact()
+        self.assertEqual(reopened._rows, 2)
+
+    def test_compaction_drops_dead_rows(self):
+        backend = NumpyBackend(self.path, initial_capacity=4, compact_ratio=0.25)
+        rng = np.random.default_rng(0)
+        for _ in range(3):
+            backend.upsert(ids=[f"id-{i}" for i in range(4)], embeddings=rng.normal(size=(4, 8)),
+                           documents=[f"doc {i}" for i in range(4)], metadatas=[{"type": "FACT"}] * 4)
+        self.assertEqual(backend.count(), 4)
+        self.assertEqual(backend._rows, 4)
+        with open(os.path.join(self.path, "items.jsonl")) as f:
+            self.assertEqual(len(f.readlines()), 4)
+        self.assertEqual(len(backend.query(rng.normal(size=8), limit=10)), 4)
+
+    def test_memory_store_on_numpy_backend(self):
+        store = MemoryStore(persist_dir=self.tmp.name, vector_backend="numpy")
+        store.embedding_function = lambda texts: [[float(len(t)), 1.0] for t in texts]
+        store.add_memory("short", "FACT", "s1")
+        store.add_memory("a much longer memory", "USER_INPUT", "s1")
+        results = store.search_memory("a much longer query!", type_filter="USER_INPUT")
+        self.assertEqual([r["content"] for r in results], ["a much longer memory"])
+        self.assertIsNone(store._chroma_client)
+        store.close()
+
+if __name__ == "__main__":
+    unittest.main()
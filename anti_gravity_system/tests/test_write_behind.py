@@ -0,0 +1,109 @@
+import sys
+import os
+import time
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.append(os.getcwd())
+
+from anti_gravity_system.src.core.write_behind import WriteBehindBuffer, PendingMemory
+from anti_gravity_system.src.core.memory_store import MemoryStore
+
+def item(n, session_id="s1"):
+    return PendingMemory(f"id-{n}", session_id, "FACT", f"content {n}", f"2024-01-01T00:00:0{n}")
+
+class TestWriteBehind(unittest.TestCase):
+    def test_flushes_on_size_threshold(self):
+        batches = []
+        buffer = WriteBehindBuffer(batches.append, max_items=3, max_delay_seconds=60)
+        for n in range(7):
+            buffer.add(item(n))
+        self.assertEqual([len(b) for b in batches], [3, 3])
+        buffer.close()
+        self.assertEqual([len(b) for b in batches], [3, 3, 1])
+
+    def test_flushes_on_time_threshold(self):
+        batches = []
+        buffer = WriteBehindBuffer(batches.append, max_items=100, max_delay_seconds=0.1)
+        buffer.add(item(1))
+        buffer.add(item(2))
+        deadline = time.time() + 2
+        while not batches and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual([[i.id for i in b] for b in batches], [["id-1", "id-2"]])
+        buffer.close()
+
+    def test_failed_batches_are_retried_then_dropped(self):
+        calls = []
+
+        def flaky(batch):
+            calls.append(len(batch))
+            raise RuntimeError("disk full")
+
+        buffer = WriteBehindBuffer(flaky, max_items=100, max_delay_seconds=60, max_attempts=2)
+        buffer.add(item(1))
+        buffer.flush()
+        self.assertTrue(buffer.has_pending())
+        buffer.flush()
+        self.assertFalse(buffer.has_pending())
+        self.assertEqual(calls, [1, 1])
+        buffer.close()
+
+    def test_batch_in_flight_counts_as_pending(self):
+        started, release, written = threading.Event(), threading.Event(), []
+
+        def slow(batch):
+            started.set()
+            release.wait(2)
+            written.extend(batch)
+
+        buffer = WriteBehindBuffer(slow, max_items=100, max_delay_seconds=60)
+        buffer.add(item(1))
+        flusher = threading.Thread(target=buffer.flush)
+        flusher.start()
+        started.wait(2)
+        # The batch left the queue but is not written yet
+        self.assertTrue(buffer.has_pending("s1"))
+        self.assertFalse(buffer.has_pending("s2"))
+
+        reader = threading.Thread(target=buffer.flush)
+        reader.start()
+        reader.join(0.1)
+        self.assertTrue(reader.is_alive())
+        release.set()
+        reader.join(2)
+        self.assertEqual([i.id for i in written], ["id-1"])
+        self.assertFalse(buffer.has_pending("s1"))
+        flusher.join()
+        buffer.close()
+
+    def test_store_batches_writes_and_reads_its_own_writes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = MemoryStore(persist_dir=tmp)
+            store.backend = MagicMock()
+            store.embedding_function = lambda texts: [[0.0, 1.0] for _ in texts]
+            store.backend.query.return_value = []
+
+            for n in range(3):
+                store.add_memory(f"fact {n}", "FACT", "session-a")
+            store.add_memory("other", "FACT", "session-b")
+            store.backend.upsert.assert_not_called()
+
+            # Another session's pending writes do not force a flush...
+            store.search_memory("facts", session_id="session-c")
+            store.backend.upsert.assert_not_called()
+
+            # ...but the writing session always sees its own items
+            history = store.get_session_history("session-a")
+            self.assertEqual([h["content"] for h in history], ["fact 0", "fact 1", "fact 2"])
+            store.backend.upsert.assert_called_once()
+            self.assertEqual(len(store.backend.upsert.call_args.kwargs["ids"]), 4)
+
+            store.add_memory("late", "FACT", "session-a")
+            store.close()
+            self.assertEqual(store.backend.upsert.call_count, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,8 @@
 from .base import BaseTool, ToolResult
-from typing import Dict, Any, List
-import chromadb
-from chromadb.config import Settings
+from typing import Dict, Any, List, Optional
 import logging
+from anti_gravity_system.src.core.memory_store import open_memory_store
+from anti_gravity_system.src.core.vector_backends import memory_collection_name
 
 logger = logging.getLogger(__name__)
 
@@ -10,15 +10,24 @@ class VectorDBTool(BaseTool):
     name = "vector_db_search"
     description = "Searching vector embeddings in ChromaDB"
 
-    def __init__(self, collection_name: str = "antigravity_memory"):
-        # Use persistent client
-        self.client = chromadb.PersistentClient(path="./antigravity_data/chroma")
+    def __init__(self, collection_name: Optional[str] = None, persist_dir: str = "./antigravity_data/memory"):
+        # Borrows the shared memory store's Chroma client and embedding cache instead of
+        # opening a second client on the same data
+        self.store = open_memory_store(persist_dir)
+        self.client = self.store.chroma_client
+        self.embedding_function = self.store.embedding_function
+        # By default the store's own collection for its embedding model
+        if collection_name is None:
+            collection_name = memory_collection_name(getattr(self.embedding_function, "model", None))
         self.collection = self.client.get_or_create_collection(name=collection_name)
+
+    def close(self):
+        self.store.close()
         
     def execute(self, query: str, n_results: int = 3) -> ToolResult:
         try:
             results = self.collection.query(
-                query_texts=[query],
+                query_embeddings=self.embedding_function([query]),
                 n_results=n_results
             )
             return ToolResult(
@@ -33,6 +42,7 @@ class VectorDBTool(BaseTool):
         try:
             self.collection.add(
                 documents=documents,
+                embeddings=self.embedding_function(documents),
                 metadatas=metadatas,
                 ids=ids
             )